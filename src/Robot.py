@@ -1,9 +1,61 @@
-from VEXLib.Algorithms.PID import PIDController
 from VEXLib.Math.MathUtil import MathUtil
 from VEXLib.Robot.TelemteryRobot import TelemetryRobot
 from VEXLib.Util import time
 from vex import *
-from dxf_parser import DXFParser
+from feedforward_controller import FeedforwardController
+from homing import HOMED_ENCODER_POSITION, StallDetector, calibration_valid, home_axes, load_calibration, \
+    save_calibration
+from motion_executor import DEFAULT_TRAVEL_SPEED, MotionExecutor
+from motion_planner import limit_axis_speeds
+from path_queue import CREDIT_MESSAGE, PATH_MESSAGE, PATH_PEN_DOWN, PATH_RESET_MESSAGE, PathQueue, parse_path
+from pen import Pen
+from plot_cache import PlotCache
+from plot_job import OP_DRAW, PLOT_JOB_EXTENSION, PlotJob, load_plot_job
+from plot_pipeline import DEFAULT_BATCH_SIZE, PLOTTER_HOME, PlotPipeline
+from relay_autotune import RelayAutotune, gains_from_ultimate, load_gains, save_gains
+from ring_log import RingLog
+from sensor_snapshot import SensorSnapshot
+from stroke_queue import DEFAULT_QUEUE_SIZE, StrokeQueue
+
+# The top speed of the 18:1 axis motors, 200 RPM
+MOTOR_MAX_DEGREES_PER_SECOND = 1200
+# Position feedback gains of the axis controllers, in fractions of the motors' top speed per inch of error
+X_AXIS_KP = 0.6
+Y_AXIS_KP = 0.7
+AXIS_KI = 0.5
+# The motors run their own velocity loops, which already cover static friction and most of the inertia, so the static
+# and acceleration feedforward start at zero until they are tuned
+AXIS_KS = 0.0
+AXIS_KA = 0.0
+# The fastest any axis is driven, as a fraction of the motors' top speed
+MAX_AXIS_SPEED = 0.6
+# The number of segments kept queued in the motion executor while plotting, the rest of the plot is read as they finish
+PLOT_LOOKAHEAD_SEGMENTS = 32
+# The most telemetry messages handled per tick
+MAX_MESSAGES_PER_TICK = 4
+# The speed scale of moves streamed from the host
+PATH_SPEED = 0.5
+# How often the path credit limit is sent again even if it has not changed, in case a message was lost, in ticks
+CREDIT_REFRESH_TICKS = 50
+# The most log records sent over telemetry per tick, so draining the log never takes over the tick
+LOG_DRAIN_PER_TICK = 4
+# Homing, per axis: the voltage each axis is driven towards its hard stop with, the speed below which it counts as
+# stalled, in percent of the motors' top speed, and how long it is ignored while it spins up, in seconds. The x axis is
+# driven gently, so it only travels at about 7% and needs a threshold well below that, and it takes longer to reach
+# speed. The y axis carries the x axis, so it is driven harder and travels at about 20%.
+X_HOMING_VOLTAGE = -1
+X_STALL_VELOCITY = 3.0
+X_SPIN_UP_TIME = 0.4
+Y_HOMING_VOLTAGE = -3
+Y_STALL_VELOCITY = 5.0
+Y_SPIN_UP_TIME = 0.2
+
+# Log event ids
+LOG_AXIS_SPEEDS = 1
+LOG_MOVE_DONE = 2
+LOG_PLOT_DONE = 3
+LOG_AUTOTUNE_DONE = 4
+LOG_PEN_TIME = 5
 
 
 class Robot(TelemetryRobot):
@@ -19,29 +71,121 @@ class Robot(TelemetryRobot):
         self.left_x_axis_motor = Motor(Ports.PORT3, GearSetting.RATIO_18_1, True)
         self.right_x_axis_motor = Motor(Ports.PORT4, GearSetting.RATIO_18_1, True)
 
-        self.left_y_axis_motor_controller = PIDController(0.7, 0, 0, 0.05, 0)
-        self.right_y_axis_motor_controller = PIDController(0.7, 0, 0, 0.05, 0)
-        self.x_axis_motor_controller = PIDController(0.6, 0, 0, 0.05, 0)
-
-        self.pen = Servo(brain.three_wire_port.a)
+        # The velocity feedforward converts inches per second into a fraction of the motors' top speed
+        x_kv = self.position_conversion_factor_x / MOTOR_MAX_DEGREES_PER_SECOND
+        y_kv = self.position_conversion_factor_y / MOTOR_MAX_DEGREES_PER_SECOND
+        self.left_y_axis_motor_controller = FeedforwardController(Y_AXIS_KP, AXIS_KI, 0, AXIS_KS, y_kv, AXIS_KA)
+        self.right_y_axis_motor_controller = FeedforwardController(Y_AXIS_KP, AXIS_KI, 0, AXIS_KS, y_kv, AXIS_KA)
+        self.x_axis_motor_controller = FeedforwardController(X_AXIS_KP, AXIS_KI, 0, AXIS_KS, x_kv, AXIS_KA)
+
+        self.pen_servo = Servo(brain.three_wire_port.a)
+        self.pen = Pen(lambda position: self.pen_servo.set_position(position, PERCENT))
+
+        self.encoder_motors = {
+            "left_x_position": self.left_x_axis_motor,
+            "right_x_position": self.right_x_axis_motor,
+            "left_y_position": self.left_y_axis_motor,
+            "right_y_position": self.right_y_axis_motor
+        }
+        # The encoder reading of each motor at its axis' hard stop, set by homing
+        self.encoder_offsets = {name: 0.0 for name in self.encoder_motors}
+        self.homed = False
+        # The calibration last saved to or restored from the SD card, which is only saved again once the encoders have
+        # moved away from it
+        self.saved_calibration = None
+
+        # Every motor position is read from its device once per tick, then served from the snapshot
+        self.sensors = SensorSnapshot()
+        self.sensors.register("left_x_position", lambda: self.read_encoder("left_x_position"))
+        self.sensors.register("right_x_position", lambda: self.read_encoder("right_x_position"))
+        self.sensors.register("left_y_position", lambda: self.read_encoder("left_y_position"))
+        self.sensors.register("right_y_position", lambda: self.read_encoder("right_y_position"))
+
+        # Control loop events are recorded as binary records and only formatted when they are sent, after the tick's
+        # control step. Set self.log.level to DEBUG to record the axis speeds of every control step.
+        self.log = RingLog()
+        self.log.define_event(LOG_AXIS_SPEEDS, "AXIS_SPEEDS", ("x", "left_y", "right_y"))
+        self.log.define_event(LOG_MOVE_DONE, "MOVE_DONE", ("x", "y"))
+        self.log.define_event(LOG_PLOT_DONE, "PLOT_DONE", ("device_reads", "saved_reads"))
+        self.log.define_event(LOG_AUTOTUNE_DONE, "AUTOTUNE_DONE", ("kp", "ultimate_gain", "ultimate_period"))
+        self.log.define_event(LOG_PEN_TIME, "PEN_TIME", ("transitions", "moving", "waiting"))
+
+        self.motion = MotionExecutor(self.get_tool_position, self.drive_towards, self.stop_axes, self.set_pen)
+        # The (opcode, stroke) pairs of the plot in progress that have not been queued for the motion executor yet
+        self.plot_strokes = None
+        # The queue the plot in progress is read from while it is still being processed, if any
+        self.plot_stroke_queue = None
+        # Whether a plot was started and has not finished or been cancelled
+        self.plot_running = False
+        self.reported_progress = None
+        # Points and pen changes streamed from the host with PATH, UP and DOWN messages
+        self.path_queue = PathQueue()
+        self.reported_credit_limit = None
+        self.ticks_since_credit_report = 0
+
+        # Gains measured on this machine by start_autotune replace the defaults
+        self.apply_gains(load_gains())
+        # The axes left to tune and the relay experiment running on the first of them, while auto-tuning
+        self.autotune_axes = None
+        self.autotune = None
+        self.tuned_gains = {}
 
     def setup(self):
         print("Setup")
         self.pen_up()
-        self.calibrate()
+        self.home()
         # self.draw_dxf("drawing.dxf")
         # self.draw_dxf("evans_drawing.dxf")
 
     def periodic(self):
-        message = self.telemetry.get_message()
-        if not message:
+        self.sensors.update()
+        if self.autotune_axes is not None:
+            self.step_autotune()
+        elif not self.homed:
+            # Tool positions mean nothing until the axes are homed, so nothing is allowed to move
+            if self.plot_running or len(self.path_queue) or not self.motion.is_idle():
+                print("Refusing to move before the axes are homed")
+                self.cancel_plot()
+        else:
+            self.feed_plot()
+            self.feed_path()
+            self.motion.step()
+        self.report_progress()
+        self.report_credit()
+        self.finish_plot_when_idle()
+        self.save_calibration_when_idle()
+        self.log.drain_text(self.telemetry.send_telemetry_message, LOG_DRAIN_PER_TICK)
+
+        for _ in range(MAX_MESSAGES_PER_TICK):
+            message = self.telemetry.get_message()
+            if not message:
+                return
+            self.handle_message(message)
+
+    def handle_message(self, message):
+        if message.startswith(PATH_RESET_MESSAGE):
+            # The host started a new stream, so it starts counting its credits from zero again
+            self.path_queue.reset()
+            self.reported_credit_limit = None
             return
-        if "UP" in message:
-            self.pen_up()
+        if message.startswith(PATH_MESSAGE):
+            try:
+                self.path_queue.add_points(parse_path(message))
+            except ValueError:
+                print("Malformed path message: " + message)
+            return
+
+        if "STOP" in message:
+            self.cancel_plot()
+        elif "UP" in message:
+            # Pen changes from the host are queued with the points around them, so they happen in the same order
+            self.path_queue.add_pen(False)
         elif "DOWN" in message:
-            self.pen_down()
+            self.path_queue.add_pen(True)
         elif "GOTO" in message:
-            self.move_tool_to_position_linear([float(x) for x in message.split(":")[-1].split("|")], 0.5)
+            self.motion.enqueue_move([float(x) for x in message.split(":")[-1].split("|")], PATH_SPEED)
+        elif "AUTOTUNE" in message:
+            self.start_autotune()
 
         self.brain.screen.print(message)
         self.brain.screen.next_row()
@@ -52,111 +196,166 @@ class Robot(TelemetryRobot):
     def get_tool_position(self):
         return self.get_x_position(), self.get_y_position()
 
+    def read_encoder(self, name):
+        return self.encoder_motors[name].position(DEGREES) - self.encoder_offsets[name]
+
+    def get_encoder_positions(self):
+        # The raw encoder readings, from the snapshot
+        return {name: self.sensors.get(name) + self.encoder_offsets[name] for name in self.encoder_motors}
+
     def get_left_y_position(self):
-        return self.left_y_axis_motor.position(DEGREES) / self.position_conversion_factor_y
+        return self.sensors.get("left_y_position") / self.position_conversion_factor_y
 
     def get_right_y_position(self):
-        return self.right_y_axis_motor.position(DEGREES) / self.position_conversion_factor_y
+        return self.sensors.get("right_y_position") / self.position_conversion_factor_y
 
     def get_x_position(self):
-        return MathUtil.average(self.left_x_axis_motor.position(DEGREES),
-                                self.right_x_axis_motor.position(DEGREES)) / self.position_conversion_factor_x
+        return MathUtil.average(self.sensors.get("left_x_position"),
+                                self.sensors.get("right_x_position")) / self.position_conversion_factor_x
 
     def get_y_position(self):
         return MathUtil.average(self.get_left_y_position(), self.get_right_y_position())
 
-    def calibrate(self):
-
-        self.left_x_axis_motor.spin(FORWARD, -1, VOLT)
-        self.right_x_axis_motor.spin(FORWARD, -1, VOLT)
-        time.sleep(1)
-        while abs(self.left_x_axis_motor.velocity(PERCENT) + self.right_x_axis_motor.velocity(PERCENT)) > 10:
-            time.sleep(0.1)
-        self.left_x_axis_motor.set_position(0, DEGREES)
-        self.right_x_axis_motor.set_position(0, DEGREES)
+    def home(self):
+        # A warm restart finds the encoders where the saved calibration left them, so physical homing can be skipped
+        calibration = load_calibration()
+        encoder_positions = {name: motor.position(DEGREES) for name, motor in self.encoder_motors.items()}
+        if calibration_valid(calibration, encoder_positions):
+            self.encoder_offsets = calibration["offsets"]
+            self.homed = True
+            self.saved_calibration = calibration
+            self.sensors.update()
+            print("Restored saved calibration")
+            return
+        self.calibrate()
 
+    def calibrate(self):
+        # Both axes are driven against their hard stops at the same time, and each one is finished as soon as it stalls
+        self.homed = False
+        homed = home_axes([
+            self.get_homing_axis(["left_x_position", "right_x_position"], X_HOMING_VOLTAGE, X_STALL_VELOCITY,
+                                 X_SPIN_UP_TIME),
+            self.get_homing_axis(["left_y_position", "right_y_position"], Y_HOMING_VOLTAGE, Y_STALL_VELOCITY,
+                                 Y_SPIN_UP_TIME)
+        ])
+        self.sensors.update()
+        self.homed = homed
+        if not homed:
+            print("Homing timed out, motion is disabled until the axes are homed")
+            return
+        self.save_encoder_calibration()
+        print("Calibrated")
+
+    def get_homing_axis(self, names, voltage, stall_velocity, spin_up_time):
+        motors = [self.encoder_motors[name] for name in names]
+
+        def start():
+            for motor in motors:
+                motor.spin(FORWARD, voltage, VOLT)
+
+        def read():
+            return (MathUtil.average_iterable([abs(motor.velocity(PERCENT)) for motor in motors]),
+                    max([motor.current() for motor in motors]))
+
+        def finish(homed):
+            for name, motor in zip(names, motors):
+                # Only an axis that reached its stop has a known zero, the offsets of the others are left alone
+                if homed:
+                    motor.set_position(HOMED_ENCODER_POSITION, DEGREES)
+                    self.encoder_offsets[name] = HOMED_ENCODER_POSITION
+                motor.set_velocity(0, PERCENT)
+                motor.spin(FORWARD)
+
+        return start, read, finish, StallDetector(velocity_threshold=stall_velocity, spin_up_time=spin_up_time)
+
+    def save_encoder_calibration(self):
+        positions = self.get_encoder_positions()
+        try:
+            save_calibration(self.encoder_offsets, positions)
+        except OSError as error:
+            # Without the file the axes are homed again on the next start. The readings are still remembered, so a
+            # missing SD card is only reported once for each place the axes come to rest.
+            print("Could not save the calibration: " + str(error))
+        self.saved_calibration = {"offsets": dict(self.encoder_offsets), "positions": positions}
+
+    def save_calibration_when_idle(self):
+        # The saved encoder readings only match while the axes stand still. They are saved once a plot or a streamed
+        # path has finished, rather than at every pause in it, and only if the axes stopped away from the saved
+        # readings, so the SD card is not rewritten after every move.
+        if not self.homed or self.autotune_axes is not None or self.plot_running or len(self.path_queue):
+            return
+        if self.motion.is_idle() and not calibration_valid(self.saved_calibration, self.get_encoder_positions()):
+            self.save_encoder_calibration()
+
+    def drive_towards(self, position, velocity, acceleration):
+        # The planned velocity and acceleration of each axis drive most of the output, and the controllers only
+        # correct the position error of each axis on top of it
+        self.x_axis_motor_controller.set_target(position[0], velocity[0], acceleration[0])
+        self.left_y_axis_motor_controller.set_target(position[1], velocity[1], acceleration[1])
+        self.right_y_axis_motor_controller.set_target(position[1], velocity[1], acceleration[1])
+        x_speed, left_y_speed, right_y_speed = limit_axis_speeds([
+            self.x_axis_motor_controller.update(self.get_x_position()),
+            self.left_y_axis_motor_controller.update(self.get_left_y_position()),
+            self.right_y_axis_motor_controller.update(self.get_right_y_position())
+        ], MAX_AXIS_SPEED)
+        # The axes are slowed down together to MAX_AXIS_SPEED, which cuts the outputs of axes below the controllers' own
+        # limit as well. Each controller is told the output it actually got, so its integral does not wind up meanwhile.
+        self.x_axis_motor_controller.apply_output(x_speed)
+        self.left_y_axis_motor_controller.apply_output(left_y_speed)
+        self.right_y_axis_motor_controller.apply_output(right_y_speed)
+        self.log.debug(LOG_AXIS_SPEEDS, x_speed, left_y_speed, right_y_speed)
+
+        self.left_x_axis_motor.set_velocity(x_speed * 100, PERCENT)
+        self.right_x_axis_motor.set_velocity(x_speed * 100, PERCENT)
+        self.left_y_axis_motor.set_velocity(left_y_speed * 100, PERCENT)
+        self.right_y_axis_motor.set_velocity(right_y_speed * 100, PERCENT)
+
+    def drive_axis(self, axis, speed):
+        if axis == "x":
+            self.left_x_axis_motor.set_velocity(speed * 100, PERCENT)
+            self.right_x_axis_motor.set_velocity(speed * 100, PERCENT)
+        else:
+            self.left_y_axis_motor.set_velocity(speed * 100, PERCENT)
+            self.right_y_axis_motor.set_velocity(speed * 100, PERCENT)
+
+    def stop_axes(self):
+        self.x_axis_motor_controller.reset()
+        self.left_y_axis_motor_controller.reset()
+        self.right_y_axis_motor_controller.reset()
         self.left_x_axis_motor.set_velocity(0, PERCENT)
         self.right_x_axis_motor.set_velocity(0, PERCENT)
-        self.left_x_axis_motor.spin(FORWARD)
-        self.right_x_axis_motor.spin(FORWARD)
-        print("Calibrated X")
-
-        self.left_y_axis_motor.spin(FORWARD, -3, VOLT)
-        self.right_y_axis_motor.spin(FORWARD, -3, VOLT)
-        time.sleep(1)
-        while abs(self.left_y_axis_motor.velocity(PERCENT) + self.right_y_axis_motor.velocity(PERCENT)) > 10:
-            time.sleep(0.1)
-        self.left_y_axis_motor.set_position(0, DEGREES)
-        self.right_y_axis_motor.set_position(0, DEGREES)
-
         self.left_y_axis_motor.set_velocity(0, PERCENT)
         self.right_y_axis_motor.set_velocity(0, PERCENT)
-        self.left_y_axis_motor.spin(FORWARD)
-        self.right_y_axis_motor.spin(FORWARD)
-        print("Calibrated Y")
 
-        # self.y_axis_motor.spin(FORWARD, 5, VOLT)
+    def wait_for_motion(self):
+        # Steps the motion executor in place of periodic, for moves made before the tick loop starts
+        if not self.homed:
+            self.motion.cancel()
+            raise RuntimeError("The axes are not homed")
+        while not self.motion.is_idle():
+            self.sensors.update()
+            self.motion.step()
+            time.sleep(0.02)
 
     def move_tool_to_position_linear(self, position, speed):
-        self.x_axis_motor_controller.setpoint = position[0]
-        self.left_y_axis_motor_controller.setpoint = position[1]
-        self.right_y_axis_motor_controller.setpoint = position[1]
-
-        print("X current: " + str(self.get_x_position()))
-        print("LY current: " + str(self.get_left_y_position()))
-        print("RY current: " + str(self.get_right_y_position()))
-
-        print("X current: " + str(self.get_x_position()))
-        print("LY current: " + str(self.get_left_y_position()))
-        print("RY current: " + str(self.get_right_y_position()))
-
-        while not MathUtil.distance(self.get_tool_position(), position) < 0.05:
-            print("TOOL: " + str(self.get_tool_position()))
-            print("TARG: " + str(position))
-            print("DIST: " + str(MathUtil.distance(self.get_tool_position(), position)))
-            print("X SETPOINT: " + str(self.x_axis_motor_controller.setpoint))
-            print("Y-L SETPOINT: " + str(self.left_y_axis_motor_controller.setpoint))
-            print("Y-R SETPOINT: " + str(self.right_y_axis_motor_controller.setpoint))
-
-            x_speed = self.x_axis_motor_controller.update(self.get_x_position()) * speed
-            x_speed = MathUtil.clamp(x_speed, -0.3, 0.3)
-
-            left_y_speed = self.left_y_axis_motor_controller.update(self.get_left_y_position()) * speed
-            right_y_speed = self.right_y_axis_motor_controller.update(self.get_right_y_position()) * speed
-            left_y_speed = MathUtil.clamp(left_y_speed, -0.3, 0.3)
-            right_y_speed = MathUtil.clamp(right_y_speed, -0.3, 0.3)
-
-            # x_speed += MathUtil.sign(x_speed) * 0.2
-            # left_y_speed += MathUtil.sign(left_y_speed) * 1.4
-            # right_y_speed += MathUtil.sign(right_y_speed) * 1.6
-
-            # self.left_x_axis_motor.spin(FORWARD, x_speed, VOLT)
-            # self.right_x_axis_motor.spin(FORWARD, x_speed, VOLT)
-            self.left_x_axis_motor.set_velocity(x_speed * 100, PERCENT)
-            self.right_x_axis_motor.set_velocity(x_speed * 100, PERCENT)
-
-            # self.left_y_axis_motor.spin(FORWARD, left_y_speed, VOLT)
-            # self.right_y_axis_motor.spin(FORWARD, right_y_speed, VOLT)
-            self.left_y_axis_motor.set_velocity(left_y_speed * 100, PERCENT)
-            self.right_y_axis_motor.set_velocity(right_y_speed * 100, PERCENT)
-
-        self.left_x_axis_motor.set_velocity(0, PERCENT)
-        self.right_x_axis_motor.set_velocity(0, PERCENT)
-        self.left_y_axis_motor.set_velocity(0, PERCENT)
-        self.right_y_axis_motor.set_velocity(0, PERCENT)
-        print("Within tolerance")
+        self.motion.enqueue_move(position, speed)
+        self.wait_for_motion()
+        self.log.info(LOG_MOVE_DONE, position[0], position[1])
 
     def follow_path(self, path, speed):
         for position in path:
-            self.move_tool_to_position_linear(position, speed)
+            self.motion.enqueue_move(position, speed)
+        self.wait_for_motion()
+
+    def set_pen(self, down):
+        # The pen model tells the motion executor how long the servo actually needs before the tool can move
+        return self.pen.set_down(down)
 
     def pen_down(self):
-        self.pen.set_position(0, PERCENT)
-        pass
+        self.pen.down()
 
     def pen_up(self):
-        self.pen.set_position(100, PERCENT)
-        pass
+        self.pen.up()
 
     def draw_square(self, side_length, bottom_left, movement_speed, drawing_speed):
         self.draw_rectangle(side_length, side_length, bottom_left, movement_speed, drawing_speed)
@@ -173,26 +372,184 @@ class Robot(TelemetryRobot):
         self.pen_up()
         self.move_tool_to_position_linear(start_point, movement_speed)
 
-    def draw_dxf(self, filename):
-        # Load raw DXF content
-        raw_dxf_content = open("deploy/" + str(filename), "r").read()
-
-        # Create parser and parse the content
-        dxf_parser = DXFParser(raw_dxf_content)
-        dxf_parser.parse()
+    def start_plot(self, strokes, stroke_queue=None):
+        # Plots are fed to the motion executor a few strokes at a time from periodic, so the robot keeps ticking
+        self.cancel_plot()
+        self.plot_strokes = iter(strokes)
+        self.plot_stroke_queue = stroke_queue
+        self.plot_running = True
+        self.pen.reset_stats()
+
+    def feed_plot(self):
+        while self.plot_strokes is not None and self.motion.queued_count() < PLOT_LOOKAHEAD_SEGMENTS:
+            # Never wait for strokes that are still being processed, that would stall the tick
+            if self.plot_stroke_queue is not None and not self.plot_stroke_queue.ready():
+                return
+            try:
+                opcode, stroke = next(self.plot_strokes)
+            except StopIteration:
+                self.plot_strokes = None
+                self.plot_stroke_queue = None
+                self.motion.enqueue_move(PLOTTER_HOME, DEFAULT_TRAVEL_SPEED)
+                return
+            except Exception as error:
+                print("Plotting failed: " + str(error))
+                self.cancel_plot()
+                return
+            if opcode == OP_DRAW:
+                self.motion.enqueue_stroke(stroke)
+            else:
+                for point in stroke:
+                    self.motion.enqueue_move(point, DEFAULT_TRAVEL_SPEED)
+
+    def finish_plot_when_idle(self):
+        if not self.plot_running or self.plot_strokes is not None or not self.motion.is_idle():
+            return
+        self.plot_running = False
+        device_reads, saved_reads = self.sensors.get_stats()
+        self.log.info(LOG_PLOT_DONE, device_reads, saved_reads)
+        transition_count, transition_time, wait_time = self.pen.get_stats()
+        self.log.info(LOG_PEN_TIME, transition_count, transition_time, wait_time)
+
+    def feed_path(self):
+        # Streamed points only go to the motion executor as it makes room for them, and only then are they given back
+        # to the host as credits, so the host sends them exactly as fast as they are drawn
+        if self.plot_running:
+            return
+        while len(self.path_queue) and self.motion.queued_count() < PLOT_LOOKAHEAD_SEGMENTS:
+            entry = self.path_queue.take()
+            if isinstance(entry, tuple):
+                self.motion.enqueue_move(entry, PATH_SPEED)
+            else:
+                self.motion.enqueue_pen(entry == PATH_PEN_DOWN)
+
+    def report_credit(self):
+        credit_limit = self.path_queue.get_credit_limit()
+        self.ticks_since_credit_report += 1
+        if credit_limit != self.reported_credit_limit or self.ticks_since_credit_report >= CREDIT_REFRESH_TICKS:
+            self.reported_credit_limit = credit_limit
+            self.ticks_since_credit_report = 0
+            self.telemetry.send_telemetry_message(CREDIT_MESSAGE + ":" + str(credit_limit))
+
+    def cancel_plot(self):
+        self.plot_running = False
+        self.path_queue.clear()
+        self.autotune_axes = None
+        self.autotune = None
+        if self.plot_stroke_queue is not None:
+            self.plot_stroke_queue.cancel()
+        self.plot_strokes = None
+        self.plot_stroke_queue = None
+        self.motion.cancel()
+        self.pen_up()
 
-        lines = dxf_parser.extract_lines()
-        combined_lines = dxf_parser.combine_lines(lines)
+    def report_progress(self):
+        completed, total, _ = self.motion.get_progress()
+        if (completed, total) != self.reported_progress:
+            self.reported_progress = (completed, total)
+            self.telemetry.send_telemetry_message("PROGRESS:" + str(completed) + "|" + str(total))
+
+    def apply_gains(self, gains):
+        for axis, controllers in (("x", [self.x_axis_motor_controller]),
+                                  ("y", [self.left_y_axis_motor_controller, self.right_y_axis_motor_controller])):
+            if axis not in gains:
+                continue
+            for controller in controllers:
+                controller.kp = gains[axis]["kp"]
+                controller.ki = gains[axis]["ki"]
+                controller.kd = gains[axis]["kd"]
+                controller.reset()
+
+    def start_autotune(self):
+        if not self.homed:
+            print("Refusing to auto-tune before the axes are homed")
+            return
+        # Runs a relay experiment around the middle of each axis in turn, stepped from periodic, then saves the gains
+        # derived from them to the SD card
+        self.cancel_plot()
+        self.autotune_axes = ["x", "y"]
+        self.tuned_gains = {}
+
+    def step_autotune(self):
+        axis = self.autotune_axes[0]
+        if self.autotune is None:
+            track_length = self.x_track_length_in if axis == "x" else self.y_track_length_in
+            self.autotune = RelayAutotune(track_length / 2)
+        speed = self.autotune.update(self.get_x_position() if axis == "x" else self.get_y_position())
+        if not self.autotune.is_done():
+            self.drive_axis(axis, speed)
+            return
 
-        self.pen_up()
+        self.stop_axes()
+        result = self.autotune.get_result()
+        self.autotune = None
+        if result is None:
+            print("Auto-tuning the " + axis + " axis timed out, keeping the current gains")
+            self.autotune_axes = None
+            return
+        ultimate_gain, ultimate_period = result
+        self.tuned_gains[axis] = gains_from_ultimate(ultimate_gain, ultimate_period)
+        self.log.info(LOG_AUTOTUNE_DONE, self.tuned_gains[axis]["kp"], ultimate_gain, ultimate_period)
+        self.autotune_axes.pop(0)
+        if not self.autotune_axes:
+            self.autotune_axes = None
+            self.apply_gains(self.tuned_gains)
+            try:
+                save_gains(self.tuned_gains)
+            except OSError as error:
+                # The gains still hold until the robot restarts, they are just measured again next time
+                print("Could not save the tuned gains: " + str(error))
+
+    def draw_plot_job(self, plot_job):
+        self.start_plot(plot_job.iter_strokes())
+
+    def draw_dxf(self, filename, calibrate=False, queue_size=DEFAULT_QUEUE_SIZE, batch_size=DEFAULT_BATCH_SIZE):
+        # Plot jobs compiled from the drawing at deploy time skip all text parsing and geometry processing
+        plot_job_filename = str(filename).rsplit(".", 1)[0] + PLOT_JOB_EXTENSION
+        plot_job = load_plot_job("deploy/" + plot_job_filename)
+        if plot_job is not None:
+            print("Loaded precompiled plot job: " + plot_job_filename)
+            if calibrate:
+                self.calibrate()
+            self.draw_plot_job(plot_job)
+            return
 
-        for line in combined_lines:
-            line = [(MathUtil.clamp(point[0], 0, 5), MathUtil.clamp(point[1], 0, 5)) for point in line]
-            self.move_tool_to_position_linear(line[0], 0.75)
-            self.pen_down()
-            time.sleep(1)
-            self.follow_path(line, 0.5)
-            self.pen_up()
-            time.sleep(1)
+        # Drawings processed on the brain before are cached on the SD card until the file or the pipeline changes
+        plot_pipeline = PlotPipeline(batch_size=batch_size)
+        plot_cache = PlotCache()
+        cache_key = PlotCache.get_key("deploy/" + str(filename), plot_pipeline.get_parameters())
+        plot_job = plot_cache.load(cache_key)
+        if plot_job is not None:
+            print("Loaded cached plot job for " + str(filename))
+            if calibrate:
+                self.calibrate()
+            self.draw_plot_job(plot_job)
+            return
 
-        self.move_tool_to_position_linear((0, 0), 0.75)
+        print("No precompiled or cached plot job for " + str(filename) + ", processing it while plotting")
+        # A background thread parses and processes the drawing, and plotting starts with its first stroke.
+        # The queue between them caps how many processed strokes wait in memory.
+        stroke_queue = StrokeQueue(queue_size)
+        Thread(lambda: stroke_queue.fill(self.iter_dxf_strokes(filename, plot_pipeline)))
+        if calibrate:
+            self.calibrate()
+
+        self.start_plot(self.iter_recorded_strokes(stroke_queue, plot_pipeline, plot_cache, cache_key), stroke_queue)
+
+    @staticmethod
+    def iter_recorded_strokes(stroke_queue, plot_pipeline, plot_cache, cache_key):
+        # Pack the strokes as they are plotted, and cache them once the whole drawing has been processed
+        plot_job = PlotJob.from_strokes([])
+        for stroke in stroke_queue:
+            plot_job.append(stroke)
+            yield OP_DRAW, stroke
+        print("Pen up travel: " + str(plot_pipeline.travel_before) + " in before ordering, " +
+              str(plot_pipeline.travel_after) + " in after")
+        plot_cache.store(cache_key, plot_job)
+
+    @staticmethod
+    def iter_dxf_strokes(filename, plot_pipeline):
+        # Stream the DXF content from the SD card instead of loading it all into memory
+        with open("deploy/" + str(filename), "r") as dxf_file:
+            for stroke in plot_pipeline.iter_strokes(dxf_file):
+                yield stroke
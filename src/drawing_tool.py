@@ -4,6 +4,8 @@ import threading
 import time
 import socket
 
+from path_queue import CREDIT_MESSAGE, MAX_PATH_POINTS_PER_MESSAGE, PATH_RESET_MESSAGE, format_path
+
 # Socket parameters
 HOST = "192.168.1.1"
 PORT = 10002  # Port to connect to (non-privileged ports are >= 1024)
@@ -39,6 +41,16 @@ class NetworkHandler:
 
         self.shutdown_triggered = False
 
+        # Points and pen commands waiting for credits from the robot, in the order they were drawn
+        self.pending_path = []
+        self.last_path_entry = None
+        # Reentrant, since a failed send inside flush_path reconnects, which resets the stream
+        self.path_lock = threading.RLock()
+        # The number of points sent since the stream started, and the total the robot has given credits for
+        self.sent_point_count = 0
+        self.credit_limit = 0
+        self.partial_line = ""
+
     def attempt_connection(self, retry_on_failure=True):
         if self.attempting_socket_connection:
             print("[attempt_connection]: Warning: Another thread is already attempting to reconnect the socket")
@@ -62,6 +74,7 @@ class NetworkHandler:
             self.socket.settimeout(1)
             print("Successfully reconnected to the socket")
             self.attempting_socket_connection = False
+            self.reset_path_stream()
 
     def start_network_loop(self):
         self.attempt_connection()
@@ -70,20 +83,85 @@ class NetworkHandler:
             if not received:
                 continue
 
+            # A line can be split across two reads, so the unfinished end of each read is kept for the next one
+            received[0] = self.partial_line + received[0]
+            self.partial_line = received.pop()
             for line in received:
                 if not line:
                     continue
+                if line.startswith(CREDIT_MESSAGE + ":"):
+                    with self.path_lock:
+                        self.credit_limit = int(line.split(":")[1])
+                    continue
                 print(line)
 
+    def reset_path_stream(self):
+        with self.path_lock:
+            self.sent_point_count = 0
+            self.credit_limit = 0
+            # The robot starts a new stream too, so the end of a line from the old connection is meaningless
+            self.partial_line = ""
+        self.send_message(PATH_RESET_MESSAGE)
+
+    def queue_point(self, point):
+        self.queue_path_entry(point)
+
+    def queue_pen_command(self, command):
+        self.queue_path_entry(command)
+
+    def queue_path_entry(self, entry):
+        with self.path_lock:
+            # Holding the mouse still repeats the same sample every frame
+            if entry == self.last_path_entry:
+                return
+            self.last_path_entry = entry
+            self.pending_path.append(entry)
+
+    def clear_path(self):
+        with self.path_lock:
+            self.pending_path.clear()
+            self.last_path_entry = None
+
+    def flush_path(self):
+        """
+        Sends as many pending points as the robot has given credits for, batched into PATH messages. Pen commands are
+        sent in order with the points around them. Entries only leave the queue once they are sent, so a send that fails
+        and resets the stream leaves them to be sent again after the reconnect.
+        """
+        with self.path_lock:
+            while self.pending_path:
+                entry = self.pending_path[0]
+                if not isinstance(entry, tuple):
+                    if not self.send_message(entry):
+                        return
+                    self.pending_path.pop(0)
+                    continue
+                batch = []
+                for entry in self.pending_path:
+                    if (not isinstance(entry, tuple) or len(batch) == MAX_PATH_POINTS_PER_MESSAGE
+                            or self.sent_point_count + len(batch) >= self.credit_limit):
+                        break
+                    batch.append(entry)
+                if not batch or not self.send_message(format_path(batch)):
+                    return
+                del self.pending_path[:len(batch)]
+                self.sent_point_count += len(batch)
+
     def send_message(self, message, end="\n"):
+        """
+        Returns:
+            bool: Whether the message was sent.
+        """
         if self.attempting_socket_connection or self.socket is None:
-            return  # No socket connected
+            return False  # No socket connected
         try:
             self.socket.sendall((str(message) + str(end)).encode())
         except (ConnectionResetError, BrokenPipeError):
             if not self.attempting_socket_connection:
                 print("[send_message]: Robot socket disconnected, attempting reconnect...")
                 self.attempt_connection()
+            return False
+        return True
 
     def get_messages(self):
         try:
@@ -184,22 +262,23 @@ def main():
                 print("Button press")
                 if click_position[1] >= PLOTTER_SIZE[1] / 2:
                     print("UP")
-                    network_handler.send_message("UP")
+                    network_handler.queue_pen_command("UP")
                     # points.append(UP)
                 elif PLOTTER_SIZE[1] / 2 > click_position[1] > 1:
                     print("DOWN")
-                    network_handler.send_message("DOWN")
+                    network_handler.queue_pen_command("DOWN")
                     # points.append(DOWN)
                 elif click_position[1] <= 1:
                     print("CLEAR")
                     network_handler.send_message("CLEAR")
+                    network_handler.clear_path()
                     points.clear()
             else:
                 if pygame.mouse.get_pressed()[0]:  # Left click
                     print("Left click at position:", click_position)
                     # if points and isinstance(points[-1], tuple) :
                     #     if abs(math.dist(points[-1], click_position)) >= 0:
-                    network_handler.send_message("GOTO:" + str(click_position[0]) + "|" + str(click_position[1]))
+                    network_handler.queue_point(click_position)
                     points.append(click_position)
                     # else:
                     #     points.append(click_position)
@@ -209,6 +288,7 @@ def main():
 
             render_path()
 
+        network_handler.flush_path()
         clock.tick(TARGET_FPS)
 
     network_handler.shutdown()
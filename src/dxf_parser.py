@@ -1,82 +1,357 @@
-def splitlines_custom(s, keepends=False):
+import math
+
+from hatch import DEFAULT_HATCH_ANGLE, DEFAULT_HATCH_SPACING, hatch_loops, read_hatch_loops
+from spatial_index import PointGrid
+from tessellation import DEFAULT_CHORD_TOLERANCE, TAU, flatten_spline, point_segment_distance, tessellate_arc, \
+    tessellate_bulge, tessellate_elliptical_arc, transform_points
+
+DEFAULT_CHUNK_SIZE = 4096
+DEFAULT_JOIN_TOLERANCE = 0.0001
+DEFAULT_SIMPLIFY_TOLERANCE = 0.005
+RAMER_DOUGLAS_PEUCKER = 'rdp'
+VISVALINGAM_WHYATT = 'vw'
+BLOCKS_SECTION = 'BLOCKS'
+ENTITIES_SECTION = 'ENTITIES'
+EXTRACTED_ENTITY_TYPES = ('LWPOLYLINE', 'SPLINE', 'LINE', 'ARC', 'CIRCLE', 'ELLIPSE', 'HATCH')
+# Entities that reuse group codes with different meanings, which also keep every group in order under 'groups'
+ORDERED_ENTITY_TYPES = ('HATCH',)
+BLOCK_ENTITY_TYPES = ('BLOCK', 'ENDBLK', 'INSERT')
+
+
+def iter_chunks(source, chunk_size=DEFAULT_CHUNK_SIZE):
     """
-    Splits the string `s` into a list of lines, breaking at line boundaries.
+    Reads a string or a text file object in fixed-size chunks.
 
     Args:
-        s (str): The string to split.
-        keepends (bool): If True, line breaks are included in the resulting list. Default is False.
+        source (str or file): The string to slice, or a file object opened in text mode.
+        chunk_size (int): The maximum number of characters per chunk.
 
-    Returns:
-        list: A list of lines.
-    """
-    lines = []
-    line = []
-
-    i = 0
-    while i < len(s):
-        if s[i] == '\n':
-            if keepends:
-                line.append(s[i])
-            lines.append(''.join(line))
-            line = []
-        elif s[i] == '\r':
-            if (i + 1 < len(s)) and (s[i + 1] == '\n'):
-                if keepends:
-                    line.append(s[i])
-                    line.append(s[i + 1])
-                lines.append(''.join(line))
-                line = []
-                i += 1  # Skip the '\n' in '\r\n'
-            else:
-                if keepends:
-                    line.append(s[i])
-                lines.append(''.join(line))
-                line = []
+    Yields:
+        str: The next chunk of the source, the last chunk may be shorter than chunk_size.
+    """
+    if isinstance(source, str):
+        for start in range(0, len(source), chunk_size):
+            yield source[start:start + chunk_size]
+        return
+
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_lines(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Lazily splits a string or a text file object into lines, breaking at "\\r\\n", "\\r" and "\\n".
+    Only one chunk and one partial line are held in memory at a time.
+
+    Args:
+        source (str or file): The string to split, or a file object opened in text mode.
+        chunk_size (int): The number of characters to read from the source at a time.
+
+    Yields:
+        str: The next line without its line break.
+    """
+    remainder = ""
+    for chunk in iter_chunks(source, chunk_size):
+        data = remainder + chunk
+        if data[-1] == '\r':
+            # The matching '\n' of a "\r\n" pair may be the first character of the next chunk
+            data, remainder = data[:-1], '\r'
         else:
-            line.append(s[i])
-        i += 1
+            remainder = ""
+        lines = data.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+        remainder = lines.pop() + remainder
+        for line in lines:
+            yield line
 
     # Add the last line if there is any content left
-    if line:
-        lines.append(''.join(line))
+    if remainder:
+        yield remainder.rstrip('\r')
+
+
+def read_group_codes(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Lazily reads the group code/value pairs that make up a DXF file.
+
+    Args:
+        source (str or file): The raw DXF content as a string, or a file object opened in text mode.
+        chunk_size (int): The number of characters to read from the source at a time.
+
+    Yields:
+        tuple: A (code, value) pair of stripped strings.
+    """
+    code = None
+    for line in iter_lines(source, chunk_size):
+        if code is None:
+            code = line.strip()
+        else:
+            yield code, line.strip()
+            code = None
+
+
+def simplify_ramer_douglas_peucker(points, tolerance=DEFAULT_SIMPLIFY_TOLERANCE):
+    """
+    Removes points from a polyline with the Ramer-Douglas-Peucker algorithm.
+    No point of the original polyline ends up further than tolerance from the simplified polyline.
+    This takes O(n log n) time on typical drawings, but can degrade towards O(n^2) on long, tightly oscillating
+    polylines, where simplify_visvalingam_whyatt is the better choice.
+
+    Args:
+        points (list): The (x, y) points of the polyline.
+        tolerance (float): The maximum deviation from the original polyline, in drawing units.
+
+    Returns:
+        list: The points that were kept, always including the first and last point.
+    """
+    if len(points) < 3:
+        return list(points)
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    # An explicit stack of (first, last) index ranges avoids recursion limits on long polylines
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        start_x, start_y = points[first]
+        dx = points[last][0] - start_x
+        dy = points[last][1] - start_y
+        length_squared = dx * dx + dy * dy
+        furthest_index = None
+        # Compare squared distances to keep square roots out of the inner loop
+        furthest_distance_squared = tolerance * tolerance
+        for index in range(first + 1, last):
+            px = points[index][0] - start_x
+            py = points[index][1] - start_y
+            if length_squared > 0:
+                t = (px * dx + py * dy) / length_squared
+                if t > 1:
+                    px -= dx
+                    py -= dy
+                elif t > 0:
+                    px -= t * dx
+                    py -= t * dy
+            distance_squared = px * px + py * py
+            if distance_squared > furthest_distance_squared:
+                furthest_index = index
+                furthest_distance_squared = distance_squared
+        if furthest_index is not None:
+            keep[furthest_index] = True
+            stack.append((first, furthest_index))
+            stack.append((furthest_index, last))
+
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def simplify_visvalingam_whyatt(points, tolerance=DEFAULT_SIMPLIFY_TOLERANCE):
+    """
+    Removes points from a polyline with the Visvalingam-Whyatt algorithm.
+    The point that deviates least from the segment joining its neighbours is removed first, until every remaining point
+    deviates by more than tolerance. Removals are ordered with a binary heap, so this runs in O(n log n).
 
-    return lines
+    Args:
+        points (list): The (x, y) points of the polyline.
+        tolerance (float): The maximum deviation of a removed point from the segment joining its remaining neighbours,
+            in drawing units.
+
+    Returns:
+        list: The points that were kept, always including the first and last point.
+    """
+    if len(points) < 3:
+        return list(points)
+
+    previous_indices = list(range(-1, len(points) - 1))
+    next_indices = list(range(1, len(points) + 1))
+    # The version of a point changes whenever its neighbours do, which marks its older heap entries as stale
+    versions = [0] * len(points)
+    removed = [False] * len(points)
+
+    heap = []
+    for index in range(1, len(points) - 1):
+        _heap_push(heap, (point_segment_distance(points[index], points[index - 1], points[index + 1]), index, 0))
+
+    while heap:
+        deviation, index, version = _heap_pop(heap)
+        if removed[index] or version != versions[index]:
+            continue
+        if deviation > tolerance:
+            break
+        removed[index] = True
+        previous_index = previous_indices[index]
+        next_index = next_indices[index]
+        next_indices[previous_index] = next_index
+        previous_indices[next_index] = previous_index
+        for neighbour in (previous_index, next_index):
+            if 0 < neighbour < len(points) - 1:
+                versions[neighbour] += 1
+                _heap_push(heap, (point_segment_distance(points[neighbour], points[previous_indices[neighbour]],
+                                                         points[next_indices[neighbour]]),
+                                  neighbour, versions[neighbour]))
+
+    return [point for point, was_removed in zip(points, removed) if not was_removed]
+
+
+def _heap_push(heap, item):
+    """
+    Adds an item to a binary min-heap stored in a list.
+    """
+    heap.append(item)
+    index = len(heap) - 1
+    while index > 0:
+        parent = (index - 1) // 2
+        if heap[parent] <= item:
+            break
+        heap[index] = heap[parent]
+        index = parent
+    heap[index] = item
+
+
+def _heap_pop(heap):
+    """
+    Removes and returns the smallest item of a binary min-heap stored in a list.
+    """
+    last_item = heap.pop()
+    if not heap:
+        return last_item
+    smallest_item = heap[0]
+    index = 0
+    while True:
+        child = 2 * index + 1
+        if child >= len(heap):
+            break
+        if child + 1 < len(heap) and heap[child + 1] < heap[child]:
+            child += 1
+        if last_item <= heap[child]:
+            break
+        heap[index] = heap[child]
+        index = child
+    heap[index] = last_item
+    return smallest_item
+
+
+def _get_float(entity, code, default=0.0):
+    """
+    Returns the first value of a group code of an entity as a float, or default if the entity does not have it.
+    """
+    values = entity.get(code)
+    return float(values[0]) if values else default
+
+
+def _get_layer(entity):
+    """
+    Returns the layer of an entity, entities without a layer (group code 8) are on layer '0'.
+    """
+    values = entity.get('8')
+    return values[0] if values else '0'
+
+
+def _get_point(entity, x_code, y_code):
+    """
+    Returns the first point stored in a pair of group codes of an entity as an (x, y) tuple.
+    """
+    return _get_float(entity, x_code), _get_float(entity, y_code)
+
+
+def _is_closed(line, tolerance):
+    """
+    Returns whether a line with more than two points ends where it starts.
+    """
+    return len(line) > 2 and abs(line[0][0] - line[-1][0]) <= tolerance and abs(line[0][1] - line[-1][1]) <= tolerance
+
+
+def _apply_extrusion(entity, points):
+    """
+    Converts points from an entity's object coordinate system to world coordinates.
+    Only flat drawings are supported, so the only extrusion direction that changes anything is (0, 0, -1),
+    which mirrors the X axis. Mirroring is common in exports from CAD packages that sketch on the back of a plane.
+    """
+    if _get_float(entity, '230', 1.0) < 0:
+        return [(-x, y) for x, y in points]
+    return points
 
 
 class DXFParser:
-    def __init__(self, dxf_content):
+    def __init__(self, dxf_content, chunk_size=DEFAULT_CHUNK_SIZE):
         """
         Initializes the DXFParser with the raw DXF content.
 
         Args:
-            dxf_content (str): The raw DXF content as a string.
+            dxf_content (str or file): The raw DXF content as a string, or a file object opened in text mode.
+                File objects are read lazily in chunks, so they can only be parsed once.
+            chunk_size (int): The number of characters to read from the DXF content at a time.
         """
         self.dxf_content = dxf_content
+        self.chunk_size = chunk_size
         self.entities = []
+        # Maps block names to their base points, flattened member lines and nested INSERT entities
+        self.blocks = {}
+        # Maps block names to the (layer, points) lines of the block, with nested inserts expanded
+        self.block_geometry = {}
 
-    def parse(self):
-        """
-        Parses the raw DXF content and stores the entities in a structured format.
+    def iter_entities(self, section=None, entity_types=None, layers=None):
         """
-        lines = splitlines_custom(self.dxf_content)
+        Lazily parses the raw DXF content, yielding one entity at a time.
+        Only the entity currently being read is held in memory, groups outside the requested section and entities
+        rejected by the filters are skipped without being stored.
+
+        Args:
+            section (str or tuple): The name of the section to read entities from, for example ENTITIES_SECTION,
+                or a tuple of names. If None, every group in the file is yielded, including the SECTION and ENDSEC
+                markers.
+            entity_types (collection): The entity types to yield, or None to yield every type.
+            layers (collection): The layer names to yield entities from, or None to yield entities from every layer.
+                Entities without a layer (group code 8) are on layer '0'.
 
-        current_entity = {}
-        i = 0
-        while i < len(lines):
-            code = lines[i].strip()
-            value = lines[i + 1].strip()
+        Yields:
+            dict: A dictionary mapping each group code of the entity to a list of its values, plus a 'type' key.
+                Entities in ORDERED_ENTITY_TYPES also have a 'groups' key, listing their (code, value) groups in order.
+        """
+        sections = (section,) if isinstance(section, str) else section
+        current_entity = {} if section is None else None
+        reading_section = section is None
+        reading_section_name = False
+        for code, value in read_group_codes(self.dxf_content, self.chunk_size):
             if code == '0':  # New entity
-                if current_entity:
-                    self.entities.append(current_entity)
-                current_entity = {'type': value}
-            else:
+                if current_entity and (layers is None or '8' in current_entity or '0' in layers):
+                    yield current_entity
+                current_entity = None
+                if section is not None and (value == 'SECTION' or value == 'ENDSEC'):
+                    # The name of a section is stored in the group directly after its SECTION marker
+                    reading_section = False
+                    reading_section_name = value == 'SECTION'
+                elif reading_section and (entity_types is None or value in entity_types):
+                    current_entity = {'type': value}
+                    if value in ORDERED_ENTITY_TYPES:
+                        current_entity['groups'] = []
+            elif current_entity is not None:
+                if code == '8' and layers is not None and value not in layers:
+                    # Stop storing entities on filtered layers as soon as their layer is known
+                    current_entity = None
+                    continue
                 if code not in current_entity:
                     current_entity[code] = []
+                if code == '42' and current_entity['type'] == 'LWPOLYLINE':
+                    # Bulges are only written for curved segments, pad them so that bulge i belongs to vertex i
+                    while len(current_entity['42']) < len(current_entity.get('10', ())) - 1:
+                        current_entity['42'].append('0')
                 current_entity[code].append(value)
-            i += 2
+                if 'groups' in current_entity:
+                    current_entity['groups'].append((code, value))
+            elif reading_section_name:
+                reading_section = code == '2' and value in sections
+                reading_section_name = False
 
-        if current_entity:
-            self.entities.append(current_entity)
+        if current_entity and (layers is None or '8' in current_entity or '0' in layers):
+            yield current_entity
+
+    def parse(self):
+        """
+        Parses the raw DXF content and stores the entities in a structured format.
+        This is only required for get_entities, extract_lines streams the entities directly from the DXF content.
+        """
+        for entity in self.iter_entities():
+            self.entities.append(entity)
 
     def get_entities(self):
         """
@@ -87,53 +362,301 @@ class DXFParser:
         """
         return self.entities
 
-    def extract_lines(self):
+    def extract_lines(self, layers=None, tolerance=DEFAULT_CHORD_TOLERANCE, hatch_spacing=DEFAULT_HATCH_SPACING,
+                      hatch_angle=DEFAULT_HATCH_ANGLE):
         """
-        Extracts line entities from the parsed DXF data.
+        Extracts line entities from the parsed DXF data, flattening curved entities into polylines and expanding
+        block references. If parse was not called, only the BLOCKS and ENTITIES sections are read, lazily,
+        straight from the DXF content.
+
+        Args:
+            layers (collection): The layer names to extract lines from, or None to extract lines from every layer.
+                Entities in a block on layer '0' take the layer of the INSERT that references the block.
+            tolerance (float): The maximum distance between a flattened curve and the real curve, in drawing units.
+            hatch_spacing (float): The distance between the lines filling HATCH entities, in drawing units,
+                or None to skip HATCH entities.
+            hatch_angle (float): The angle of the lines filling HATCH entities, in degrees.
 
         Returns:
             list: A list of line entities represented as lists of points.
         """
-        lines = []
-        for entity in self.entities:
-            if entity.get('type') == 'LWPOLYLINE':
-                num_points = int(entity.get('90')[0])
-                points = []
-                for i in range(num_points):
-                    x = float(entity.get('10')[i])
-                    y = float(entity.get('20')[i])
-                    points.append((x, y))
-                lines.append(points)
-        return lines
+        return list(self.iter_extracted_lines(layers, tolerance, hatch_spacing, hatch_angle))
+
+    def iter_extracted_lines(self, layers=None, tolerance=DEFAULT_CHORD_TOLERANCE,
+                             hatch_spacing=DEFAULT_HATCH_SPACING, hatch_angle=DEFAULT_HATCH_ANGLE):
+        """
+        Lazily extracts line entities like extract_lines, yielding the lines of each entity as soon as it is read,
+        so the start of a drawing can be processed before the rest of the file has been parsed.
+
+        Args:
+            layers (collection): The layer names to extract lines from, or None to extract lines from every layer.
+                Entities in a block on layer '0' take the layer of the INSERT that references the block.
+            tolerance (float): The maximum distance between a flattened curve and the real curve, in drawing units.
+            hatch_spacing (float): The distance between the lines filling HATCH entities, in drawing units,
+                or None to skip HATCH entities.
+            hatch_angle (float): The angle of the lines filling HATCH entities, in degrees.
+
+        Yields:
+            list: The points of each line entity.
+        """
+        if self.entities:
+            entities = self.entities
+        else:
+            entities = self.iter_entities((BLOCKS_SECTION, ENTITIES_SECTION),
+                                          EXTRACTED_ENTITY_TYPES + BLOCK_ENTITY_TYPES)
+
+        # Block members are flattened as soon as they are read, but only expanded into geometry when inserted
+        self.blocks = {}
+        self.block_geometry = {}
+        block = None
+        for entity in entities:
+            entity_type = entity.get('type')
+            if entity_type == 'BLOCK':
+                block = {'base': _get_point(entity, '10', '20'), 'lines': [], 'inserts': []}
+                self.blocks[entity.get('2', [''])[0]] = block
+            elif entity_type == 'ENDBLK':
+                block = None
+            elif block is not None:
+                if entity_type == 'INSERT':
+                    block['inserts'].append(entity)
+                else:
+                    layer = _get_layer(entity)
+                    for points in self._extract_entity_lines(entity, tolerance, hatch_spacing, hatch_angle):
+                        block['lines'].append((layer, points))
+            elif entity_type == 'INSERT':
+                for layer, points in self.expand_insert(entity):
+                    if layers is None or layer in layers:
+                        yield points
+            elif layers is None or _get_layer(entity) in layers:
+                for points in self._extract_entity_lines(entity, tolerance, hatch_spacing, hatch_angle):
+                    yield points
+
+    def _extract_entity_lines(self, entity, tolerance, hatch_spacing, hatch_angle):
+        """
+        Converts a single entity into the list of polylines it draws, HATCH entities draw their fill lines.
+        """
+        if entity.get('type') == 'HATCH':
+            if hatch_spacing is None:
+                return []
+            return hatch_loops(read_hatch_loops(entity.get('groups', ()), tolerance), hatch_spacing, hatch_angle)
+        points = self.extract_entity(entity, tolerance)
+        return [points] if points else []
+
+    def expand_insert(self, entity):
+        """
+        Produces the lines of every instance of the block an INSERT entity references.
+        The block's geometry is built once and reused, so each instance costs a single affine transform per point.
+
+        Args:
+            entity (dict): The INSERT entity.
+
+        Yields:
+            tuple: A (layer, points) pair for every line, where block members on layer '0' take the INSERT's layer.
+        """
+        name = entity.get('2', [''])[0]
+        block = self.blocks.get(name)
+        if block is None:
+            return
+        geometry = self.block_geometry.get(name)
+        if geometry is None:
+            # Mark the block as being built first, so a block that references itself expands to nothing
+            self.block_geometry[name] = []
+            geometry = list(block['lines'])
+            for insert in block['inserts']:
+                geometry.extend(self.expand_insert(insert))
+            self.block_geometry[name] = geometry
+
+        layer = _get_layer(entity)
+        insert_x, insert_y = _get_point(entity, '10', '20')
+        base_x, base_y = block['base']
+        scale_x = _get_float(entity, '41', 1.0)
+        scale_y = _get_float(entity, '42', 1.0)
+        rotation = _get_float(entity, '50') * math.pi / 180
+        cos = math.cos(rotation)
+        sin = math.sin(rotation)
+        # Mirror the X axis for inserts extruded along -Z, like _apply_extrusion
+        mirror = -1 if _get_float(entity, '230', 1.0) < 0 else 1
+        column_spacing = _get_float(entity, '44')
+        row_spacing = _get_float(entity, '45')
+
+        for column in range(max(int(_get_float(entity, '70', 1.0)), 1)):
+            for row in range(max(int(_get_float(entity, '71', 1.0)), 1)):
+                # Array offsets are in the rotated but unscaled coordinate system of the insert
+                local_x = column * column_spacing - base_x * scale_x
+                local_y = row * row_spacing - base_y * scale_y
+                transform = (mirror * cos * scale_x, -mirror * sin * scale_y,
+                             mirror * (insert_x + cos * local_x - sin * local_y),
+                             sin * scale_x, cos * scale_y, insert_y + sin * local_x + cos * local_y)
+                for member_layer, points in geometry:
+                    yield layer if member_layer == '0' else member_layer, transform_points(points, transform)
+
+    @staticmethod
+    def extract_entity(entity, tolerance=DEFAULT_CHORD_TOLERANCE):
+        """
+        Converts a single entity into a polyline, flattening curves.
+
+        Args:
+            entity (dict): The entity, one of EXTRACTED_ENTITY_TYPES.
+            tolerance (float): The maximum distance between a flattened curve and the real curve, in drawing units.
+
+        Returns:
+            list: The points of the polyline, or None if the entity type is not supported.
+        """
+        entity_type = entity.get('type')
+        if entity_type == 'LWPOLYLINE':
+            return DXFParser.extract_lwpolyline(entity, tolerance)
+        if entity_type == 'SPLINE':
+            return DXFParser.extract_spline(entity, tolerance)
+        if entity_type == 'LINE':
+            return [_get_point(entity, '10', '20'), _get_point(entity, '11', '21')]
+        if entity_type == 'ARC':
+            start_angle = _get_float(entity, '50') * math.pi / 180
+            sweep = (_get_float(entity, '51') * math.pi / 180 - start_angle) % TAU or TAU
+            return _apply_extrusion(entity, tessellate_arc(_get_point(entity, '10', '20'), _get_float(entity, '40'),
+                                                           start_angle, sweep, tolerance))
+        if entity_type == 'CIRCLE':
+            return _apply_extrusion(entity, tessellate_arc(_get_point(entity, '10', '20'), _get_float(entity, '40'),
+                                                           0.0, TAU, tolerance))
+        if entity_type == 'ELLIPSE':
+            start_parameter = _get_float(entity, '41')
+            sweep = (_get_float(entity, '42', TAU) - start_parameter) % TAU or TAU
+            if _get_float(entity, '230', 1.0) < 0:
+                # The center and major axis are already in world coordinates, but the minor axis is the extrusion
+                # direction times the major axis, so it flips to the other side and the parameters run clockwise
+                start_parameter = -start_parameter
+                sweep = -sweep
+            return tessellate_elliptical_arc(_get_point(entity, '10', '20'), _get_point(entity, '11', '21'),
+                                             _get_float(entity, '40', 1.0), start_parameter, sweep, tolerance)
+        return None
+
+    @staticmethod
+    def extract_lwpolyline(entity, tolerance=DEFAULT_CHORD_TOLERANCE):
+        """
+        Converts an LWPOLYLINE entity into a polyline, tessellating bulged segments into arcs.
+
+        Args:
+            entity (dict): The LWPOLYLINE entity.
+            tolerance (float): The maximum distance between a tessellated bulge and the real arc, in drawing units.
+
+        Returns:
+            list: The points of the polyline, ending with the first point again if the polyline is closed.
+        """
+        num_points = int(entity.get('90')[0])
+        vertices = []
+        for i in range(num_points):
+            x = float(entity.get('10')[i])
+            y = float(entity.get('20')[i])
+            vertices.append((x, y))
+
+        bulges = entity.get('42', ())
+        closed = int(entity.get('70', ['0'])[0]) & 1
+        segment_count = num_points if closed else num_points - 1
+        if not bulges and not closed:
+            return _apply_extrusion(entity, vertices)
+
+        points = vertices[:1]
+        for i in range(segment_count):
+            end = vertices[(i + 1) % num_points]
+            bulge = float(bulges[i]) if i < len(bulges) else 0.0
+            if bulge:
+                points.extend(tessellate_bulge(vertices[i], end, bulge, tolerance)[1:])
+            else:
+                points.append(end)
+        return _apply_extrusion(entity, points)
+
+    @staticmethod
+    def extract_spline(entity, tolerance=DEFAULT_CHORD_TOLERANCE):
+        """
+        Flattens a SPLINE entity into a polyline.
+        Splines defined only by fit points are approximated by the polyline through their fit points.
+
+        Args:
+            entity (dict): The SPLINE entity.
+            tolerance (float): The maximum distance between the polyline and the spline, in drawing units.
+
+        Returns:
+            list: The points of the polyline.
+        """
+        control_points = [(float(x), float(y)) for x, y in zip(entity.get('10', []), entity.get('20', []))]
+        if not control_points:
+            return [(float(x), float(y)) for x, y in zip(entity.get('11', []), entity.get('21', []))]
 
-    def combine_lines(self, lines):
+        degree = int(entity.get('71', ['3'])[0])
+        knots = [float(knot) for knot in entity.get('40', [])]
+        weights = [float(weight) for weight in entity.get('41', [])] or None
+        if len(knots) != len(control_points) + degree + 1:
+            # Without a valid knot vector the control polygon is the best available approximation
+            return control_points
+        return flatten_spline(degree, knots, control_points, weights, tolerance)
+
+    def combine_lines(self, lines, tolerance=DEFAULT_JOIN_TOLERANCE):
         """
         Combines lines whose endpoints touch and stores all points of each combined line.
+        Lines are reversed where that allows a join, and endpoints closer than tolerance are treated as touching.
+        Endpoints are indexed in a PointGrid, so chaining takes linear time in the number of lines.
 
         Args:
             lines (list): A list of line entities represented as lists of points.
+            tolerance (float): The largest difference in x or y between two endpoints that still join, in drawing units.
 
         Returns:
             list: A list of lists where each inner list contains the points of a combined line.
         """
+        # Endpoint i * 2 is the start of line i, and endpoint i * 2 + 1 is its end
+        endpoints = []
+        for line in lines:
+            endpoints.append(line[0])
+            endpoints.append(line[-1])
+        endpoint_grid = PointGrid(endpoints)
+
+        used = [False] * len(lines)
         combined_lines = []
-        while lines:
-            line = lines.pop(0)
-            combined = True
-            while combined:
-                combined = False
-                for other_line in lines:
-                    if line[-1] == other_line[0]:
-                        # Combine lines by extending the current line
-                        line.extend(other_line[1:])
-                        lines.remove(other_line)
-                        combined = True
-                        break
-                    elif line[0] == other_line[-1]:
-                        # Combine lines by extending the current line in the opposite direction
-                        line = other_line[:-1] + line
-                        lines.remove(other_line)
-                        combined = True
+        for index, line in enumerate(lines):
+            if used[index]:
+                continue
+            used[index] = True
+            endpoint_grid.remove(index * 2)
+            endpoint_grid.remove(index * 2 + 1)
+            line = list(line)
+
+            # Extend the end of the line, then reverse it and extend the other end the same way
+            for _ in range(2):
+                while not _is_closed(line, tolerance):
+                    x, y = line[-1]
+                    touching = endpoint_grid.within_rect((x - tolerance, y - tolerance, x + tolerance, y + tolerance))
+                    if not touching:
                         break
+                    endpoint_id = touching[0]
+                    other_index = endpoint_id // 2
+                    used[other_index] = True
+                    endpoint_grid.remove(other_index * 2)
+                    endpoint_grid.remove(other_index * 2 + 1)
+                    other_line = lines[other_index]
+                    if endpoint_id % 2:
+                        # The other line ends where this one ends, so it has to be walked backwards
+                        line.extend(other_line[-2::-1])
+                    else:
+                        line.extend(other_line[1:])
+                line.reverse()
             combined_lines.append(line)
         return combined_lines
+
+    def simplify_lines(self, lines, tolerance=DEFAULT_SIMPLIFY_TOLERANCE, method=RAMER_DOUGLAS_PEUCKER):
+        """
+        Removes nearly collinear points from lines, so that the plotter makes fewer stop-and-go moves.
+
+        Args:
+            lines (list): A list of line entities represented as lists of points.
+            tolerance (float): The maximum deviation from the original lines, in drawing units.
+            method (str): RAMER_DOUGLAS_PEUCKER or VISVALINGAM_WHYATT.
+
+        Returns:
+            list: A list of lists where each inner list contains the points of a simplified line.
+        """
+        if method == VISVALINGAM_WHYATT:
+            simplify = simplify_visvalingam_whyatt
+        elif method == RAMER_DOUGLAS_PEUCKER:
+            simplify = simplify_ramer_douglas_peucker
+        else:
+            raise ValueError("Unknown simplification method: " + str(method))
+        return [simplify(line, tolerance) for line in lines]
@@ -1,17 +1,21 @@
 from dxf_parser import DXFParser
+from stroke_arrays import StrokeArrays
 
 
 if __name__ == "__main__":
-    # Example raw DXF content (normally, you would read this from a file or another source)
-    raw_dxf_content = open("../deploy/evans_drawing.dxf", "r").read()
-    # Create parser and parse the content
-    dxf_parser = DXFParser(raw_dxf_content)
-    dxf_parser.parse()
+    # Stream the DXF content directly from the file
+    with open("../deploy/evans_drawing.dxf", "r") as dxf_file:
+        dxf_parser = DXFParser(dxf_file)
+        lines = dxf_parser.extract_lines()
 
-    lines = dxf_parser.extract_lines()
     combined_lines = dxf_parser.combine_lines(lines)
     print(str(combined_lines).replace("],", "],\n"))
 
+    # Measure the drawing with the vectorised host-side geometry
+    stroke_arrays = StrokeArrays.from_strokes(combined_lines)
+    print(f"{len(stroke_arrays)} strokes, {len(stroke_arrays.points)} points, bounds {stroke_arrays.bounds()}, "
+          f"drawn length {stroke_arrays.lengths().sum():.3f}")
+
     # Print all points of each combined line
     # for line_points in combined_lines:
     #     print(line_points)
@@ -0,0 +1,133 @@
+DEFAULT_OUTPUT_LIMIT = 1.0
+# How quickly the integral unwinds while the output is saturated, per second
+DEFAULT_ANTI_WINDUP_GAIN = 10.0
+
+
+class FeedforwardController:
+    """
+    A position controller that drives most of the output from the planned motion and only corrects the error with
+    feedback. The output is kS * sign(velocity) + kV * velocity + kA * acceleration, from the velocity and acceleration
+    setpoints, plus PID feedback on the position error. When a measured velocity is given, the derivative term acts on
+    the velocity error instead of the change in position error.
+
+    The output is saturated to a limit. While it is saturated, the integral is wound back by the amount the output was
+    cut (back-calculation), so it never builds up beyond what the output can act on. If the output is cut further after
+    the update, for example to keep several axes in proportion, apply_output winds the integral back by that cut too.
+    """
+
+    def __init__(self, kp=1.0, ki=0.0, kd=0.0, ks=0.0, kv=0.0, ka=0.0, output_limit=DEFAULT_OUTPUT_LIMIT,
+                 anti_windup_gain=DEFAULT_ANTI_WINDUP_GAIN, clock=None):
+        """
+        Initializes the FeedforwardController.
+
+        Args:
+            kp (float): The proportional gain, on the position error.
+            ki (float): The integral gain, on the position error.
+            kd (float): The derivative gain, on the velocity error.
+            ks (float): The output needed to overcome static friction, in the direction of the velocity setpoint.
+            kv (float): The output per unit of velocity setpoint.
+            ka (float): The output per unit of acceleration setpoint.
+            output_limit (float): The largest absolute output.
+            anti_windup_gain (float): How quickly the integral unwinds while the output is saturated, per second.
+            clock (callable): A function returning the current time in seconds, defaults to VEXLib's time.time.
+        """
+        if clock is None:
+            from VEXLib.Util import time
+            clock = time.time
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.ks = ks
+        self.kv = kv
+        self.ka = ka
+        self.output_limit = output_limit
+        self.anti_windup_gain = anti_windup_gain
+        self.clock = clock
+        self.setpoint = 0.0
+        self.velocity_setpoint = 0.0
+        self.acceleration_setpoint = 0.0
+        # The integral term, in output units, so changing ki does not make the output jump
+        self.integral = 0.0
+        self.previous_error = None
+        self.previous_time = None
+        self.time_step = 0.0
+        self.output = 0.0
+
+    def set_target(self, position, velocity=0.0, acceleration=0.0):
+        """
+        Sets the planned position, velocity and acceleration to follow.
+
+        Args:
+            position (float): The position setpoint.
+            velocity (float): The velocity setpoint, in position units per second.
+            acceleration (float): The acceleration setpoint, in position units per second squared.
+        """
+        self.setpoint = position
+        self.velocity_setpoint = velocity
+        self.acceleration_setpoint = acceleration
+
+    def feedforward(self):
+        """
+        Returns:
+            float: The output the planned motion needs on its own, without feedback.
+        """
+        static = 0.0
+        if self.velocity_setpoint > 0:
+            static = self.ks
+        elif self.velocity_setpoint < 0:
+            static = -self.ks
+        return static + self.kv * self.velocity_setpoint + self.ka * self.acceleration_setpoint
+
+    def reset(self):
+        """
+        Clears the integral and the derivative history, for example after the axis was stopped.
+        """
+        self.integral = 0.0
+        self.previous_error = None
+        self.previous_time = None
+        self.time_step = 0.0
+        self.output = 0.0
+
+    def update(self, current_value, current_velocity=None):
+        """
+        Calculates the output for the latest measurement.
+
+        Args:
+            current_value (float): The measured position.
+            current_velocity (float): The measured velocity, or None to differentiate the position error instead.
+
+        Returns:
+            float: The saturated output.
+        """
+        now = self.clock()
+        time_step = 0.0 if self.previous_time is None else now - self.previous_time
+        self.previous_time = now
+        self.time_step = time_step
+
+        error = self.setpoint - current_value
+        if current_velocity is not None:
+            error_derivative = self.velocity_setpoint - current_velocity
+        elif self.previous_error is not None and time_step > 0:
+            error_derivative = (error - self.previous_error) / time_step
+        else:
+            error_derivative = 0.0
+        self.previous_error = error
+
+        unsaturated = self.feedforward() + self.kp * error + self.integral + self.kd * error_derivative
+        self.output = max(-self.output_limit, min(self.output_limit, unsaturated))
+        if self.ki != 0:
+            # Back-calculation: feed the amount the output was cut back into the integral
+            self.integral += (self.ki * error + self.anti_windup_gain * (self.output - unsaturated)) * time_step
+        return self.output
+
+    def apply_output(self, output):
+        """
+        Tells the controller the output that was actually applied, when it was cut further after update. The integral
+        is wound back by the extra cut, the same way as for the controller's own limit.
+
+        Args:
+            output (float): The applied output.
+        """
+        if self.ki != 0:
+            self.integral += self.anti_windup_gain * (output - self.output) * self.time_step
+        self.output = output
@@ -0,0 +1,296 @@
+import math
+
+from tessellation import DEFAULT_CHORD_TOLERANCE, flatten_spline, tessellate_bulge, tessellate_elliptical_arc
+
+# The distance between fill lines and their angle, in drawing units and degrees
+DEFAULT_HATCH_SPACING = 0.04
+DEFAULT_HATCH_ANGLE = 45.0
+
+LINE_EDGE = 1
+ARC_EDGE = 2
+ELLIPSE_EDGE = 3
+SPLINE_EDGE = 4
+POLYLINE_PATH_FLAG = 2
+
+
+class _GroupCursor:
+    """
+    Reads an ordered list of (code, value) groups front to back.
+    HATCH entities reuse group codes with different meanings in different places, so they cannot be read by code alone.
+    """
+
+    def __init__(self, groups):
+        self.groups = groups
+        self.position = 0
+
+    def read(self, code, default=None):
+        """
+        Returns the value of the next group and moves past it if it has the given code, otherwise returns default.
+        """
+        if self.position < len(self.groups) and self.groups[self.position][0] == code:
+            self.position += 1
+            return self.groups[self.position - 1][1]
+        return default
+
+    def read_float(self, code, default=0.0):
+        value = self.read(code)
+        return float(value) if value is not None else default
+
+    def read_int(self, code, default=0):
+        value = self.read(code)
+        return int(value) if value is not None else default
+
+    def read_point(self, x_code='10', y_code='20'):
+        return self.read_float(x_code), self.read_float(y_code)
+
+    def skip_to(self, code):
+        """
+        Moves to the next group with the given code.
+
+        Returns:
+            bool: Whether a group with the code was found.
+        """
+        while self.position < len(self.groups):
+            if self.groups[self.position][0] == code:
+                return True
+            self.position += 1
+        return False
+
+
+def _read_polyline_path(cursor, tolerance):
+    has_bulges = cursor.read_int('72')
+    cursor.read('73')
+    vertices = []
+    bulges = []
+    for _ in range(cursor.read_int('93')):
+        vertices.append(cursor.read_point())
+        bulges.append(cursor.read_float('42') if has_bulges else 0.0)
+
+    points = vertices[:1]
+    for i in range(len(vertices)):
+        end = vertices[(i + 1) % len(vertices)]
+        if bulges[i]:
+            points.extend(tessellate_bulge(vertices[i], end, bulges[i], tolerance)[1:])
+        else:
+            points.append(end)
+    return points
+
+
+def _read_edge(cursor, tolerance):
+    edge_type = cursor.read_int('72')
+    if edge_type == LINE_EDGE:
+        return [cursor.read_point(), cursor.read_point('11', '21')]
+
+    if edge_type == ARC_EDGE or edge_type == ELLIPSE_EDGE:
+        center = cursor.read_point()
+        if edge_type == ARC_EDGE:
+            major_axis = (cursor.read_float('40'), 0.0)
+            ratio = 1.0
+        else:
+            major_axis = cursor.read_point('11', '21')
+            ratio = cursor.read_float('40', 1.0)
+        start_angle = cursor.read_float('50')
+        end_angle = cursor.read_float('51', 360.0)
+        counterclockwise = cursor.read_int('73', 1)
+        if not counterclockwise:
+            # Clockwise edges store the complements of their angles
+            start_angle, end_angle = 360.0 - end_angle, 360.0 - start_angle
+        # Ellipse edges store real angles, not the parameters tessellate_elliptical_arc takes
+        start_parameter = math.atan2(math.sin(start_angle * math.pi / 180) / ratio,
+                                     math.cos(start_angle * math.pi / 180))
+        end_parameter = math.atan2(math.sin(end_angle * math.pi / 180) / ratio, math.cos(end_angle * math.pi / 180))
+        sweep = (end_parameter - start_parameter) % (2 * math.pi)
+        if sweep == 0 and end_angle != start_angle:
+            sweep = 2 * math.pi
+        points = tessellate_elliptical_arc(center, major_axis, ratio, start_parameter, sweep, tolerance)
+        if not counterclockwise:
+            points.reverse()
+        return points
+
+    if edge_type == SPLINE_EDGE:
+        degree = cursor.read_int('94', 3)
+        rational = cursor.read_int('73')
+        cursor.read('74')
+        knot_count = cursor.read_int('95')
+        control_point_count = cursor.read_int('96')
+        knots = [cursor.read_float('40') for _ in range(knot_count)]
+        control_points = []
+        weights = []
+        for _ in range(control_point_count):
+            control_points.append(cursor.read_point())
+            if rational:
+                weights.append(cursor.read_float('42', 1.0))
+        fit_points = [cursor.read_point('11', '21') for _ in range(cursor.read_int('97'))]
+        cursor.read('12')
+        cursor.read('22')
+        cursor.read('13')
+        cursor.read('23')
+        if len(knots) != len(control_points) + degree + 1:
+            return fit_points or control_points
+        return flatten_spline(degree, knots, control_points, weights or None, tolerance)
+
+    return []
+
+
+def read_hatch_loops(groups, tolerance=DEFAULT_CHORD_TOLERANCE):
+    """
+    Reads the boundary loops of a HATCH entity, flattening curved edges into polylines.
+
+    Args:
+        groups (list): The (code, value) groups of the entity, in file order.
+        tolerance (float): The maximum distance between a flattened curve and the real curve, in drawing units.
+
+    Returns:
+        list: The loops, each a list of (x, y) points. Loops are implicitly closed.
+    """
+    cursor = _GroupCursor(groups)
+    if not cursor.skip_to('91'):
+        return []
+    loops = []
+    for _ in range(cursor.read_int('91')):
+        if not cursor.skip_to('92'):
+            break
+        if cursor.read_int('92') & POLYLINE_PATH_FLAG:
+            points = _read_polyline_path(cursor, tolerance)
+        else:
+            points = []
+            for _ in range(cursor.read_int('93')):
+                edge_points = _read_edge(cursor, tolerance)
+                if points and edge_points and points[-1] == edge_points[0]:
+                    edge_points = edge_points[1:]
+                points.extend(edge_points)
+        if len(points) > 1 and points[0] == points[-1]:
+            points.pop()
+        if len(points) > 2:
+            loops.append(points)
+    return loops
+
+
+def _reachable_edges(loop, edge, low_y, high_y):
+    """
+    Walks along a loop in both directions from an edge, through vertices between two scanlines.
+
+    Returns:
+        list: (edge, vertices) pairs for every edge reached, where vertices are the loop vertices walked through.
+    """
+    reachable = [(edge, [])]
+    vertex_count = len(loop)
+    for step in (1, -1):
+        vertices = []
+        # Walking forwards from edge k passes vertex k + 1, walking backwards passes vertex k
+        vertex = (edge + 1) % vertex_count if step == 1 else edge
+        for _ in range(vertex_count - 1):
+            if not low_y <= loop[vertex][1] <= high_y:
+                break
+            vertices = vertices + [loop[vertex]]
+            reachable.append((vertex if step == 1 else (vertex - 1) % vertex_count, vertices))
+            vertex = (vertex + step) % vertex_count
+    return reachable
+
+
+def hatch_loops(loops, spacing=DEFAULT_HATCH_SPACING, angle=DEFAULT_HATCH_ANGLE):
+    """
+    Fills the area enclosed by loops with parallel lines, using the even-odd rule.
+
+    Edges are sorted once into an edge table, and each scanline only intersects the active edges that span it,
+    so filling takes O(n log n) time in the number of edges plus the size of the output.
+    Lines on neighbouring scanlines are joined in a zig-zag through the boundary between them wherever possible,
+    so the pen stays down from one row to the next.
+
+    Args:
+        loops (list): The boundary loops, each a list of (x, y) points, implicitly closed.
+        spacing (float): The distance between fill lines, in drawing units.
+        angle (float): The angle of the fill lines, in degrees counterclockwise from the X axis.
+
+    Returns:
+        list: The fill strokes, each a list of (x, y) points.
+    """
+    if spacing <= 0:
+        raise ValueError("Hatch spacing must be positive, got " + str(spacing))
+    cos = math.cos(angle * math.pi / 180)
+    sin = math.sin(angle * math.pi / 180)
+    # Rotate the loops so the fill lines run along the X axis
+    loops = [[(x * cos + y * sin, y * cos - x * sin) for x, y in loop] for loop in loops]
+
+    # Edges are (min y, max y, x at min y, dx/dy, loop index, edge index) tuples, horizontal edges never cross a row
+    edges = []
+    for loop_index, loop in enumerate(loops):
+        for edge_index in range(len(loop)):
+            x0, y0 = loop[edge_index]
+            x1, y1 = loop[(edge_index + 1) % len(loop)]
+            if y0 == y1:
+                continue
+            if y0 > y1:
+                x0, y0, x1, y1 = x1, y1, x0, y0
+            edges.append((y0, y1, x0, (x1 - x0) / (y1 - y0), loop_index, edge_index))
+    edges.sort()
+
+    strokes = []
+    # The strokes that reached the previous row, as (stroke, crossing) pairs where the crossing is the
+    # (x, y, loop index, edge index) point the stroke left that row at
+    open_strokes = []
+    active_edges = []
+    next_edge = 0
+    row = None
+    previous_y = None
+    while next_edge < len(edges) or active_edges:
+        if not active_edges:
+            # Skip straight to the first row that crosses the next edge, rows run between multiples of spacing
+            first_row = int(math.ceil(edges[next_edge][0] / spacing - 0.5))
+            row = first_row if row is None else max(row, first_row)
+            open_strokes = []
+        y = (row + 0.5) * spacing
+        row += 1
+        while next_edge < len(edges) and edges[next_edge][0] <= y:
+            active_edges.append(edges[next_edge])
+            next_edge += 1
+        # Edges span [min y, max y), so a vertex shared by two edges is only crossed once
+        active_edges = [edge for edge in active_edges if edge[1] > y]
+        crossings = sorted((edge[2] + (y - edge[0]) * edge[3], y, edge[4], edge[5]) for edge in active_edges)
+
+        # Index the boundary edges each open stroke can reach without leaving the boundary, by the shortest walk
+        reachable = {}
+        for stroke_index, (stroke, exit_crossing) in enumerate(open_strokes):
+            loop = loops[exit_crossing[2]]
+            for edge_index, vertices in _reachable_edges(loop, exit_crossing[3], previous_y, y):
+                key = (exit_crossing[2], edge_index)
+                if key not in reachable or len(vertices) < len(reachable[key][1]):
+                    reachable[key] = (stroke_index, vertices)
+        previous_y = y
+
+        spans = []
+        for i in range(0, len(crossings) - 1, 2):
+            if crossings[i + 1][0] > crossings[i][0]:
+                spans.append((crossings[i], crossings[i + 1]))
+
+        # Continue strokes into the spans they reach with the shortest walks along the boundary first
+        candidates = []
+        for span_index, (left, right) in enumerate(spans):
+            for entry, other_end in ((right, left), (left, right)):
+                match = reachable.get((entry[2], entry[3]))
+                if match is not None:
+                    candidates.append((len(match[1]), span_index, match[0], entry, other_end, match[1]))
+        candidates.sort(key=lambda candidate: candidate[:3])
+
+        continued = [False] * len(open_strokes)
+        span_joined = [False] * len(spans)
+        next_open_strokes = []
+        for _, span_index, stroke_index, entry, other_end, vertices in candidates:
+            if continued[stroke_index] or span_joined[span_index]:
+                continue
+            continued[stroke_index] = True
+            span_joined[span_index] = True
+            stroke = open_strokes[stroke_index][0]
+            stroke.extend(vertices)
+            stroke.append(entry[:2])
+            stroke.append(other_end[:2])
+            next_open_strokes.append((stroke, other_end))
+        for span_index, (left, right) in enumerate(spans):
+            if not span_joined[span_index]:
+                stroke = [left[:2], right[:2]]
+                strokes.append(stroke)
+                next_open_strokes.append((stroke, right))
+        open_strokes = next_open_strokes
+
+    # Rotate the strokes back
+    return [[(x * cos - y * sin, x * sin + y * cos) for x, y in stroke] for stroke in strokes]
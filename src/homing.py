@@ -0,0 +1,186 @@
+import json
+
+# An axis is stalled against its hard stop once it moves slower than this, in percent of the motors' top speed. It has
+# to be well below the speed the axis homes at, which is about 20% for an 18:1 axis driven at 3 V, so axes driven more
+# gently need a lower threshold of their own.
+DEFAULT_STALL_VELOCITY = 5.0
+# ... and draws at least this much current, in amps, if a current threshold is given
+DEFAULT_STALL_CURRENT = None
+# How long the stall has to last before it counts, so a momentary slow down is not taken for the hard stop, in seconds
+DEFAULT_STALL_DEBOUNCE = 0.1
+# How long after starting to ignore the axis while the motors spin up from a standstill, in seconds. An axis driven at
+# 3 V is up to speed in about 0.1 s, and axes driven at a lower voltage take longer.
+DEFAULT_SPIN_UP_TIME = 0.2
+DEFAULT_HOMING_TIMEOUT = 10.0
+HOMING_POLL_INTERVAL = 0.02
+
+DEFAULT_CALIBRATION_PATH = 'deploy/calibration.json'
+# The encoder reading given to the hard stop after homing. Motors read 0 when they power up, which is then far from any
+# reading of a homed axis, so a calibration can never be mistaken for valid after a power cycle.
+HOMED_ENCODER_POSITION = 36000.0
+# How far a motor may have moved since the calibration was saved for it to still be valid, in degrees
+DEFAULT_SIGNATURE_TOLERANCE = 5.0
+
+
+class StallDetector:
+    """
+    Detects an axis stalling against its hard stop from its velocity, and optionally its current, with a debounce.
+    The thresholds depend on how hard the axis is driven while homing, so each axis gets its own detector.
+    """
+
+    def __init__(self, velocity_threshold=DEFAULT_STALL_VELOCITY, current_threshold=DEFAULT_STALL_CURRENT,
+                 debounce_time=DEFAULT_STALL_DEBOUNCE, spin_up_time=DEFAULT_SPIN_UP_TIME, clock=None):
+        """
+        Initializes the StallDetector.
+
+        Args:
+            velocity_threshold (float): The speed below which the axis may be stalled.
+            current_threshold (float): The current above which the axis may be stalled, or None to only use the speed.
+            debounce_time (float): How long the stall has to last, in seconds.
+            spin_up_time (float): How long after start to ignore the axis, in seconds.
+            clock (callable): A function returning the current time in seconds, defaults to VEXLib's time.time.
+        """
+        if clock is None:
+            from VEXLib.Util import time
+            clock = time.time
+        self.velocity_threshold = velocity_threshold
+        self.current_threshold = current_threshold
+        self.debounce_time = debounce_time
+        self.spin_up_time = spin_up_time
+        self.clock = clock
+        self.start_time = None
+        self.stall_start_time = None
+        self.stalled = False
+
+    def start(self):
+        """
+        Starts watching the axis, call this as it starts moving towards the hard stop.
+        """
+        self.start_time = self.clock()
+        self.stall_start_time = None
+        self.stalled = False
+
+    def update(self, velocity, current=None):
+        """
+        Checks the axis for a stall.
+
+        Args:
+            velocity (float): The speed of the axis.
+            current (float): The current drawn by the axis, or None if it is not measured.
+
+        Returns:
+            bool: Whether the axis has stalled. Once stalled, it stays stalled until started again.
+        """
+        if self.stalled:
+            return True
+        now = self.clock()
+        if self.start_time is None:
+            self.start_time = now
+        if now - self.start_time < self.spin_up_time:
+            return False
+        slow = abs(velocity) < self.velocity_threshold
+        straining = self.current_threshold is None or current is None or current >= self.current_threshold
+        if not (slow and straining):
+            self.stall_start_time = None
+            return False
+        if self.stall_start_time is None:
+            self.stall_start_time = now
+        self.stalled = now - self.stall_start_time >= self.debounce_time
+        return self.stalled
+
+
+def home_axes(axes, clock=None, sleep=None, timeout=DEFAULT_HOMING_TIMEOUT, poll_interval=HOMING_POLL_INTERVAL):
+    """
+    Drives every axis against its hard stop at the same time, finishing each one as soon as it stalls.
+
+    Args:
+        axes (list): A (start, read, finish, detector) tuple for each axis. start() drives the axis towards its stop,
+            read() returns its (velocity, current), finish(homed) stops it and is told whether it reached its stop,
+            and detector is the axis' StallDetector.
+        clock (callable): A function returning the current time in seconds, defaults to VEXLib's time.time.
+        sleep (callable): A function sleeping for a number of seconds, defaults to VEXLib's time.sleep.
+        timeout (float): How long to wait for every axis to stall, in seconds.
+        poll_interval (float): How long to wait between checks, in seconds.
+
+    Returns:
+        bool: Whether every axis reached its stop.
+    """
+    if clock is None or sleep is None:
+        from VEXLib.Util import time
+        clock = clock or time.time
+        sleep = sleep or time.sleep
+    for start, _, _, detector in axes:
+        start()
+        detector.start()
+    start_time = clock()
+    homing = list(axes)
+    while homing:
+        if clock() - start_time > timeout:
+            for _, _, finish, _ in homing:
+                finish(False)
+            return False
+        sleep(poll_interval)
+        for axis in list(homing):
+            _, read, finish, detector = axis
+            velocity, current = read()
+            if detector.update(velocity, current):
+                finish(True)
+                homing.remove(axis)
+    return True
+
+
+def load_calibration(path=DEFAULT_CALIBRATION_PATH):
+    """
+    Loads a calibration saved by save_calibration.
+
+    Args:
+        path (str): The path of the calibration file.
+
+    Returns:
+        dict: The 'offsets' and 'positions' of the calibration, or None if nothing was saved or the file is damaged.
+    """
+    try:
+        with open(path, 'r') as file:
+            calibration = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(calibration, dict) or 'offsets' not in calibration or 'positions' not in calibration:
+        return None
+    return calibration
+
+
+def save_calibration(offsets, positions, path=DEFAULT_CALIBRATION_PATH):
+    """
+    Saves the homed encoder offsets together with the encoder readings they are valid for.
+
+    Args:
+        offsets (dict): Maps encoder names to the reading at the axis' hard stop.
+        positions (dict): Maps encoder names to their current reading, the signature that has to match on restart.
+        path (str): The path of the calibration file.
+    """
+    with open(path, 'w') as file:
+        json.dump({'offsets': offsets, 'positions': positions}, file)
+
+
+def calibration_valid(calibration, positions, tolerance=DEFAULT_SIGNATURE_TOLERANCE):
+    """
+    Checks whether a saved calibration still holds, which it does if no encoder has moved or been reset since it was
+    saved.
+
+    Args:
+        calibration (dict): The calibration returned by load_calibration, or None.
+        positions (dict): Maps encoder names to their current reading.
+        tolerance (float): How far each reading may be from the saved one.
+
+    Returns:
+        bool: Whether the calibration can be used instead of homing.
+    """
+    if calibration is None:
+        return False
+    saved_positions = calibration['positions']
+    for name, position in positions.items():
+        if name not in saved_positions or name not in calibration['offsets']:
+            return False
+        if abs(position - saved_positions[name]) > tolerance:
+            return False
+    return True
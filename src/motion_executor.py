@@ -0,0 +1,315 @@
+import math
+
+from motion_planner import DEFAULT_ACCELERATION, DEFAULT_JUNCTION_DEVIATION, DEFAULT_LOOKAHEAD, DEFAULT_MAX_SPEED, \
+    junction_speed, next_speed, plan_speeds
+
+# How close the tool has to get to the end of a move it stops at before the next segment starts, in inches
+DEFAULT_MOVE_TOLERANCE = 0.05
+# How long to wait for the pen to reach the paper or lift off it before moving again, in seconds, when neither the
+# segment nor the set_pen callback says how long
+DEFAULT_PEN_DWELL = 1.0
+DEFAULT_TRAVEL_SPEED = 0.75
+DEFAULT_DRAW_SPEED = 0.5
+# How far the tool may fall behind the setpoint before the setpoint waits for it, in inches
+DEFAULT_MAX_FOLLOWING_ERROR = 0.1
+# The longest time a single step advances the motion by, so a late tick does not make the setpoint jump, in seconds
+MAX_TIME_STEP = 0.05
+
+# Move the tool in a straight line to a point
+SEGMENT_MOVE = 0
+# Lower or raise the pen, then wait for it to settle
+SEGMENT_PEN = 1
+
+
+class MotionExecutor:
+    """
+    Moves the tool through a queue of segments without blocking, so the robot keeps ticking while it plots.
+    Each call to step advances the motion by a single control step, so it is meant to be called once per periodic tick.
+    The hardware is reached through callbacks, the executor only decides what to do next.
+
+    Moves are followed as a moving setpoint with a trapezoidal velocity profile. Each move is parameterised by the
+    distance along it, so a single feed rate is commanded along the line and split into the velocity of each axis,
+    which keeps the axes coordinated and the line straight. Before each move, the planner looks ahead through the
+    queued moves up to the next pen change, so the tool flows through shallow corners instead of stopping at every
+    vertex. The tool only comes to a stop before pen changes and at the end of the queue.
+    """
+
+    def __init__(self, get_position, drive, stop, set_pen, clock=None, tolerance=DEFAULT_MOVE_TOLERANCE,
+                 max_speed=DEFAULT_MAX_SPEED, acceleration=DEFAULT_ACCELERATION,
+                 junction_deviation=DEFAULT_JUNCTION_DEVIATION, lookahead=DEFAULT_LOOKAHEAD,
+                 max_following_error=DEFAULT_MAX_FOLLOWING_ERROR):
+        """
+        Initializes the MotionExecutor.
+
+        Args:
+            get_position (callable): Returns the current (x, y) position of the tool.
+            drive (callable): Takes a setpoint (x, y) position, the (x, y) velocity of the setpoint in inches per
+                second and its (x, y) acceleration in inches per second squared, and runs one control step towards it.
+            stop (callable): Stops every axis.
+            set_pen (callable): Takes True to lower the pen or False to raise it, and may return how long to wait
+                before moving again, in seconds.
+            clock (callable): A function returning the current time in seconds, defaults to VEXLib's time.time.
+            tolerance (float): How close the tool has to get to the end of a move it stops at, in inches.
+            max_speed (float): The speed of a move with a speed scale of 1, in inches per second.
+            acceleration (float): The acceleration limit, in inches per second squared.
+            junction_deviation (float): How far the tool may cut inside a corner, in inches,
+                or None to stop at every vertex.
+            lookahead (int): The largest number of queued moves to plan over.
+            max_following_error (float): How far the tool may lag behind the setpoint before the setpoint stops
+                advancing to let it catch up, in inches.
+        """
+        if clock is None:
+            from VEXLib.Util import time
+            clock = time.time
+        self.get_position = get_position
+        self.drive = drive
+        self.stop = stop
+        self.set_pen = set_pen
+        self.clock = clock
+        self.tolerance = tolerance
+        self.max_speed = max_speed
+        self.acceleration = acceleration
+        self.junction_deviation = junction_deviation
+        self.lookahead = lookahead
+        self.max_following_error = max_following_error
+        self.segments = []
+        self.current = None
+        self.current_start_time = 0.0
+        # How long the pen change in progress waits before the next segment starts
+        self.current_dwell = 0.0
+        self.last_step_time = None
+        self.moving = False
+        self.completed_count = 0
+
+        # The moving setpoint, its speed along the current move, and how far along the move it is
+        self.command_position = None
+        self.command_speed = 0.0
+        self.current_origin = None
+        self.current_length = 0.0
+        self.current_direction = (0.0, 0.0)
+        self.current_distance = 0.0
+        self.current_exit_speed = 0.0
+        # How far the setpoint overshot the end of the last move it flowed through, carried into the next move
+        self.carried_distance = 0.0
+
+    def enqueue_move(self, target, speed=DEFAULT_TRAVEL_SPEED):
+        """
+        Adds a straight move to the end of the queue.
+
+        Args:
+            target (tuple): The (x, y) position to move to, in inches.
+            speed (float): The speed scale of the move, from 0 to 1.
+        """
+        self.segments.append((SEGMENT_MOVE, (target[0], target[1]), speed))
+
+    def enqueue_pen(self, down, dwell=None):
+        """
+        Adds a pen change to the end of the queue. The tool stops and stays still until the pen has settled.
+
+        Args:
+            down (bool): True to lower the pen, False to raise it.
+            dwell (float): How long to wait after changing the pen, in seconds, or None to wait as long as set_pen
+                returns.
+        """
+        self.segments.append((SEGMENT_PEN, down, dwell))
+
+    def enqueue_stroke(self, stroke, travel_speed=DEFAULT_TRAVEL_SPEED, draw_speed=DEFAULT_DRAW_SPEED,
+                       dwell=None):
+        """
+        Adds the segments that draw a stroke: travel to its start, lower the pen, trace it, then raise the pen.
+
+        Args:
+            stroke (list): The (x, y) points of the stroke.
+            travel_speed (float): The speed scale of the move to the start of the stroke.
+            draw_speed (float): The speed scale while the pen is down.
+            dwell (float): How long to wait after each pen change, in seconds, or None to wait as long as set_pen
+                returns.
+        """
+        self.enqueue_move(stroke[0], travel_speed)
+        self.enqueue_pen(True, dwell)
+        for point in stroke[1:]:
+            self.enqueue_move(point, draw_speed)
+        self.enqueue_pen(False, dwell)
+
+    def cancel(self):
+        """
+        Drops every queued segment, including the one in progress, and stops the axes where they are.
+        The pen is left as it is.
+        """
+        self.segments = []
+        self.current = None
+        self.moving = False
+        self.command_speed = 0.0
+        self.carried_distance = 0.0
+        self.stop()
+
+    def is_idle(self):
+        """
+        Returns:
+            bool: Whether every queued segment has finished.
+        """
+        return self.current is None and not self.segments
+
+    def queued_count(self):
+        """
+        Returns:
+            int: The number of segments that have not finished, including the one in progress.
+        """
+        return len(self.segments) + (self.current is not None)
+
+    def get_progress(self):
+        """
+        Measures how far through its queue the executor is.
+
+        Returns:
+            tuple: The number of finished segments, the total number of segments enqueued, and the fraction of the
+                segment in progress that is done, from 0 to 1.
+        """
+        fraction = 0.0
+        if self.current is not None:
+            if self.current[0] == SEGMENT_MOVE:
+                if self.current_length > 0:
+                    fraction = min(1.0, self.current_distance / self.current_length)
+            elif self.current_dwell > 0:
+                fraction = min(1.0, (self.clock() - self.current_start_time) / self.current_dwell)
+        return self.completed_count, self.completed_count + self.queued_count(), fraction
+
+    def step(self):
+        """
+        Runs one control step, moving on to the next segment as soon as the current one finishes.
+        """
+        now = self.clock()
+        time_step = 0.0 if self.last_step_time is None else min(now - self.last_step_time, MAX_TIME_STEP)
+        self.last_step_time = now
+        while True:
+            if self.current is None:
+                if not self.segments:
+                    if self.moving:
+                        self.stop()
+                        self.moving = False
+                    return
+                self._start(self.segments.pop(0))
+
+            if self.current[0] == SEGMENT_PEN:
+                if now - self.current_start_time < self.current_dwell:
+                    return
+            elif not self._advance(time_step):
+                return
+            # Time spent on a move the setpoint flowed out of is not spent again on the next one
+            time_step = 0.0
+            self.completed_count += 1
+            self.current = None
+
+    def _start(self, segment):
+        self.current = segment
+        self.current_start_time = self.clock()
+        if segment[0] == SEGMENT_PEN:
+            # The pen only moves with the tool standing still
+            if self.moving:
+                self.stop()
+                self.moving = False
+            self.command_speed = 0.0
+            settle_time = self.set_pen(segment[1])
+            if segment[2] is not None:
+                self.current_dwell = segment[2]
+            elif settle_time is not None:
+                self.current_dwell = settle_time
+            else:
+                self.current_dwell = DEFAULT_PEN_DWELL
+            return
+
+        # Moves continue from the setpoint while the tool is following one, otherwise from where the tool is
+        if not self.moving or self.command_position is None:
+            self.command_position = self.get_position()
+            self.command_speed = 0.0
+        self.current_origin = self.command_position
+        target = segment[1]
+        dx = target[0] - self.current_origin[0]
+        dy = target[1] - self.current_origin[1]
+        self.current_length = math.sqrt(dx * dx + dy * dy)
+        if self.current_length > 0:
+            self.current_direction = (dx / self.current_length, dy / self.current_length)
+        self.current_distance = self.carried_distance
+        self.carried_distance = 0.0
+        self.current_exit_speed = self._plan_exit_speed()
+
+    def _plan_exit_speed(self):
+        """
+        Plans the speed the setpoint should leave the current move at, from the moves queued behind it.
+        """
+        lengths = [self.current_length]
+        cruise_speeds = [self.current[2] * self.max_speed]
+        junction_speeds = []
+        direction = self.current_direction
+        position = self.current[1]
+        for segment in self.segments[:self.lookahead - 1]:
+            if segment[0] != SEGMENT_MOVE:
+                break
+            dx = segment[1][0] - position[0]
+            dy = segment[1][1] - position[1]
+            length = math.sqrt(dx * dx + dy * dy)
+            if length == 0:
+                continue
+            next_direction = (dx / length, dy / length)
+            if self.junction_deviation is None or self.current_length == 0:
+                junction_speeds.append(0.0)
+            else:
+                junction_speeds.append(junction_speed(direction, next_direction, self.acceleration,
+                                                      self.junction_deviation))
+            lengths.append(length)
+            cruise_speeds.append(segment[2] * self.max_speed)
+            direction = next_direction
+            position = segment[1]
+        # Planning from a standstill at the end of the lookahead keeps the tool able to stop in time
+        speeds = plan_speeds(lengths, cruise_speeds, junction_speeds, self.acceleration, self.command_speed)
+        return speeds[1]
+
+    def _advance(self, time_step):
+        """
+        Moves the setpoint along the current move by one time step and drives the tool after it.
+
+        Returns:
+            bool: Whether the move is finished.
+        """
+        target = self.current[1]
+        if self.moving and _distance(self.get_position(), self.command_position) > self.max_following_error:
+            # Hold the setpoint where it is until the tool catches up, so the axes stay on the line between them.
+            # The setpoint stands still, so no feedforward pushes the tool past it, and it speeds up again from a stop.
+            self.command_speed = 0.0
+            self.drive(self.command_position, (0.0, 0.0), (0.0, 0.0))
+            return False
+        distance_left = self.current_length - self.current_distance
+        speed = next_speed(self.command_speed, distance_left, self.current_exit_speed,
+                           self.current[2] * self.max_speed, self.acceleration, time_step)
+        distance = (self.command_speed + speed) / 2 * time_step
+        acceleration = (speed - self.command_speed) / time_step if time_step > 0 else 0.0
+        self.command_speed = speed
+        if distance < distance_left:
+            self.current_distance += distance
+            self.command_position = (self.current_origin[0] + self.current_direction[0] * self.current_distance,
+                                     self.current_origin[1] + self.current_direction[1] * self.current_distance)
+            self.drive(self.command_position, (self.current_direction[0] * speed, self.current_direction[1] * speed),
+                       (self.current_direction[0] * acceleration, self.current_direction[1] * acceleration))
+            self.moving = True
+            return False
+
+        self.current_distance = self.current_length
+        self.command_position = target
+        if self.current_exit_speed > 0:
+            # Flow straight into the next move without waiting for the tool to catch up
+            self.carried_distance = distance - distance_left
+            self.command_speed = min(speed, self.current_exit_speed)
+            return True
+        # Moves that end in a stop wait for the tool to settle on the target
+        self.command_speed = 0.0
+        if _distance(self.get_position(), target) >= self.tolerance:
+            self.drive(target, (0.0, 0.0), (0.0, 0.0))
+            self.moving = True
+            return False
+        return True
+
+
+def _distance(point1, point2):
+    dx = point1[0] - point2[0]
+    dy = point1[1] - point2[1]
+    return math.sqrt(dx * dx + dy * dy)
@@ -0,0 +1,152 @@
+import math
+
+# The top speed of the tool, in inches per second, moves ask for a fraction of it
+DEFAULT_MAX_SPEED = 3.0
+# How quickly the tool speeds up and slows down, in inches per second squared
+DEFAULT_ACCELERATION = 6.0
+# How far the tool may cut inside a corner it takes without stopping, in inches
+DEFAULT_JUNCTION_DEVIATION = 0.005
+# The number of queued moves the planner looks through when deciding how fast to leave a vertex
+DEFAULT_LOOKAHEAD = 16
+
+
+def junction_speed(direction, next_direction, acceleration, deviation=DEFAULT_JUNCTION_DEVIATION):
+    """
+    Calculates the fastest the tool can pass through a corner, by fitting a circular arc that stays within deviation
+    of the corner and limiting the centripetal acceleration around it.
+
+    Args:
+        direction (tuple): The unit (x, y) direction of the move into the corner.
+        next_direction (tuple): The unit (x, y) direction of the move out of the corner.
+        acceleration (float): The acceleration limit, in inches per second squared.
+        deviation (float): How far the arc may be from the corner, in inches.
+
+    Returns:
+        float: The speed limit, in inches per second. Straight junctions are unlimited, reversals have to stop.
+    """
+    # The cosine of the angle between the reversed incoming direction and the outgoing direction
+    cos_theta = -(direction[0] * next_direction[0] + direction[1] * next_direction[1])
+    if cos_theta > 0.999999:
+        return 0.0
+    if cos_theta < -0.999999:
+        return float('inf')
+    sin_half_theta = math.sqrt(0.5 * (1 - cos_theta))
+    return math.sqrt(acceleration * deviation * sin_half_theta / (1 - sin_half_theta))
+
+
+def plan_speeds(lengths, cruise_speeds, junction_speeds, acceleration, entry_speed=0.0, exit_speed=0.0):
+    """
+    Plans the speed at every vertex of a run of moves, so that each move follows a trapezoidal velocity profile that
+    never breaks the acceleration limit. A backward pass makes sure the tool can always slow down in time for the
+    vertices ahead, then a forward pass limits each vertex to what the tool can speed up to.
+
+    Args:
+        lengths (list): The length of each move, in inches.
+        cruise_speeds (list): The top speed of each move, in inches per second.
+        junction_speeds (list): The speed limit of the vertex between each move and the next, one fewer than moves.
+        acceleration (float): The acceleration limit, in inches per second squared.
+        entry_speed (float): The speed of the tool at the start of the first move.
+        exit_speed (float): The speed the tool has to be at by the end of the last move.
+
+    Returns:
+        list: The speed at each vertex, from the start of the first move to the end of the last.
+    """
+    move_count = len(lengths)
+    speeds = [0.0] * (move_count + 1)
+    speeds[move_count] = exit_speed
+    for vertex in range(move_count - 1, 0, -1):
+        limit = min(junction_speeds[vertex - 1], cruise_speeds[vertex - 1], cruise_speeds[vertex])
+        speeds[vertex] = min(limit, math.sqrt(speeds[vertex + 1] ** 2 + 2 * acceleration * lengths[vertex]))
+    speeds[0] = entry_speed
+    for vertex in range(1, move_count + 1):
+        reachable_speed = math.sqrt(speeds[vertex - 1] ** 2 + 2 * acceleration * lengths[vertex - 1])
+        speeds[vertex] = min(speeds[vertex], reachable_speed)
+    return speeds
+
+
+def next_speed(speed, distance_left, exit_speed, cruise_speed, acceleration, time_step):
+    """
+    Steps a trapezoidal velocity profile forward in time: the tool speeds up towards the cruise speed, and slows down
+    as late as it can while still reaching the exit speed by the end of the move.
+
+    Args:
+        speed (float): The current speed, in inches per second.
+        distance_left (float): The distance to the end of the move, in inches.
+        exit_speed (float): The speed the tool has to be at by the end of the move.
+        cruise_speed (float): The top speed of the move.
+        acceleration (float): The acceleration limit, in inches per second squared.
+        time_step (float): The time to step forward, in seconds.
+
+    Returns:
+        float: The speed at the end of the time step.
+    """
+    braking_speed = math.sqrt(exit_speed * exit_speed + 2 * acceleration * max(distance_left, 0.0))
+    return min(cruise_speed, speed + acceleration * time_step, braking_speed)
+
+
+def limit_axis_speeds(speeds, limit):
+    """
+    Scales the speeds of every axis down by the same factor until none is faster than the limit.
+    Clamping each axis on its own would change the direction the tool moves in, and bend straight lines into dog-legs.
+
+    Args:
+        speeds (list): The speed of each axis, in any unit.
+        limit (float): The largest speed any axis may have, in the same unit.
+
+    Returns:
+        list: The scaled speeds.
+    """
+    largest = 0.0
+    for speed in speeds:
+        if abs(speed) > largest:
+            largest = abs(speed)
+    if largest <= limit:
+        return list(speeds)
+    scale = limit / largest
+    return [speed * scale for speed in speeds]
+
+
+def plot_time(points, cruise_speed, acceleration=DEFAULT_ACCELERATION, deviation=DEFAULT_JUNCTION_DEVIATION,
+              time_step=0.02):
+    """
+    Estimates how long the planner takes to follow a polyline from a standstill to a standstill.
+
+    Args:
+        points (list): The (x, y) points of the polyline, in inches.
+        cruise_speed (float): The top speed, in inches per second.
+        acceleration (float): The acceleration limit, in inches per second squared.
+        deviation (float): The junction deviation, in inches, or None to stop at every vertex.
+        time_step (float): The control period to simulate, in seconds.
+
+    Returns:
+        float: The time, in seconds.
+    """
+    lengths = []
+    directions = []
+    for start, end in zip(points, points[1:]):
+        length = math.sqrt((end[0] - start[0]) ** 2 + (end[1] - start[1]) ** 2)
+        if length > 0:
+            lengths.append(length)
+            directions.append(((end[0] - start[0]) / length, (end[1] - start[1]) / length))
+    if deviation is None:
+        junctions = [0.0] * (len(lengths) - 1)
+    else:
+        junctions = [junction_speed(directions[i], directions[i + 1], acceleration, deviation)
+                     for i in range(len(lengths) - 1)]
+    speeds = plan_speeds(lengths, [cruise_speed] * len(lengths), junctions, acceleration)
+
+    elapsed = 0.0
+    speed = 0.0
+    distance = 0.0
+    for index, length in enumerate(lengths):
+        while length - distance > 1e-9:
+            new_speed = next_speed(speed, length - distance, speeds[index + 1], cruise_speed, acceleration, time_step)
+            step = (speed + new_speed) / 2 * time_step
+            if step <= 0:
+                break
+            distance += step
+            speed = min(new_speed, speeds[index + 1]) if distance >= length else new_speed
+            elapsed += time_step
+        # The distance covered past the end of a move counts towards the next one
+        distance = max(distance - length, 0.0)
+    return elapsed
@@ -0,0 +1,270 @@
+import math
+
+from spatial_index import PointGrid
+
+DEFAULT_TIME_BUDGET = 2.0
+DEFAULT_CLOSED_TOLERANCE = 0.0001
+MAX_OR_OPT_SEGMENT_LENGTH = 3
+
+
+def _distance(point1, point2):
+    dx = point1[0] - point2[0]
+    dy = point1[1] - point2[1]
+    return math.sqrt(dx * dx + dy * dy)
+
+
+def travel_distance(strokes, start=(0, 0), end=None):
+    """
+    Calculates the distance the tool travels with the pen up while plotting strokes in order.
+
+    Args:
+        strokes (list): The strokes to plot, each a list of (x, y) points.
+        start (tuple): The (x, y) position of the tool before the first stroke.
+        end (tuple): The (x, y) position the tool returns to after the last stroke, or None if it stays put.
+
+    Returns:
+        float: The total pen-up travel distance.
+    """
+    distance = 0.0
+    position = start
+    for stroke in strokes:
+        distance += _distance(position, stroke[0])
+        position = stroke[-1]
+    if end is not None:
+        distance += _distance(position, end)
+    return distance
+
+
+class TravelOptimizer:
+    """
+    Reorders strokes to minimise the distance travelled with the pen up.
+    A greedy nearest neighbour tour is built first, then improved with 2-opt and Or-opt moves until no move helps
+    or the time budget runs out. Strokes may be reversed, and closed loops may start at any of their vertices.
+    """
+
+    def __init__(self, start=(0, 0), end=(0, 0), time_budget=DEFAULT_TIME_BUDGET, clock=None,
+                 closed_tolerance=DEFAULT_CLOSED_TOLERANCE):
+        """
+        Initializes the TravelOptimizer.
+
+        Args:
+            start (tuple): The (x, y) position of the tool before the first stroke.
+            end (tuple): The (x, y) position the tool returns to after the last stroke, or None if it stays put.
+            time_budget (float): The maximum time to spend improving the greedy tour, in seconds.
+            clock (callable): A function returning the current time in seconds, defaults to VEXLib's time.time.
+            closed_tolerance (float): How close the ends of a stroke must be for it to count as a closed loop.
+        """
+        if clock is None:
+            from VEXLib.Util import time
+            clock = time.time
+        self.start = start
+        self.end = end
+        self.time_budget = time_budget
+        self.clock = clock
+        self.closed_tolerance = closed_tolerance
+        self.travel_before = 0.0
+        self.travel_after = 0.0
+
+    def optimize(self, strokes):
+        """
+        Reorders strokes to minimise pen-up travel, and records the travel distance before and after.
+
+        Args:
+            strokes (list): The strokes to plot, each a list of (x, y) points.
+
+        Returns:
+            list: The reordered strokes, some of which may be reversed or start at a different vertex.
+        """
+        deadline = self.clock() + self.time_budget
+        self.travel_before = travel_distance(strokes, self.start, self.end)
+        if not strokes:
+            self.travel_after = self.travel_before
+            return []
+
+        closed = [len(stroke) > 2 and _distance(stroke[0], stroke[-1]) <= self.closed_tolerance for stroke in strokes]
+        tour = self._nearest_neighbour_tour(strokes, closed)
+
+        improved = True
+        while improved and self.clock() < deadline:
+            improved = self._two_opt(tour, deadline)
+            improved = self._or_opt(tour, deadline) or improved
+        self._choose_loop_starts(strokes, closed, tour)
+
+        ordered_strokes = [self._materialize(strokes[item[0]], closed[item[0]], item) for item in tour]
+        self.travel_after = travel_distance(ordered_strokes, self.start, self.end)
+        if self.travel_after > self.travel_before:
+            # The greedy tour can lose to a drawing that was already laid out well
+            self.travel_after = self.travel_before
+            return list(strokes)
+        return ordered_strokes
+
+    def _nearest_neighbour_tour(self, strokes, closed):
+        """
+        Builds a tour by repeatedly plotting the stroke whose entry point is nearest to the tool.
+        Tour items are [stroke index, entry point, exit point, reversed, start vertex] lists.
+        """
+        # Open strokes can be entered from either end, closed loops from any of their vertices
+        entry_points = []
+        entry_strokes = []
+        entry_vertices = []
+        entry_offsets = [0]
+        for index, stroke in enumerate(strokes):
+            if closed[index]:
+                vertices = range(len(stroke) - 1)
+            else:
+                vertices = (0, len(stroke) - 1)
+            for vertex in vertices:
+                entry_points.append(stroke[vertex])
+                entry_strokes.append(index)
+                entry_vertices.append(vertex)
+            entry_offsets.append(len(entry_points))
+        grid = PointGrid(entry_points)
+
+        tour = []
+        position = self.start
+        for _ in range(len(strokes)):
+            entry = grid.nearest(position)
+            index = entry_strokes[entry]
+            # Entering a stroke uses it up, along with all of its other entry points
+            for other_entry in range(entry_offsets[index], entry_offsets[index + 1]):
+                grid.remove(other_entry)
+
+            point = entry_points[entry]
+            vertex = entry_vertices[entry]
+            stroke = strokes[index]
+            if closed[index]:
+                tour.append([index, point, point, False, vertex])
+            elif vertex == 0:
+                tour.append([index, point, stroke[-1], False, 0])
+            else:
+                tour.append([index, point, stroke[0], True, 0])
+            position = tour[-1][2]
+        return tour
+
+    def _exit_before(self, tour, position):
+        return tour[position - 1][2] if position > 0 else self.start
+
+    def _entry_after(self, tour, position):
+        if position < len(tour) - 1:
+            return tour[position + 1][1]
+        return self.end
+
+    def _gap(self, point, other_point):
+        # Travel to or from a missing end point is free
+        if point is None or other_point is None:
+            return 0.0
+        return _distance(point, other_point)
+
+    def _two_opt(self, tour, deadline):
+        """
+        Reverses runs of strokes in the tour wherever that shortens travel.
+
+        Returns:
+            bool: Whether the tour was improved.
+        """
+        improved = False
+        for first in range(len(tour) - 1):
+            if self.clock() >= deadline:
+                break
+            previous_exit = self._exit_before(tour, first)
+            for last in range(first + 1, len(tour)):
+                next_entry = self._entry_after(tour, last)
+                change = (self._gap(previous_exit, tour[last][2]) + self._gap(tour[first][1], next_entry) -
+                          self._gap(previous_exit, tour[first][1]) - self._gap(tour[last][2], next_entry))
+                if change < -1e-9:
+                    tour[first:last + 1] = [_reverse_item(item) for item in reversed(tour[first:last + 1])]
+                    improved = True
+        return improved
+
+    def _or_opt(self, tour, deadline):
+        """
+        Moves runs of up to MAX_OR_OPT_SEGMENT_LENGTH strokes, optionally reversed, to wherever they shorten travel.
+
+        Returns:
+            bool: Whether the tour was improved.
+        """
+        improved = False
+        for length in range(1, MAX_OR_OPT_SEGMENT_LENGTH + 1):
+            first = 0
+            while first + length <= len(tour):
+                if self.clock() >= deadline:
+                    return improved
+                last = first + length - 1
+                previous_exit = self._exit_before(tour, first)
+                next_entry = self._entry_after(tour, last)
+                removal_gain = (self._gap(previous_exit, tour[first][1]) + self._gap(tour[last][2], next_entry) -
+                                self._gap(previous_exit, next_entry))
+
+                best_change = -1e-9
+                best_insertion = None
+                for insertion in range(len(tour) + 1):
+                    # Insert between tour[insertion - 1] and tour[insertion], outside of the moved run
+                    if first <= insertion <= last + 1:
+                        continue
+                    before = self._exit_before(tour, insertion)
+                    after = tour[insertion][1] if insertion < len(tour) else self.end
+                    base = self._gap(before, after)
+                    forward = self._gap(before, tour[first][1]) + self._gap(tour[last][2], after) - base
+                    backward = self._gap(before, tour[last][2]) + self._gap(tour[first][1], after) - base
+                    for reverse, insertion_cost in ((False, forward), (True, backward)):
+                        if insertion_cost - removal_gain < best_change:
+                            best_change = insertion_cost - removal_gain
+                            best_insertion = (insertion, reverse)
+
+                if best_insertion is None:
+                    first += 1
+                    continue
+                insertion, reverse = best_insertion
+                segment = tour[first:last + 1]
+                if reverse:
+                    segment = [_reverse_item(item) for item in reversed(segment)]
+                if insertion > last:
+                    tour[insertion:insertion] = segment
+                    del tour[first:last + 1]
+                else:
+                    del tour[first:last + 1]
+                    tour[insertion:insertion] = segment
+                improved = True
+        return improved
+
+    def _choose_loop_starts(self, strokes, closed, tour):
+        """
+        Moves the start of every closed loop to the vertex closest to the strokes plotted before and after it.
+        """
+        for position, item in enumerate(tour):
+            if not closed[item[0]]:
+                continue
+            previous_exit = self._exit_before(tour, position)
+            next_entry = self._entry_after(tour, position)
+            stroke = strokes[item[0]]
+            best_vertex = item[4]
+            best_cost = self._gap(previous_exit, stroke[best_vertex]) + self._gap(stroke[best_vertex], next_entry)
+            for vertex in range(len(stroke) - 1):
+                cost = self._gap(previous_exit, stroke[vertex]) + self._gap(stroke[vertex], next_entry)
+                if cost < best_cost:
+                    best_vertex = vertex
+                    best_cost = cost
+            item[1] = item[2] = stroke[best_vertex]
+            item[4] = best_vertex
+
+    @staticmethod
+    def _materialize(stroke, closed, item):
+        """
+        Builds the list of points of a stroke in the direction and from the start vertex chosen for it.
+        """
+        reverse = item[3]
+        if closed:
+            start_vertex = item[4]
+            stroke = stroke[start_vertex:-1] + stroke[:start_vertex] + [stroke[start_vertex]]
+        else:
+            stroke = list(stroke)
+        if reverse:
+            stroke.reverse()
+        return stroke
+
+
+def _reverse_item(item):
+    """
+    Returns a tour item for the same stroke plotted in the opposite direction.
+    """
+    return [item[0], item[2], item[1], not item[3], item[4]]
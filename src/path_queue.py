@@ -0,0 +1,138 @@
+# The number of path points the robot buffers, which is also how many points the host may send ahead of the plotter
+DEFAULT_PATH_QUEUE_SIZE = 64
+# The most points the host puts in a single PATH message, to keep each line short
+MAX_PATH_POINTS_PER_MESSAGE = 16
+
+PATH_MESSAGE = "PATH"
+PATH_RESET_MESSAGE = "PATH_RESET"
+CREDIT_MESSAGE = "CREDIT"
+
+# Queue entries are either an (x, y) point or one of these pen changes
+PATH_PEN_UP = 0
+PATH_PEN_DOWN = 1
+
+
+def format_path(points):
+    """
+    Formats points as a PATH message, "PATH:x|y;x|y;...".
+
+    Args:
+        points (list): The (x, y) points.
+
+    Returns:
+        str: The message.
+    """
+    return PATH_MESSAGE + ":" + ";".join([str(point[0]) + "|" + str(point[1]) for point in points])
+
+
+def parse_path(message):
+    """
+    Reads the points of a PATH message.
+
+    Args:
+        message (str): The message, as formatted by format_path.
+
+    Returns:
+        list: The (x, y) points.
+
+    Raises:
+        ValueError: If a point is not a pair of numbers.
+    """
+    points = []
+    for point in message.split(":", 1)[-1].split(";"):
+        if not point:
+            continue
+        x, y = point.split("|")
+        points.append((float(x), float(y)))
+    return points
+
+
+class PathQueue:
+    """
+    Buffers points streamed from the host until the motion executor has room for them, with credit-based flow control.
+
+    Credits are counted cumulatively: the robot tells the host the total number of points it may have sent so far,
+    which is the number of points taken out of the queue plus the size of the queue. The host never sends past that
+    limit, so the queue cannot overflow, and a lost or repeated CREDIT message is corrected by the next one.
+    Pen changes travel in the same queue, in order with the points around them, and do not use up credits.
+    """
+
+    def __init__(self, capacity=DEFAULT_PATH_QUEUE_SIZE):
+        """
+        Initializes the PathQueue.
+
+        Args:
+            capacity (int): The number of points buffered.
+        """
+        self.capacity = capacity
+        self.reset()
+
+    def reset(self):
+        """
+        Drops every entry and starts counting credits from zero, for when the host starts a new stream.
+        """
+        self.entries = []
+        self.point_count = 0
+        self.taken_count = 0
+
+    def clear(self):
+        """
+        Drops every entry, counting the dropped points as taken so the host's credits stay in step.
+        """
+        self.taken_count += self.point_count
+        self.entries = []
+        self.point_count = 0
+
+    def add_points(self, points):
+        """
+        Adds points to the end of the queue. Points past the capacity, which a host that respects its credits never
+        sends, are dropped.
+
+        Args:
+            points (list): The (x, y) points.
+
+        Returns:
+            int: The number of points added.
+        """
+        added = 0
+        for point in points:
+            if self.point_count >= self.capacity:
+                break
+            self.entries.append(point)
+            self.point_count += 1
+            added += 1
+        return added
+
+    def add_pen(self, down):
+        """
+        Adds a pen change to the end of the queue.
+
+        Args:
+            down (bool): True to lower the pen, False to raise it.
+        """
+        self.entries.append(PATH_PEN_DOWN if down else PATH_PEN_UP)
+
+    def take(self):
+        """
+        Removes the oldest entry.
+
+        Returns:
+            The (x, y) point, PATH_PEN_UP or PATH_PEN_DOWN, or None if the queue is empty.
+        """
+        if not self.entries:
+            return None
+        entry = self.entries.pop(0)
+        if isinstance(entry, tuple):
+            self.point_count -= 1
+            self.taken_count += 1
+        return entry
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get_credit_limit(self):
+        """
+        Returns:
+            int: The total number of points the host may have sent since the stream started.
+        """
+        return self.taken_count + self.capacity
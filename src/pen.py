@@ -0,0 +1,117 @@
+# The servo positions of the raised and lowered pen, in percent
+PEN_UP_POSITION = 100
+PEN_DOWN_POSITION = 0
+# How long the servo takes to travel all the way down and all the way up, in seconds
+DEFAULT_PEN_DOWN_TIME = 0.4
+DEFAULT_PEN_UP_TIME = 0.4
+# The fraction of its travel the servo has to lift before the pen tip leaves the paper
+DEFAULT_PEN_CLEARANCE = 0.25
+
+
+class Pen:
+    """
+    Models the timing of the pen servo, which gives no feedback, from how long it takes to travel each way.
+
+    The pen is tracked as a position from 0 (raised) to 1 (on the paper), which moves linearly over time towards the
+    last commanded position. A pen change only waits as long as the servo actually has to travel. Lowering the pen waits
+    until the tip is on the paper, but raising it only waits until the tip has cleared the paper, so the rest of the
+    lift overlaps with the start of the next travel move.
+    """
+
+    def __init__(self, set_position, down_time=DEFAULT_PEN_DOWN_TIME, up_time=DEFAULT_PEN_UP_TIME,
+                 clearance=DEFAULT_PEN_CLEARANCE, up_position=PEN_UP_POSITION, down_position=PEN_DOWN_POSITION,
+                 clock=None):
+        """
+        Initializes the Pen. The pen is assumed to be raised.
+
+        Args:
+            set_position (callable): Takes the servo position to move to, in percent.
+            down_time (float): How long the servo takes to lower the pen all the way, in seconds.
+            up_time (float): How long the servo takes to raise the pen all the way, in seconds.
+            clearance (float): The fraction of its travel the servo lifts before the tip leaves the paper.
+            up_position (float): The servo position of the raised pen, in percent.
+            down_position (float): The servo position of the lowered pen, in percent.
+            clock (callable): A function returning the current time in seconds, defaults to VEXLib's time.time.
+        """
+        if clock is None:
+            from VEXLib.Util import time
+            clock = time.time
+        self.set_position = set_position
+        self.down_time = down_time
+        self.up_time = up_time
+        self.clearance = clearance
+        self.up_position = up_position
+        self.down_position = down_position
+        self.clock = clock
+        self.is_down = False
+        # Where the servo was when it was last commanded, and when that was
+        self.start_position = 0.0
+        self.start_time = clock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Clears the pen transition totals, for example at the start of a plot.
+        """
+        self.transition_count = 0
+        self.transition_time = 0.0
+        self.wait_time = 0.0
+
+    def get_stats(self):
+        """
+        Returns:
+            tuple: The number of pen changes, the total time the servo spent moving in seconds, and the total time
+                motion had to wait for it in seconds, since the stats were last reset.
+        """
+        return self.transition_count, self.transition_time, self.wait_time
+
+    def get_position(self):
+        """
+        Returns:
+            float: The estimated position of the pen, from 0 (raised) to 1 (on the paper).
+        """
+        elapsed = self.clock() - self.start_time
+        if self.is_down:
+            return min(1.0, self.start_position + elapsed / self.down_time) if self.down_time > 0 else 1.0
+        return max(0.0, self.start_position - elapsed / self.up_time) if self.up_time > 0 else 0.0
+
+    def set_down(self, down):
+        """
+        Lowers or raises the pen.
+
+        Args:
+            down (bool): True to lower the pen, False to raise it.
+
+        Returns:
+            float: How long to wait before moving the tool, in seconds. Lowering waits until the tip is on the paper,
+                raising only until it has cleared the paper.
+        """
+        position = self.get_position()
+        self.is_down = down
+        self.start_position = position
+        self.start_time = self.clock()
+        if down:
+            self.set_position(self.down_position)
+            travel_time = (1.0 - position) * self.down_time
+            wait = travel_time
+        else:
+            self.set_position(self.up_position)
+            travel_time = position * self.up_time
+            wait = max(0.0, position - (1.0 - self.clearance)) * self.up_time
+        if travel_time > 0:
+            self.transition_count += 1
+            self.transition_time += travel_time
+            self.wait_time += wait
+        return wait
+
+    def down(self):
+        """
+        Lowers the pen without waiting.
+        """
+        self.set_down(True)
+
+    def up(self):
+        """
+        Raises the pen without waiting.
+        """
+        self.set_down(False)
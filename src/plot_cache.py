@@ -0,0 +1,161 @@
+import binascii
+import json
+
+from plot_job import PLOT_JOB_EXTENSION, PlotJob
+
+DEFAULT_CACHE_DIRECTORY = 'deploy/'
+DEFAULT_MAX_CACHE_BYTES = 256 * 1024
+DEFAULT_MAX_CACHE_ENTRIES = 8
+CHECKSUM_CHUNK_SIZE = 4096
+INDEX_FILENAME = 'plot_cache.json'
+
+
+def file_checksum(path, chunk_size=CHECKSUM_CHUNK_SIZE):
+    """
+    Calculates the CRC32 checksum of a file, reading it in fixed-size chunks.
+
+    Args:
+        path (str): The path of the file.
+        chunk_size (int): The number of bytes to read at a time.
+
+    Returns:
+        int: The checksum.
+    """
+    checksum = 0
+    with open(path, 'rb') as file:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                return checksum
+            checksum = binascii.crc32(chunk, checksum)
+
+
+class PlotCache:
+    """
+    Stores processed drawings on the SD card as plot jobs, keyed on the checksum of the source file and the
+    processing parameters, so that plotting an unchanged drawing again skips all geometry processing.
+
+    The brain cannot list or delete files, so jobs are kept in a fixed set of numbered slot files, tracked by a JSON
+    index. When the cache is over its size or entry limit, the least recently used jobs are evicted by truncating their
+    slot files, which are then reused for new jobs.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIRECTORY, max_bytes=DEFAULT_MAX_CACHE_BYTES,
+                 max_entries=DEFAULT_MAX_CACHE_ENTRIES):
+        """
+        Initializes the PlotCache and loads its index.
+
+        Args:
+            directory (str): The directory the index and slot files are kept in, ending with a '/'.
+            max_bytes (int): The maximum total size of the cached jobs, in bytes.
+            max_entries (int): The maximum number of cached jobs.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        # Maps keys to {'slot': slot number, 'size': bytes, 'used': use counter} entries
+        self.entries = {}
+        self.use_counter = 0
+        self._load_index()
+
+    @staticmethod
+    def get_key(path, parameters):
+        """
+        Builds the cache key of a source file processed with the given parameters.
+
+        Args:
+            path (str): The path of the source file.
+            parameters (str): A description of every parameter that affects the processed result.
+
+        Returns:
+            str: The cache key.
+        """
+        parameters_checksum = binascii.crc32(str(parameters).encode())
+        return '%08x%08x' % (file_checksum(path) & 0xFFFFFFFF, parameters_checksum & 0xFFFFFFFF)
+
+    def load(self, key):
+        """
+        Loads a cached job, marking it as the most recently used.
+
+        Args:
+            key (str): The cache key from get_key.
+
+        Returns:
+            PlotJob: The cached job, or None if the key is not cached.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        try:
+            with open(self._slot_path(entry['slot']), 'rb') as file:
+                plot_job = PlotJob.read(file)
+        except (OSError, ValueError):
+            # The slot file was lost or damaged, forget about it
+            del self.entries[key]
+            self._save_index()
+            return None
+        self.use_counter += 1
+        entry['used'] = self.use_counter
+        self._save_index()
+        return plot_job
+
+    def store(self, key, plot_job):
+        """
+        Caches a job, evicting the least recently used jobs if the cache would grow over its limits.
+
+        Args:
+            key (str): The cache key from get_key.
+            plot_job (PlotJob): The job to cache.
+        """
+        size = plot_job.file_size()
+        if size > self.max_bytes:
+            return
+        if key in self.entries:
+            self._evict(key)
+        while self.entries and (len(self.entries) >= self.max_entries or self.total_bytes() + size > self.max_bytes):
+            self._evict(self._least_recently_used())
+
+        used_slots = [entry['slot'] for entry in self.entries.values()]
+        slot = 0
+        while slot in used_slots:
+            slot += 1
+
+        with open(self._slot_path(slot), 'wb') as file:
+            plot_job.write(file)
+        self.use_counter += 1
+        self.entries[key] = {'slot': slot, 'size': size, 'used': self.use_counter}
+        self._save_index()
+
+    def total_bytes(self):
+        return sum(entry['size'] for entry in self.entries.values())
+
+    def _least_recently_used(self):
+        least_recently_used = None
+        for key, entry in self.entries.items():
+            if least_recently_used is None or entry['used'] < self.entries[least_recently_used]['used']:
+                least_recently_used = key
+        return least_recently_used
+
+    def _evict(self, key):
+        entry = self.entries.pop(key)
+        # Truncate the slot file to give its space back to the SD card
+        with open(self._slot_path(entry['slot']), 'wb'):
+            pass
+
+    def _slot_path(self, slot):
+        return self.directory + 'plot_cache_' + str(slot) + PLOT_JOB_EXTENSION
+
+    def _load_index(self):
+        try:
+            with open(self.directory + INDEX_FILENAME, 'r') as file:
+                index = json.load(file)
+            self.entries = index['entries']
+            self.use_counter = index['use_counter']
+        except (OSError, ValueError, KeyError):
+            # A missing or damaged index only costs the cached jobs, which can be rebuilt
+            self.entries = {}
+            self.use_counter = 0
+
+    def _save_index(self):
+        with open(self.directory + INDEX_FILENAME, 'w') as file:
+            json.dump({'entries': self.entries, 'use_counter': self.use_counter}, file)
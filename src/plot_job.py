@@ -0,0 +1,234 @@
+import struct
+from array import array
+
+PLOT_JOB_EXTENSION = '.spj'
+PLOT_JOB_MAGIC = b'SPJ1'
+PLOT_JOB_VERSION = 1
+
+# Magic, version, flags, stroke count, point count, then the min_x, min_y, max_x, max_y bounds of every point
+HEADER_FORMAT = '<4sHHII4f'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+# Travel through the points of the stroke with the pen up
+OP_TRAVEL = 0
+# Travel to the first point of the stroke, then draw through the rest of it with the pen down
+OP_DRAW = 1
+
+
+class PlotJob:
+    """
+    A compiled drawing that the brain can plot without parsing any text.
+
+    The file is a header followed by three packed little-endian arrays:
+    one uint8 opcode per stroke, padded to a multiple of 4 bytes,
+    one uint32 point count per stroke,
+    and the float32 x, y coordinates of every point of every stroke, one stroke after another.
+    """
+
+    def __init__(self, opcodes, point_counts, coordinates, bounds):
+        """
+        Initializes a PlotJob from its packed arrays.
+
+        Args:
+            opcodes (array): One 'B' opcode per stroke, OP_TRAVEL or OP_DRAW.
+            point_counts (array): One 'I' point count per stroke.
+            coordinates (array): The 'f' x, y coordinates of every point.
+            bounds (tuple): The (min_x, min_y, max_x, max_y) bounding box of every point.
+        """
+        self.opcodes = opcodes
+        self.point_counts = point_counts
+        self.coordinates = coordinates
+        self.bounds = bounds
+
+    @classmethod
+    def from_strokes(cls, strokes, opcode=OP_DRAW):
+        """
+        Packs a list of strokes into a PlotJob.
+
+        Args:
+            strokes (list): The strokes to pack, each a list of (x, y) points.
+            opcode (int): The opcode to give every stroke.
+
+        Returns:
+            PlotJob: The packed job.
+        """
+        plot_job = cls(array('B'), array('I'), array('f'), (0.0, 0.0, 0.0, 0.0))
+        for stroke in strokes:
+            plot_job.append(stroke, opcode)
+        return plot_job
+
+    def append(self, stroke, opcode=OP_DRAW):
+        """
+        Packs one more stroke onto the end of the job, so jobs can be built while their strokes are being plotted.
+
+        Args:
+            stroke (list): The (x, y) points of the stroke.
+            opcode (int): The opcode of the stroke.
+        """
+        if self.coordinates:
+            min_x, min_y, max_x, max_y = self.bounds
+        else:
+            min_x = min_y = float('inf')
+            max_x = max_y = -float('inf')
+        coordinates = self.coordinates
+        for x, y in stroke:
+            coordinates.append(x)
+            coordinates.append(y)
+            if x < min_x:
+                min_x = x
+            if x > max_x:
+                max_x = x
+            if y < min_y:
+                min_y = y
+            if y > max_y:
+                max_y = y
+        self.opcodes.append(opcode)
+        self.point_counts.append(len(stroke))
+        if coordinates:
+            self.bounds = (min_x, min_y, max_x, max_y)
+
+    def stroke_count(self):
+        return len(self.opcodes)
+
+    def point_count(self):
+        return len(self.coordinates) // 2
+
+    def file_size(self):
+        """
+        Calculates the size of the job when written to a file.
+
+        Returns:
+            int: The size in bytes.
+        """
+        stroke_count = len(self.opcodes)
+        return HEADER_SIZE + stroke_count + _padding(stroke_count) + stroke_count * 4 + len(self.coordinates) * 4
+
+    def iter_strokes(self):
+        """
+        Unpacks the strokes one at a time.
+
+        Yields:
+            tuple: An (opcode, points) pair, where points is a list of (x, y) tuples.
+        """
+        offset = 0
+        coordinates = self.coordinates
+        for index in range(len(self.opcodes)):
+            end = offset + self.point_counts[index] * 2
+            yield self.opcodes[index], [(coordinates[i], coordinates[i + 1]) for i in range(offset, end, 2)]
+            offset = end
+
+    def write(self, file):
+        """
+        Writes the job to a file opened in binary mode.
+
+        Args:
+            file (file): The file to write to.
+        """
+        file.write(struct.pack(HEADER_FORMAT, PLOT_JOB_MAGIC, PLOT_JOB_VERSION, 0, len(self.opcodes),
+                               self.point_count(), *self.bounds))
+        file.write(self.opcodes)
+        file.write(bytes(_padding(len(self.opcodes))))
+        file.write(self.point_counts)
+        file.write(self.coordinates)
+
+    @classmethod
+    def read(cls, file):
+        """
+        Reads a job from a file opened in binary mode, loading each array with a single read.
+
+        Args:
+            file (file): The file to read from.
+
+        Returns:
+            PlotJob: The job.
+
+        Raises:
+            ValueError: If the file is not a plot job, or was written by an incompatible version.
+        """
+        header = file.read(HEADER_SIZE)
+        if len(header) != HEADER_SIZE:
+            raise ValueError("Plot job is truncated")
+        magic, version, flags, stroke_count, point_count, min_x, min_y, max_x, max_y = \
+            struct.unpack(HEADER_FORMAT, header)
+        if magic != PLOT_JOB_MAGIC or version != PLOT_JOB_VERSION:
+            raise ValueError("Not a version " + str(PLOT_JOB_VERSION) + " plot job")
+
+        opcodes = _read_array(file, 'B', stroke_count)
+        file.read(_padding(stroke_count))
+        point_counts = _read_array(file, 'I', stroke_count)
+        coordinates = _read_array(file, 'f', point_count * 2)
+        return cls(opcodes, point_counts, coordinates, (min_x, min_y, max_x, max_y))
+
+
+def _padding(length):
+    """
+    Returns how many bytes are needed after length bytes to reach a multiple of 4.
+    """
+    return -length % 4
+
+
+def _read_array(file, typecode, count):
+    """
+    Reads count values of the given array typecode from a file straight into a preallocated array.
+    """
+    size = count * struct.calcsize(typecode)
+    # Built from zeroed bytes, which takes one byte per byte of the array, rather than from a list of boxed values
+    values = array(typecode, bytes(size))
+    if count and file.readinto(values) != size:
+        raise ValueError("Plot job is truncated")
+    return values
+
+
+def write_plot_job(path, strokes):
+    """
+    Compiles a list of strokes into a plot job file.
+
+    Args:
+        path (str): The path of the file to write.
+        strokes (list): The strokes to draw, each a list of (x, y) points.
+
+    Returns:
+        PlotJob: The job that was written.
+    """
+    plot_job = PlotJob.from_strokes(strokes)
+    with open(path, 'wb') as file:
+        plot_job.write(file)
+    return plot_job
+
+
+def read_plot_job(path):
+    """
+    Loads a plot job file.
+
+    Args:
+        path (str): The path of the file to read.
+
+    Returns:
+        PlotJob: The job.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file is truncated or not a plot job of this version.
+    """
+    with open(path, 'rb') as file:
+        return PlotJob.read(file)
+
+
+def load_plot_job(path):
+    """
+    Loads a plot job file if there is a usable one, so a missing, stale or half-copied file falls back to processing
+    the drawing instead of failing the plot.
+
+    Args:
+        path (str): The path of the file to read.
+
+    Returns:
+        PlotJob: The job, or None if the file is missing or was rejected.
+    """
+    try:
+        return read_plot_job(path)
+    except OSError:
+        return None
+    except ValueError as error:
+        print("Rejected plot job " + path + ": " + str(error))
+        return None
@@ -0,0 +1,284 @@
+import math
+
+from dxf_parser import DEFAULT_JOIN_TOLERANCE, DEFAULT_SIMPLIFY_TOLERANCE, RAMER_DOUGLAS_PEUCKER, DXFParser
+from hatch import DEFAULT_HATCH_ANGLE, DEFAULT_HATCH_SPACING
+from path_optimizer import DEFAULT_TIME_BUDGET, TravelOptimizer
+from tessellation import DEFAULT_CHORD_TOLERANCE, IDENTITY_TRANSFORM, transform_strokes
+
+# The (min_x, min_y, max_x, max_y) area the plotter can reach, in inches
+PLOTTER_BOUNDS = (0.0, 0.0, 5.0, 5.0)
+PLOTTER_HOME = (0.0, 0.0)
+# Pass as the scale to scale drawings up or down to fill as much of the plotter's area as possible
+SCALE_TO_FIT = 'fit'
+# The number of lines processed and ordered together when a drawing is plotted while it is still being parsed
+DEFAULT_BATCH_SIZE = 200
+
+
+def get_bounds(strokes):
+    """
+    Calculates the bounding box of a list of strokes.
+
+    Args:
+        strokes (list): The strokes to measure, each a list of (x, y) points.
+
+    Returns:
+        tuple: The (min_x, min_y, max_x, max_y) bounding box, or None if there are no points.
+    """
+    bounds = None
+    for stroke in strokes:
+        for x, y in stroke:
+            if bounds is None:
+                bounds = [x, y, x, y]
+            if x < bounds[0]:
+                bounds[0] = x
+            elif x > bounds[2]:
+                bounds[2] = x
+            if y < bounds[1]:
+                bounds[1] = y
+            elif y > bounds[3]:
+                bounds[3] = y
+    return tuple(bounds) if bounds is not None else None
+
+
+def get_transform(strokes, scale=1.0, rotation=0.0, offset=(0.0, 0.0), bounds=PLOTTER_BOUNDS):
+    """
+    Builds the transform that rotates a drawing about the origin, scales it, then offsets it.
+    Drawings scaled to fit are also moved so their rotated bounding box starts at the corner of the plotter's area,
+    before the offset is applied.
+
+    Args:
+        strokes (list): The strokes of the drawing, each a list of (x, y) points.
+        scale (float or str): The scale factor, or SCALE_TO_FIT to fill the plotter's area keeping the aspect ratio.
+        rotation (float): The counterclockwise rotation, in degrees.
+        offset (tuple): The (x, y) offset, in inches.
+        bounds (tuple): The (min_x, min_y, max_x, max_y) area the plotter can reach.
+
+    Returns:
+        tuple: The (a, b, c, d, e, f) transform, mapping (x, y) to (a x + b y + c, d x + e y + f).
+    """
+    cos = math.cos(rotation * math.pi / 180)
+    sin = math.sin(rotation * math.pi / 180)
+    offset_x, offset_y = offset
+    if scale == SCALE_TO_FIT:
+        drawing_bounds = get_bounds(transform_strokes(strokes, (cos, -sin, 0.0, sin, cos, 0.0)))
+        if drawing_bounds is None:
+            scale = 1.0
+        else:
+            width = drawing_bounds[2] - drawing_bounds[0]
+            height = drawing_bounds[3] - drawing_bounds[1]
+            scales = []
+            if width > 0:
+                scales.append((bounds[2] - bounds[0]) / width)
+            if height > 0:
+                scales.append((bounds[3] - bounds[1]) / height)
+            scale = min(scales) if scales else 1.0
+            offset_x += bounds[0] - drawing_bounds[0] * scale
+            offset_y += bounds[1] - drawing_bounds[1] * scale
+    return cos * scale, -sin * scale, offset_x, sin * scale, cos * scale, offset_y
+
+
+def clip_segment(start, end, bounds=PLOTTER_BOUNDS):
+    """
+    Clips a line segment to a rectangle using the Liang-Barsky algorithm.
+
+    Args:
+        start (tuple): The (x, y) start point of the segment.
+        end (tuple): The (x, y) end point of the segment.
+        bounds (tuple): The (min_x, min_y, max_x, max_y) rectangle to keep.
+
+    Returns:
+        tuple: The (t0, t1) range of the segment inside the rectangle, as fractions of its length,
+            or None if the segment is entirely outside of it.
+    """
+    min_x, min_y, max_x, max_y = bounds
+    dx = end[0] - start[0]
+    dy = end[1] - start[1]
+    t0 = 0.0
+    t1 = 1.0
+    # Each edge of the rectangle keeps the part of the segment where p * t <= q
+    for p, q in ((-dx, start[0] - min_x), (dx, max_x - start[0]), (-dy, start[1] - min_y), (dy, max_y - start[1])):
+        if p == 0:
+            if q < 0:
+                return None
+        elif p < 0:
+            t0 = max(t0, q / p)
+        else:
+            t1 = min(t1, q / p)
+    if t0 > t1:
+        return None
+    return t0, t1
+
+
+def clip_strokes(strokes, bounds=PLOTTER_BOUNDS):
+    """
+    Clips every stroke to a rectangle, so the parts of the drawing the plotter cannot reach are skipped with the pen up
+    instead of being traced along the edge. Strokes that leave and re-enter the rectangle are split.
+
+    Args:
+        strokes (list): The strokes to clip, each a list of (x, y) points.
+        bounds (tuple): The (min_x, min_y, max_x, max_y) rectangle to keep.
+
+    Returns:
+        list: The clipped strokes.
+    """
+    min_x, min_y, max_x, max_y = bounds
+    clipped_strokes = []
+    for stroke in strokes:
+        if len(stroke) == 1:
+            x, y = stroke[0]
+            if min_x <= x <= max_x and min_y <= y <= max_y:
+                clipped_strokes.append(list(stroke))
+            continue
+
+        current = None
+        for i in range(len(stroke) - 1):
+            start = stroke[i]
+            end = stroke[i + 1]
+            clipped = clip_segment(start, end, bounds)
+            if clipped is None:
+                current = None
+                continue
+            t0, t1 = clipped
+            if current is None or t0 > 0:
+                current = [start if t0 == 0 else (start[0] + (end[0] - start[0]) * t0,
+                                                  start[1] + (end[1] - start[1]) * t0)]
+                clipped_strokes.append(current)
+            if t1 == 1:
+                current.append(end)
+            else:
+                current.append((start[0] + (end[0] - start[0]) * t1, start[1] + (end[1] - start[1]) * t1))
+                current = None
+    return clipped_strokes
+
+
+class PlotPipeline:
+    """
+    Turns DXF content into the list of strokes the plotter draws, in the order it draws them.
+    The same pipeline runs on the brain and on the host, where it is used to precompile plot jobs.
+    """
+
+    def __init__(self, chord_tolerance=DEFAULT_CHORD_TOLERANCE, join_tolerance=DEFAULT_JOIN_TOLERANCE,
+                 simplify_tolerance=DEFAULT_SIMPLIFY_TOLERANCE, simplify_method=RAMER_DOUGLAS_PEUCKER,
+                 start=PLOTTER_HOME, time_budget=DEFAULT_TIME_BUDGET, clock=None, bounds=PLOTTER_BOUNDS, scale=1.0,
+                 rotation=0.0, offset=(0.0, 0.0), hatch_spacing=DEFAULT_HATCH_SPACING, hatch_angle=DEFAULT_HATCH_ANGLE,
+                 batch_size=None):
+        """
+        Initializes the PlotPipeline.
+
+        Args:
+            chord_tolerance (float): The maximum distance between a flattened curve and the real curve.
+            join_tolerance (float): The largest gap between two line endpoints that are still joined.
+            simplify_tolerance (float): The maximum deviation allowed when removing points from strokes.
+            simplify_method (str): RAMER_DOUGLAS_PEUCKER or VISVALINGAM_WHYATT.
+            start (tuple): The (x, y) position of the tool before the first stroke, and after the last one.
+            time_budget (float): The maximum time to spend improving the stroke order of each batch, in seconds.
+            clock (callable): A function returning the current time in seconds, defaults to VEXLib's time.time.
+            bounds (tuple): The (min_x, min_y, max_x, max_y) area the plotter can reach.
+            scale (float or str): The scale factor from drawing units to inches, or SCALE_TO_FIT.
+            rotation (float): The counterclockwise rotation of the drawing, in degrees.
+            offset (tuple): The (x, y) offset of the drawing, in inches.
+            hatch_spacing (float): The distance between the lines filling HATCH entities, in drawing units,
+                or None to skip HATCH entities.
+            hatch_angle (float): The angle of the lines filling HATCH entities, in degrees.
+            batch_size (int): The number of lines to process and order at a time, or None to process the whole
+                drawing at once. Batches let plotting start early, but lines are only chained and ordered with the
+                other lines of their batch. Drawings scaled to fit are always processed at once.
+        """
+        self.chord_tolerance = chord_tolerance
+        self.join_tolerance = join_tolerance
+        self.simplify_tolerance = simplify_tolerance
+        self.simplify_method = simplify_method
+        self.start = start
+        self.time_budget = time_budget
+        self.clock = clock
+        self.bounds = bounds
+        self.scale = scale
+        self.rotation = rotation
+        self.offset = offset
+        self.hatch_spacing = hatch_spacing
+        self.hatch_angle = hatch_angle
+        self.batch_size = batch_size
+        self.transform = None
+        self.travel_optimizer = None
+        # The pen up travel of every batch, in inches, before and after ordering
+        self.travel_before = 0.0
+        self.travel_after = 0.0
+
+    def get_parameters(self):
+        """
+        Describes every parameter that changes the strokes this pipeline produces, for use in cache keys.
+
+        Returns:
+            str: The description.
+        """
+        return str((self.chord_tolerance, self.join_tolerance, self.simplify_tolerance, self.simplify_method,
+                    self.start, self.time_budget, self.bounds, self.scale, self.rotation, self.offset,
+                    self.hatch_spacing, self.hatch_angle, self.batch_size))
+
+    def process(self, dxf_content):
+        """
+        Extracts, chains, transforms, clips, simplifies and orders the strokes of a drawing.
+
+        Args:
+            dxf_content (str or file): The raw DXF content as a string, or a file object opened in text mode.
+
+        Returns:
+            list: The strokes to draw, each a list of (x, y) points.
+        """
+        return list(self.iter_strokes(dxf_content))
+
+    def iter_strokes(self, dxf_content):
+        """
+        Processes a drawing like process, yielding the strokes in the order they are drawn.
+        With a batch size, the strokes of each batch are yielded as soon as it is processed, while the rest of the
+        file is still unread.
+
+        Args:
+            dxf_content (str or file): The raw DXF content as a string, or a file object opened in text mode.
+
+        Yields:
+            list: The points of each stroke.
+        """
+        dxf_parser = DXFParser(dxf_content)
+        lines = dxf_parser.iter_extracted_lines(tolerance=self.chord_tolerance, hatch_spacing=self.hatch_spacing,
+                                                hatch_angle=self.hatch_angle)
+        self.travel_before = 0.0
+        self.travel_after = 0.0
+        if self.batch_size is None or self.scale == SCALE_TO_FIT:
+            # Fitting the drawing to the plotter needs the bounds of every line
+            self.transform = None
+            for stroke in self._process_batch(dxf_parser, list(lines), self.start, self.start):
+                yield stroke
+            return
+
+        self.transform = get_transform([], self.scale, self.rotation, self.offset, self.bounds)
+        position = self.start
+        batch = []
+        for line in lines:
+            batch.append(line)
+            if len(batch) < self.batch_size:
+                continue
+            strokes = self._process_batch(dxf_parser, batch, position, None)
+            batch = []
+            if strokes:
+                position = strokes[-1][-1]
+            for stroke in strokes:
+                yield stroke
+        for stroke in self._process_batch(dxf_parser, batch, position, self.start):
+            yield stroke
+
+    def _process_batch(self, dxf_parser, lines, start, end):
+        """
+        Chains, transforms, clips, simplifies and orders a list of lines, adding up their pen up travel.
+        """
+        strokes = dxf_parser.combine_lines(lines, self.join_tolerance)
+        if self.transform is None:
+            self.transform = get_transform(strokes, self.scale, self.rotation, self.offset, self.bounds)
+        strokes = clip_strokes(transform_strokes(strokes, self.transform), self.bounds)
+        strokes = dxf_parser.simplify_lines(strokes, self.simplify_tolerance, self.simplify_method)
+
+        self.travel_optimizer = TravelOptimizer(start, end, self.time_budget, self.clock)
+        strokes = self.travel_optimizer.optimize(strokes)
+        self.travel_before += self.travel_optimizer.travel_before
+        self.travel_after += self.travel_optimizer.travel_after
+        return strokes
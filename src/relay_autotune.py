@@ -0,0 +1,181 @@
+import json
+import math
+
+# The relay output, as a fraction of the motors' top speed
+DEFAULT_RELAY_AMPLITUDE = 0.2
+# How far past the setpoint the axis has to go before the relay switches, in inches, so noise cannot chatter it
+DEFAULT_RELAY_HYSTERESIS = 0.01
+# The number of oscillations measured, after the first one is thrown away
+DEFAULT_RELAY_CYCLES = 4
+# How long the experiment may run before it gives up, in seconds
+DEFAULT_RELAY_TIMEOUT = 20.0
+DEFAULT_GAINS_PATH = 'deploy/axis_gains.json'
+
+# Ziegler-Nichols style rules for (kp, ki, kd) from the ultimate gain Ku and period Tu:
+# kp = a * Ku, ki = kp * b / Tu, kd = kp * c * Tu
+TUNING_RULES = {
+    'p': (0.5, 0.0, 0.0),
+    'pd': (0.8, 0.0, 0.125),
+    'pi': (0.45, 1.2, 0.0),
+    'classic': (0.6, 2.0, 0.125),
+    'some_overshoot': (0.33, 2.0, 0.33),
+    'no_overshoot': (0.2, 2.0, 0.33),
+}
+# The axes are driven through the motors' velocity loops, so their position already integrates the output and needs
+# no integral term to settle, which would only make them overshoot
+DEFAULT_TUNING_RULE = 'pd'
+
+
+class RelayAutotune:
+    """
+    Runs a relay feedback experiment on an axis, one control step at a time. The output switches between +amplitude
+    and -amplitude each time the axis crosses the setpoint, which makes the axis oscillate steadily around it at its
+    ultimate period. From the size of that oscillation, the describing function of the relay gives the ultimate gain,
+    the proportional gain at which a closed loop would oscillate on its own:
+
+        Ku = 4 * amplitude / (pi * sqrt(a^2 - hysteresis^2))
+
+    where a is half the peak to peak size of the oscillation.
+    """
+
+    def __init__(self, setpoint, amplitude=DEFAULT_RELAY_AMPLITUDE, hysteresis=DEFAULT_RELAY_HYSTERESIS,
+                 cycles=DEFAULT_RELAY_CYCLES, timeout=DEFAULT_RELAY_TIMEOUT, clock=None):
+        """
+        Initializes the RelayAutotune.
+
+        Args:
+            setpoint (float): The position to oscillate around, far enough from both ends of the axis.
+            amplitude (float): The relay output.
+            hysteresis (float): How far past the setpoint the axis has to go before the relay switches.
+            cycles (int): The number of oscillations to measure.
+            timeout (float): How long to run before giving up, in seconds.
+            clock (callable): A function returning the current time in seconds, defaults to VEXLib's time.time.
+        """
+        if clock is None:
+            from VEXLib.Util import time
+            clock = time.time
+        self.setpoint = setpoint
+        self.amplitude = amplitude
+        self.hysteresis = hysteresis
+        self.cycles = cycles
+        self.timeout = timeout
+        self.clock = clock
+        self.start_time = None
+        self.output = amplitude
+        # The extreme positions reached in the current half of the oscillation
+        self.peak = None
+        self.maxima = []
+        self.minima = []
+        # The times the relay switched down, one per oscillation
+        self.switch_times = []
+        self.failed = False
+
+    def is_done(self):
+        """
+        Returns:
+            bool: Whether the experiment has finished, either with a result or by timing out.
+        """
+        return self.failed or (len(self.switch_times) > self.cycles + 1 and len(self.maxima) > self.cycles
+                               and len(self.minima) > self.cycles)
+
+    def update(self, position):
+        """
+        Runs one step of the experiment.
+
+        Args:
+            position (float): The measured position of the axis.
+
+        Returns:
+            float: The output to drive the axis with, 0 once the experiment is done.
+        """
+        now = self.clock()
+        if self.start_time is None:
+            self.start_time = now
+        if self.is_done():
+            return 0.0
+        if now - self.start_time > self.timeout:
+            self.failed = True
+            return 0.0
+
+        error = self.setpoint - position
+        if self.output > 0:
+            self.peak = position if self.peak is None else min(self.peak, position)
+            if error < -self.hysteresis:
+                self.minima.append(self.peak)
+                self.switch_times.append(now)
+                self.output = -self.amplitude
+                self.peak = position
+        else:
+            self.peak = max(self.peak, position)
+            if error > self.hysteresis:
+                self.maxima.append(self.peak)
+                self.output = self.amplitude
+                self.peak = position
+        return self.output
+
+    def get_result(self):
+        """
+        Returns:
+            tuple: The ultimate gain and the ultimate period in seconds, or None if the experiment has not finished
+                or timed out.
+        """
+        if self.failed or not self.is_done():
+            return None
+        # The first oscillation starts from wherever the axis was, so it is left out
+        maxima = self.maxima[-self.cycles:]
+        minima = self.minima[-self.cycles:]
+        switch_times = self.switch_times[-self.cycles - 1:]
+        oscillation = (sum(maxima) / len(maxima) - sum(minima) / len(minima)) / 2
+        oscillation = math.sqrt(max(oscillation * oscillation - self.hysteresis * self.hysteresis, 1e-12))
+        ultimate_gain = 4 * self.amplitude / (math.pi * oscillation)
+        ultimate_period = (switch_times[-1] - switch_times[0]) / self.cycles
+        return ultimate_gain, ultimate_period
+
+
+def gains_from_ultimate(ultimate_gain, ultimate_period, rule=DEFAULT_TUNING_RULE):
+    """
+    Derives PID gains from the result of a relay experiment.
+
+    Args:
+        ultimate_gain (float): The ultimate gain Ku.
+        ultimate_period (float): The ultimate period Tu, in seconds.
+        rule (str): The name of the tuning rule in TUNING_RULES.
+
+    Returns:
+        dict: The 'kp', 'ki' and 'kd' gains.
+    """
+    proportional, integral, derivative = TUNING_RULES[rule]
+    kp = proportional * ultimate_gain
+    return {'kp': kp, 'ki': kp * integral / ultimate_period, 'kd': kp * derivative * ultimate_period}
+
+
+def load_gains(path=DEFAULT_GAINS_PATH):
+    """
+    Loads tuned gains saved by save_gains.
+
+    Args:
+        path (str): The path of the gains file.
+
+    Returns:
+        dict: Maps axis names to their gains, empty if nothing was saved or the file is damaged.
+    """
+    try:
+        with open(path, 'r') as file:
+            gains = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(gains, dict):
+        return {}
+    return gains
+
+
+def save_gains(gains, path=DEFAULT_GAINS_PATH):
+    """
+    Saves tuned gains, so they are loaded the next time the robot starts.
+
+    Args:
+        gains (dict): Maps axis names to their 'kp', 'ki' and 'kd' gains.
+        path (str): The path of the gains file.
+    """
+    with open(path, 'w') as file:
+        json.dump(gains, file)
@@ -0,0 +1,204 @@
+import struct
+from array import array
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVEL_NAMES = {DEBUG: 'DEBUG', INFO: 'INFO', WARNING: 'WARNING', ERROR: 'ERROR'}
+
+DEFAULT_LOG_CAPACITY = 256
+DEFAULT_LOG_VALUES = 3
+
+# Each binary record is the timestamp, level and event id, followed by the record's values
+RECORD_HEADER_FORMAT = '<IBH'
+# Timestamps are whole milliseconds in 32 bits, which keeps their resolution however long the robot runs, and wrap
+# around after about 49 days
+TIMESTAMP_MASK = 0xFFFFFFFF
+
+
+class RingLog:
+    """
+    A structured log for the control loop that never formats or prints while recording.
+
+    Records are a millisecond timestamp, a level, an event id and a few float values, stored in preallocated arrays
+    that wrap around when full, overwriting the oldest records. Recording a record below the log's level returns
+    straight away, and nothing is turned into text until the records are drained, a few at a time, outside of the
+    control step.
+    """
+
+    def __init__(self, capacity=DEFAULT_LOG_CAPACITY, values_per_record=DEFAULT_LOG_VALUES, level=INFO, clock=None):
+        """
+        Initializes the RingLog.
+
+        Args:
+            capacity (int): The number of records kept before the oldest are overwritten.
+            values_per_record (int): The number of float values stored with every record.
+            level (int): The lowest level recorded, DEBUG, INFO, WARNING or ERROR.
+            clock (callable): A function returning the current time in seconds, defaults to VEXLib's time.time.
+        """
+        if clock is None:
+            from VEXLib.Util import time
+            clock = time.time
+        self.capacity = capacity
+        self.values_per_record = values_per_record
+        self.level = level
+        self.clock = clock
+        self.times = array('I', [0] * capacity)
+        self.levels = array('B', [0] * capacity)
+        self.events = array('H', [0] * capacity)
+        self.values = array('f', [0.0] * (capacity * values_per_record))
+        # The index of the oldest record, and the number of records waiting to be drained
+        self.start = 0
+        self.count = 0
+        self.dropped_count = 0
+        # Maps event ids to (name, value names) pairs, used to format records when they are drained
+        self.event_formats = {}
+        self.record_format = RECORD_HEADER_FORMAT + 'f' * values_per_record
+
+    def define_event(self, event, name, value_names=()):
+        """
+        Names an event and its values, for formatting its records.
+
+        Args:
+            event (int): The event id, from 0 to 65535.
+            name (str): The name of the event.
+            value_names (tuple): The names of the values recorded with the event.
+        """
+        self.event_formats[event] = (name, value_names)
+
+    def enabled(self, level):
+        """
+        Returns:
+            bool: Whether records of a level are kept. Check this before computing expensive values to record.
+        """
+        return level >= self.level
+
+    def record(self, level, event, value1=0.0, value2=0.0, value3=0.0):
+        """
+        Stores a record, overwriting the oldest record if the log is full. Does nothing below the log's level.
+
+        Args:
+            level (int): The level of the record.
+            event (int): The event id.
+            value1 (float): The first value, unused values are stored as 0.
+            value2 (float): The second value.
+            value3 (float): The third value.
+        """
+        if level < self.level:
+            return
+        if self.count == self.capacity:
+            self.start = (self.start + 1) % self.capacity
+            self.count -= 1
+            self.dropped_count += 1
+        index = (self.start + self.count) % self.capacity
+        self.times[index] = round(self.clock() * 1000) & TIMESTAMP_MASK
+        self.levels[index] = level
+        self.events[index] = event
+        offset = index * self.values_per_record
+        for value_index, value in enumerate((value1, value2, value3)[:self.values_per_record]):
+            self.values[offset + value_index] = value
+        self.count += 1
+
+    def debug(self, event, value1=0.0, value2=0.0, value3=0.0):
+        """
+        Stores a DEBUG record, see record.
+        """
+        if self.level <= DEBUG:
+            self.record(DEBUG, event, value1, value2, value3)
+
+    def info(self, event, value1=0.0, value2=0.0, value3=0.0):
+        """
+        Stores an INFO record, see record.
+        """
+        if self.level <= INFO:
+            self.record(INFO, event, value1, value2, value3)
+
+    def warning(self, event, value1=0.0, value2=0.0, value3=0.0):
+        """
+        Stores a WARNING record, see record.
+        """
+        self.record(WARNING, event, value1, value2, value3)
+
+    def error(self, event, value1=0.0, value2=0.0, value3=0.0):
+        """
+        Stores an ERROR record, see record.
+        """
+        self.record(ERROR, event, value1, value2, value3)
+
+    def __len__(self):
+        return self.count
+
+    def _pop(self):
+        """
+        Removes the oldest record.
+
+        Returns:
+            tuple: The (time in milliseconds, level, event, values) of the record.
+        """
+        index = self.start
+        offset = index * self.values_per_record
+        record = (self.times[index], self.levels[index], self.events[index],
+                  tuple(self.values[offset:offset + self.values_per_record]))
+        self.start = (self.start + 1) % self.capacity
+        self.count -= 1
+        return record
+
+    def format_record(self, record):
+        """
+        Formats a record as a line of text, in the same NAME:value|value style as telemetry messages.
+
+        Args:
+            record (tuple): The (time in milliseconds, level, event, values) of the record.
+
+        Returns:
+            str: The line.
+        """
+        timestamp, level, event, values = record
+        name, value_names = self.event_formats.get(event, ("EVENT_" + str(event), ()))
+        # Formatted from the whole milliseconds, since a single precision float cannot hold hours of them
+        seconds = str(timestamp // 1000) + "." + ("00" + str(timestamp % 1000))[-3:]
+        fields = [seconds, LEVEL_NAMES.get(level, str(level)), name]
+        for value_index, value in enumerate(values):
+            if value_index < len(value_names):
+                fields.append(value_names[value_index] + "=" + str(value))
+            elif value != 0:
+                fields.append(str(value))
+        return "LOG:" + "|".join(fields)
+
+    def drain_text(self, write, max_records=None):
+        """
+        Formats and writes out the oldest records, for example over telemetry.
+
+        Args:
+            write (callable): Takes each formatted line.
+            max_records (int): The most records to drain, or None to drain every record.
+
+        Returns:
+            int: The number of records drained.
+        """
+        drained = 0
+        while self.count and (max_records is None or drained < max_records):
+            write(self.format_record(self._pop()))
+            drained += 1
+        return drained
+
+    def drain_binary(self, file, max_records=None):
+        """
+        Writes out the oldest records as packed little-endian binary records, for example to the SD card.
+        Each record is a uint32 timestamp in milliseconds, a uint8 level, a uint16 event id, then values_per_record
+        float32 values.
+
+        Args:
+            file (file): A file opened in binary mode.
+            max_records (int): The most records to drain, or None to drain every record.
+
+        Returns:
+            int: The number of records drained.
+        """
+        drained = 0
+        while self.count and (max_records is None or drained < max_records):
+            timestamp, level, event, values = self._pop()
+            file.write(struct.pack(self.record_format, timestamp, level, event, *values))
+            drained += 1
+        return drained
@@ -0,0 +1,62 @@
+class SensorSnapshot:
+    """
+    Samples every registered device reading once per tick and serves the cached values for the rest of the tick.
+    Device queries like Motor.position are slow compared to reading a dictionary, and a single control step can need
+    the same reading several times, so reading each device once per tick saves most of them.
+    """
+
+    def __init__(self):
+        # Maps names to the functions that read them from their devices
+        self.readers = {}
+        self.values = {}
+        # The number of device reads made, and the number of readings served from the snapshot instead
+        self.device_reads = 0
+        self.saved_reads = 0
+
+    def register(self, name, reader):
+        """
+        Adds a reading to the snapshot. It is sampled on the next update, or the first time it is asked for.
+
+        Args:
+            name (str): The name of the reading.
+            reader (callable): Reads the value from its device, for example lambda: motor.position(DEGREES).
+        """
+        self.readers[name] = reader
+        self.values.pop(name, None)
+
+    def update(self):
+        """
+        Samples every registered reading. Call this once at the start of each tick, and after anything that changes
+        a reading mid-tick, like resetting a motor's position.
+        """
+        for name, reader in self.readers.items():
+            self.values[name] = reader()
+        self.device_reads += len(self.readers)
+
+    def get(self, name):
+        """
+        Returns the value of a reading as it was sampled this tick.
+
+        Args:
+            name (str): The name of the reading.
+
+        Returns:
+            The value.
+
+        Raises:
+            KeyError: If no reading with the name was registered.
+        """
+        if name in self.values:
+            self.saved_reads += 1
+            return self.values[name]
+        value = self.readers[name]()
+        self.values[name] = value
+        self.device_reads += 1
+        return value
+
+    def get_stats(self):
+        """
+        Returns:
+            tuple: The number of device reads made, and the number of readings served without one.
+        """
+        return self.device_reads, self.saved_reads
@@ -0,0 +1,321 @@
+import math
+from array import array
+
+# Grids never have more cells than this many times the number of items they index, so tiny cells cannot exhaust memory
+MAX_CELLS_PER_ITEM = 4
+
+
+def _grid_layout(min_x, min_y, max_x, max_y, item_count, cell_size):
+    """
+    Chooses the cell size and the number of columns and rows of a grid covering a bounding box.
+    Without a cell size, cells are sized to hold roughly one item each.
+    """
+    width = max_x - min_x
+    height = max_y - min_y
+    if cell_size is None or cell_size <= 0:
+        cell_size = max(width, height) / max(math.sqrt(item_count), 1) or 1.0
+    max_cells = MAX_CELLS_PER_ITEM * item_count + 1
+    while (int(width // cell_size) + 1) * (int(height // cell_size) + 1) > max_cells:
+        cell_size *= 2
+    return cell_size, int(width // cell_size) + 1, int(height // cell_size) + 1
+
+
+def _cell_coordinates(grid, x, y):
+    """
+    Returns the column and row of the cell of a grid containing a point, clamped into the grid.
+    """
+    column = int((x - grid.min_x) // grid.cell_size)
+    if column < 0:
+        column = 0
+    elif column >= grid.columns:
+        column = grid.columns - 1
+    row = int((y - grid.min_y) // grid.cell_size)
+    if row < 0:
+        row = 0
+    elif row >= grid.rows:
+        row = grid.rows - 1
+    return column, row
+
+
+class PointGrid:
+    """
+    A uniform grid of points supporting nearest neighbour, radius and rectangle queries.
+
+    The grid is stored compactly in arrays, so it is light enough to use on the brain:
+    cell_items holds the index of every point, grouped by cell, and cell i's points are
+    cell_items[cell_starts[i]:cell_ends[i]]. Removing a point swaps it past the end of its cell's live range,
+    so removed points cost nothing to skip in later queries.
+    """
+
+    def __init__(self, points, cell_size=None):
+        """
+        Initializes the PointGrid.
+
+        Args:
+            points (list): The (x, y) points to index. The list is kept, not copied.
+            cell_size (float): The width and height of each grid cell, or None to choose one from the point density.
+        """
+        self.points = points
+        self.live_count = len(points)
+        if points:
+            self.min_x = min(point[0] for point in points)
+            self.min_y = min(point[1] for point in points)
+            max_x = max(point[0] for point in points)
+            max_y = max(point[1] for point in points)
+        else:
+            self.min_x = self.min_y = max_x = max_y = 0.0
+        self.cell_size, self.columns, self.rows = _grid_layout(self.min_x, self.min_y, max_x, max_y, len(points),
+                                                               cell_size)
+
+        # Counting sort the points into their cells
+        cell_count = self.columns * self.rows
+        self.cell_starts = array('I', [0] * (cell_count + 1))
+        self.point_cells = array('I', [0] * len(points))
+        for index, point in enumerate(points):
+            column, row = _cell_coordinates(self, point[0], point[1])
+            cell = row * self.columns + column
+            self.point_cells[index] = cell
+            self.cell_starts[cell + 1] += 1
+        for cell in range(cell_count):
+            self.cell_starts[cell + 1] += self.cell_starts[cell]
+
+        self.cell_ends = array('I', self.cell_starts[1:])
+        fill = array('I', self.cell_starts)
+        self.cell_items = array('I', [0] * len(points))
+        self.positions = array('I', [0] * len(points))
+        for index in range(len(points)):
+            cell = self.point_cells[index]
+            self.cell_items[fill[cell]] = index
+            self.positions[index] = fill[cell]
+            fill[cell] += 1
+
+    def __len__(self):
+        return self.live_count
+
+    def remove(self, index):
+        """
+        Removes a point from the grid, so no later query returns it. Removing a point twice does nothing.
+
+        Args:
+            index (int): The index of the point in the list the grid was built from.
+        """
+        cell = self.point_cells[index]
+        position = self.positions[index]
+        last = self.cell_ends[cell] - 1
+        if position > last:
+            return
+        other_index = self.cell_items[last]
+        self.cell_items[position] = other_index
+        self.positions[other_index] = position
+        self.cell_items[last] = index
+        self.positions[index] = last
+        self.cell_ends[cell] = last
+        self.live_count -= 1
+
+    def within_rect(self, rect):
+        """
+        Finds every point inside a rectangle, including its edges.
+
+        Args:
+            rect (tuple): The (min_x, min_y, max_x, max_y) rectangle.
+
+        Returns:
+            list: The indices of the points.
+        """
+        min_x, min_y, max_x, max_y = rect
+        first_column, first_row = _cell_coordinates(self, min_x, min_y)
+        last_column, last_row = _cell_coordinates(self, max_x, max_y)
+        points = self.points
+        found = []
+        for row in range(first_row, last_row + 1):
+            for cell in range(row * self.columns + first_column, row * self.columns + last_column + 1):
+                for position in range(self.cell_starts[cell], self.cell_ends[cell]):
+                    index = self.cell_items[position]
+                    x, y = points[index]
+                    if min_x <= x <= max_x and min_y <= y <= max_y:
+                        found.append(index)
+        return found
+
+    def within_radius(self, point, radius):
+        """
+        Finds every point within a distance of a point.
+
+        Args:
+            point (tuple): The (x, y) point to search around.
+            radius (float): The largest distance to include.
+
+        Returns:
+            list: The indices of the points.
+        """
+        x, y = point
+        radius_squared = radius * radius
+        points = self.points
+        found = []
+        for index in self.within_rect((x - radius, y - radius, x + radius, y + radius)):
+            dx = points[index][0] - x
+            dy = points[index][1] - y
+            if dx * dx + dy * dy <= radius_squared:
+                found.append(index)
+        return found
+
+    def nearest(self, point, max_distance=None):
+        """
+        Finds the point closest to a point, searching rings of cells outwards.
+
+        Args:
+            point (tuple): The (x, y) point to search from.
+            max_distance (float): The largest distance to search, or None to search the whole grid.
+
+        Returns:
+            int: The index of the closest point, or None if there is no point within max_distance.
+        """
+        if not self.live_count:
+            return None
+        x, y = point
+        column, row = _cell_coordinates(self, x, y)
+        max_ring = max(column, self.columns - 1 - column, row, self.rows - 1 - row)
+        points = self.points
+        best_index = None
+        best_distance_squared = max_distance * max_distance if max_distance is not None else None
+        for ring in range(max_ring + 1):
+            # Every point in this ring or beyond is at least (ring - 1) cells away
+            limit = (ring - 1) * self.cell_size
+            if best_distance_squared is not None and limit > 0 and best_distance_squared <= limit * limit:
+                break
+            for cell_row in range(max(row - ring, 0), min(row + ring, self.rows - 1) + 1):
+                on_edge = cell_row == row - ring or cell_row == row + ring
+                if on_edge:
+                    columns = range(max(column - ring, 0), min(column + ring, self.columns - 1) + 1)
+                else:
+                    columns = [cell_column for cell_column in (column - ring, column + ring)
+                               if 0 <= cell_column < self.columns]
+                for cell_column in columns:
+                    cell = cell_row * self.columns + cell_column
+                    for position in range(self.cell_starts[cell], self.cell_ends[cell]):
+                        index = self.cell_items[position]
+                        dx = points[index][0] - x
+                        dy = points[index][1] - y
+                        distance_squared = dx * dx + dy * dy
+                        if best_distance_squared is None or distance_squared < best_distance_squared or (
+                                distance_squared == best_distance_squared and best_index is None):
+                            best_index = index
+                            best_distance_squared = distance_squared
+        return best_index
+
+
+class BoxGrid:
+    """
+    A uniform grid of bounding boxes supporting rectangle and point queries, used to pick strokes in a region.
+    Each box is listed in every cell it overlaps, and cell i's boxes are cell_items[cell_starts[i]:cell_starts[i + 1]].
+    """
+
+    def __init__(self, boxes, cell_size=None):
+        """
+        Initializes the BoxGrid.
+
+        Args:
+            boxes (list): The (min_x, min_y, max_x, max_y) boxes to index. The list is kept, not copied.
+            cell_size (float): The width and height of each grid cell, or None to choose one from the box density.
+        """
+        self.boxes = boxes
+        if boxes:
+            self.min_x = min(box[0] for box in boxes)
+            self.min_y = min(box[1] for box in boxes)
+            max_x = max(box[2] for box in boxes)
+            max_y = max(box[3] for box in boxes)
+        else:
+            self.min_x = self.min_y = max_x = max_y = 0.0
+        self.cell_size, self.columns, self.rows = _grid_layout(self.min_x, self.min_y, max_x, max_y, len(boxes),
+                                                               cell_size)
+
+        cell_count = self.columns * self.rows
+        self.cell_starts = array('I', [0] * (cell_count + 1))
+        for box in boxes:
+            for cell in self._overlapping_cells(box):
+                self.cell_starts[cell + 1] += 1
+        for cell in range(cell_count):
+            self.cell_starts[cell + 1] += self.cell_starts[cell]
+
+        fill = array('I', self.cell_starts)
+        self.cell_items = array('I', [0] * self.cell_starts[cell_count])
+        for index, box in enumerate(boxes):
+            for cell in self._overlapping_cells(box):
+                self.cell_items[fill[cell]] = index
+                fill[cell] += 1
+
+    @classmethod
+    def from_strokes(cls, strokes, cell_size=None):
+        """
+        Builds a BoxGrid of the bounding boxes of strokes.
+
+        Args:
+            strokes (list): The strokes to index, each a non-empty list of (x, y) points.
+            cell_size (float): The width and height of each grid cell, or None to choose one from the stroke density.
+
+        Returns:
+            BoxGrid: The grid, whose box indices are stroke indices.
+        """
+        boxes = []
+        for stroke in strokes:
+            min_x = max_x = stroke[0][0]
+            min_y = max_y = stroke[0][1]
+            for x, y in stroke:
+                if x < min_x:
+                    min_x = x
+                elif x > max_x:
+                    max_x = x
+                if y < min_y:
+                    min_y = y
+                elif y > max_y:
+                    max_y = y
+            boxes.append((min_x, min_y, max_x, max_y))
+        return cls(boxes, cell_size)
+
+    def _overlapping_cells(self, box):
+        first_column, first_row = _cell_coordinates(self, box[0], box[1])
+        last_column, last_row = _cell_coordinates(self, box[2], box[3])
+        cells = []
+        for row in range(first_row, last_row + 1):
+            cells.extend(range(row * self.columns + first_column, row * self.columns + last_column + 1))
+        return cells
+
+    def intersecting(self, rect, contained=False):
+        """
+        Finds every box that overlaps a rectangle.
+
+        Args:
+            rect (tuple): The (min_x, min_y, max_x, max_y) rectangle.
+            contained (bool): Whether to only return boxes entirely inside the rectangle.
+
+        Returns:
+            list: The indices of the boxes, in increasing order.
+        """
+        min_x, min_y, max_x, max_y = rect
+        found = set()
+        for cell in self._overlapping_cells(rect):
+            for position in range(self.cell_starts[cell], self.cell_starts[cell + 1]):
+                index = self.cell_items[position]
+                if index in found:
+                    continue
+                box = self.boxes[index]
+                if contained:
+                    matches = min_x <= box[0] and min_y <= box[1] and box[2] <= max_x and box[3] <= max_y
+                else:
+                    matches = box[0] <= max_x and min_x <= box[2] and box[1] <= max_y and min_y <= box[3]
+                if matches:
+                    found.add(index)
+        return sorted(found)
+
+    def containing(self, point, radius=0.0):
+        """
+        Finds every box within a distance of a point, measured along either axis.
+
+        Args:
+            point (tuple): The (x, y) point.
+            radius (float): How far outside a box the point may be.
+
+        Returns:
+            list: The indices of the boxes, in increasing order.
+        """
+        x, y = point
+        return self.intersecting((x - radius, y - radius, x + radius, y + radius))
@@ -0,0 +1,245 @@
+"""
+Host-side geometry for drawings, backed by NumPy.
+
+Every point of every stroke is kept in a single (N, 2) float64 array, with an offsets array marking where each stroke
+starts, so bounds, lengths, transforms and clipping run as vectorised NumPy operations instead of per-point Python.
+
+NumPy is not available on the brain, so this module must only be imported by host tools, never by the robot code.
+"""
+import math
+from array import array
+
+import numpy as np
+
+from dxf_parser import DXFParser
+from plot_job import OP_DRAW, PlotJob
+from tessellation import DEFAULT_CHORD_TOLERANCE
+
+
+def affine_matrix(scale=1.0, rotation=0.0, offset=(0.0, 0.0)):
+    """
+    Builds the 2x3 affine matrix that rotates points about the origin, then scales them, then offsets them.
+
+    Args:
+        scale (float): The scale factor.
+        rotation (float): The counterclockwise rotation, in radians.
+        offset (tuple): The (x, y) offset.
+
+    Returns:
+        numpy.ndarray: The 2x3 matrix.
+    """
+    cos = math.cos(rotation) * scale
+    sin = math.sin(rotation) * scale
+    return np.array([[cos, -sin, offset[0]],
+                     [sin, cos, offset[1]]])
+
+
+class StrokeArrays:
+    """
+    A list of strokes stored as one flat array of points and an index of stroke offsets.
+    Stroke i is points[offsets[i]:offsets[i + 1]].
+    """
+
+    def __init__(self, points, offsets):
+        """
+        Initializes the StrokeArrays.
+
+        Args:
+            points (numpy.ndarray): The (N, 2) float64 points of every stroke, one stroke after another.
+            offsets (numpy.ndarray): The stroke_count + 1 indices into points where each stroke starts, ending with N.
+        """
+        self.points = points
+        self.offsets = offsets
+
+    @classmethod
+    def from_strokes(cls, strokes):
+        """
+        Packs a list of strokes into StrokeArrays. Empty strokes are skipped.
+
+        Args:
+            strokes (list): The strokes to pack, each a list of (x, y) points.
+
+        Returns:
+            StrokeArrays: The packed strokes.
+        """
+        strokes = [stroke for stroke in strokes if len(stroke)]
+        offsets = np.zeros(len(strokes) + 1, dtype=np.int64)
+        np.cumsum([len(stroke) for stroke in strokes], out=offsets[1:])
+        if strokes:
+            points = np.concatenate([np.asarray(stroke, dtype=np.float64).reshape(-1, 2) for stroke in strokes])
+        else:
+            points = np.zeros((0, 2))
+        return cls(points, offsets)
+
+    @classmethod
+    def from_dxf(cls, dxf_content, layers=None, tolerance=DEFAULT_CHORD_TOLERANCE):
+        """
+        Extracts the lines of a drawing straight into StrokeArrays.
+
+        Args:
+            dxf_content (str or file): The raw DXF content as a string, or a file object opened in text mode.
+            layers (collection): The layer names to extract lines from, or None to extract lines from every layer.
+            tolerance (float): The maximum distance between a flattened curve and the real curve, in drawing units.
+
+        Returns:
+            StrokeArrays: The lines of the drawing.
+        """
+        return cls.from_strokes(DXFParser(dxf_content).extract_lines(layers, tolerance))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def stroke(self, index):
+        """
+        Returns a view of the points of one stroke.
+
+        Args:
+            index (int): The index of the stroke.
+
+        Returns:
+            numpy.ndarray: The (n, 2) points of the stroke.
+        """
+        return self.points[self.offsets[index]:self.offsets[index + 1]]
+
+    def to_strokes(self):
+        """
+        Unpacks the strokes into the list of lists of (x, y) tuples used by the rest of the pipeline.
+
+        Returns:
+            list: The strokes.
+        """
+        points = [tuple(point) for point in self.points.tolist()]
+        offsets = self.offsets.tolist()
+        return [points[offsets[i]:offsets[i + 1]] for i in range(len(self))]
+
+    def to_plot_job(self, opcode=OP_DRAW):
+        """
+        Packs the strokes into a PlotJob without going through per-point Python objects.
+
+        Args:
+            opcode (int): The opcode to give every stroke.
+
+        Returns:
+            PlotJob: The packed job.
+        """
+        opcodes = array('B', np.full(len(self), opcode, dtype=np.uint8).tobytes())
+        point_counts = array('I', np.diff(self.offsets).astype(np.uint32).tobytes())
+        coordinates = array('f', self.points.astype(np.float32).tobytes())
+        bounds = self.bounds() or (0.0, 0.0, 0.0, 0.0)
+        return PlotJob(opcodes, point_counts, coordinates, bounds)
+
+    def stroke_ids(self):
+        """
+        Returns the index of the stroke each point belongs to.
+
+        Returns:
+            numpy.ndarray: N stroke indices.
+        """
+        return np.repeat(np.arange(len(self)), np.diff(self.offsets))
+
+    def bounds(self):
+        """
+        Calculates the bounding box of every point.
+
+        Returns:
+            tuple: The (min_x, min_y, max_x, max_y) bounding box, or None if there are no points.
+        """
+        if not len(self.points):
+            return None
+        min_x, min_y = self.points.min(axis=0).tolist()
+        max_x, max_y = self.points.max(axis=0).tolist()
+        return min_x, min_y, max_x, max_y
+
+    def stroke_bounds(self):
+        """
+        Calculates the bounding box of each stroke.
+
+        Returns:
+            numpy.ndarray: A (stroke_count, 4) array of min_x, min_y, max_x, max_y rows.
+        """
+        if not len(self):
+            return np.zeros((0, 4))
+        starts = self.offsets[:-1]
+        return np.hstack((np.minimum.reduceat(self.points, starts), np.maximum.reduceat(self.points, starts)))
+
+    def lengths(self):
+        """
+        Calculates the drawn length of each stroke.
+
+        Returns:
+            numpy.ndarray: stroke_count lengths.
+        """
+        stroke_ids = self.stroke_ids()
+        segment_lengths = np.hypot(*np.diff(self.points, axis=0).T)
+        # Differences between the last point of a stroke and the first point of the next are not segments
+        same_stroke = stroke_ids[1:] == stroke_ids[:-1]
+        return np.bincount(stroke_ids[1:][same_stroke], weights=segment_lengths[same_stroke], minlength=len(self))
+
+    def transform(self, matrix):
+        """
+        Applies an affine transform to every point.
+
+        Args:
+            matrix (numpy.ndarray): The 2x3 affine matrix from affine_matrix, or an (a, b, c, d, e, f) transform from
+                plot_pipeline.get_transform.
+
+        Returns:
+            StrokeArrays: The transformed strokes.
+        """
+        matrix = np.asarray(matrix, dtype=np.float64).reshape(2, 3)
+        return StrokeArrays(self.points @ matrix[:, :2].T + matrix[:, 2], self.offsets.copy())
+
+    def clip(self, bounds):
+        """
+        Clips every stroke to a rectangle using the Liang-Barsky algorithm on all segments at once.
+        Strokes that leave and re-enter the rectangle are split, and strokes entirely outside it are dropped.
+
+        Args:
+            bounds (tuple): The (min_x, min_y, max_x, max_y) rectangle to keep.
+
+        Returns:
+            StrokeArrays: The clipped strokes.
+        """
+        min_x, min_y, max_x, max_y = bounds
+        point_counts = np.diff(self.offsets)
+        # Single point strokes become a zero length segment so they are clipped like everything else
+        single_point = point_counts == 1
+        segment_counts = np.maximum(point_counts - 1, 1)
+        segment_strokes = np.repeat(np.arange(len(self)), segment_counts)
+        segment_offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(segment_counts, out=segment_offsets[1:])
+        local_index = np.arange(segment_offsets[-1]) - np.repeat(segment_offsets[:-1], segment_counts)
+        start_index = self.offsets[:-1][segment_strokes] + local_index
+        end_index = np.minimum(start_index + 1, self.offsets[1:][segment_strokes] - 1)
+
+        starts = self.points[start_index]
+        deltas = self.points[end_index] - starts
+        # Each row is one edge of the rectangle, the segment is inside it where p * t <= q
+        p = np.stack((-deltas[:, 0], deltas[:, 0], -deltas[:, 1], deltas[:, 1]))
+        q = np.stack((starts[:, 0] - min_x, max_x - starts[:, 0], starts[:, 1] - min_y, max_y - starts[:, 1]))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = q / p
+        t0 = np.max(np.where(p < 0, ratios, 0.0), axis=0, initial=0.0)
+        t1 = np.min(np.where(p > 0, ratios, 1.0), axis=0, initial=1.0)
+        accepted = (t0 <= t1) & ~np.any((p == 0) & (q < 0), axis=0)
+
+        # A segment continues the previous one's output stroke if both stay inside across their shared point
+        continues = np.zeros(len(accepted), dtype=bool)
+        continues[1:] = (accepted[:-1] & (t1[:-1] == 1.0) & (t0[1:] == 0.0) &
+                         (segment_strokes[1:] == segment_strokes[:-1]))
+        continues = continues[accepted]
+        starts = starts[accepted]
+        deltas = deltas[accepted]
+        t0 = t0[accepted, np.newaxis]
+        t1 = t1[accepted, np.newaxis]
+        single_point = single_point[segment_strokes[accepted]]
+
+        # Every segment emits its clipped end point, segments that start a new stroke also emit their start point
+        starts_stroke = ~continues & ~single_point
+        end_positions = np.cumsum(1 + starts_stroke) - 1
+        points = np.empty((end_positions[-1] + 1 if len(end_positions) else 0, 2))
+        points[end_positions] = starts + deltas * t1
+        points[end_positions[starts_stroke] - 1] = (starts + deltas * t0)[starts_stroke]
+
+        stroke_starts = np.where(starts_stroke, end_positions - 1, end_positions)[~continues]
+        return StrokeArrays(points, np.append(stroke_starts, len(points)).astype(np.int64))
@@ -0,0 +1,123 @@
+# The number of strokes a StrokeQueue holds before its producer has to wait for the plotter to catch up
+DEFAULT_QUEUE_SIZE = 16
+# How long a waiting producer or consumer sleeps before checking the queue again, in seconds
+QUEUE_POLL_INTERVAL = 0.01
+
+
+class StrokeQueue:
+    """
+    A bounded first-in first-out queue that hands strokes from a thread processing a drawing to the thread plotting it.
+    Waiting for the queue sleeps instead of spinning, so the other thread gets to run.
+    The queue only holds max_size strokes at a time, which caps the memory used by strokes waiting to be plotted.
+    """
+
+    def __init__(self, max_size=DEFAULT_QUEUE_SIZE, sleep=None, poll_interval=QUEUE_POLL_INTERVAL):
+        """
+        Initializes the StrokeQueue.
+
+        Args:
+            max_size (int): The largest number of strokes the queue holds.
+            sleep (callable): A function sleeping for a number of seconds, defaults to VEXLib's time.sleep.
+            poll_interval (float): How long to sleep between checks of a full or empty queue, in seconds.
+        """
+        if max_size < 1:
+            raise ValueError("Queue size must be at least 1, got " + str(max_size))
+        if sleep is None:
+            from VEXLib.Util import time
+            sleep = time.sleep
+        self.max_size = max_size
+        self.sleep = sleep
+        self.poll_interval = poll_interval
+        self.items = []
+        self.closed = False
+        self.cancelled = False
+        self.error = None
+
+    def __len__(self):
+        return len(self.items)
+
+    def ready(self):
+        """
+        Returns:
+            bool: Whether get would return straight away instead of waiting for the producer.
+        """
+        return bool(self.items) or self.closed
+
+    def put(self, item):
+        """
+        Adds an item to the back of the queue, waiting while the queue is full.
+
+        Args:
+            item: The item to add.
+
+        Returns:
+            bool: Whether the item was added, False if the consumer cancelled the queue.
+        """
+        while len(self.items) >= self.max_size and not self.cancelled:
+            self.sleep(self.poll_interval)
+        if self.cancelled:
+            return False
+        self.items.append(item)
+        return True
+
+    def get(self):
+        """
+        Removes the item at the front of the queue, waiting while the queue is empty and still open.
+
+        Returns:
+            The item, or None once the queue is closed and every item has been taken.
+
+        Raises:
+            Exception: The error the producer closed the queue with, once every item before it has been taken.
+        """
+        while not self.items and not self.closed:
+            self.sleep(self.poll_interval)
+        if self.items:
+            return self.items.pop(0)
+        if self.error is not None:
+            raise self.error
+        return None
+
+    def __iter__(self):
+        while True:
+            item = self.get()
+            if item is None:
+                return
+            yield item
+
+    def close(self, error=None):
+        """
+        Marks the end of the items, so consumers stop waiting once the queue is empty.
+
+        Args:
+            error (Exception): The error that stopped the producer early, re-raised by get, or None.
+        """
+        self.error = error
+        self.closed = True
+
+    def cancel(self):
+        """
+        Stops the producer, so it does not wait forever for space after the consumer stops taking items.
+        """
+        self.cancelled = True
+        self.items = []
+
+    def fill(self, items):
+        """
+        Adds every item of an iterable to the queue, then closes it. Meant to be run in the producer thread,
+        where any error raised while producing the items is handed over to the consumer instead.
+
+        Args:
+            items (iterable): The items to add. None marks the end of the queue, so it must not be one of them.
+        """
+        try:
+            for item in items:
+                if not self.put(item):
+                    # Let a generator release whatever it holds open, like the file it is reading
+                    if hasattr(items, 'close'):
+                        items.close()
+                    break
+        except Exception as error:
+            self.close(error)
+            return
+        self.close()
@@ -0,0 +1,341 @@
+import math
+
+DEFAULT_CHORD_TOLERANCE = 0.005
+MAX_SUBDIVISION_DEPTH = 16
+MIN_CIRCLE_SEGMENTS = 8
+MAX_CIRCLE_SEGMENTS = 1024
+TAU = 2 * math.pi
+# An (a, b, c, d, e, f) affine transform maps (x, y) to (a x + b y + c, d x + e y + f)
+IDENTITY_TRANSFORM = (1.0, 0.0, 0.0, 0.0, 1.0, 0.0)
+
+# Maps a number of segments per full circle to the cosines and sines of every segment angle
+_unit_circle_tables = {}
+
+
+def point_segment_distance(point, start, end):
+    """
+    Calculates the distance from a point to the closest point on a line segment.
+
+    Args:
+        point (tuple): The (x, y) point to measure from.
+        start (tuple): The (x, y) start point of the segment.
+        end (tuple): The (x, y) end point of the segment.
+
+    Returns:
+        float: The distance from the point to the segment.
+    """
+    dx = end[0] - start[0]
+    dy = end[1] - start[1]
+    px = point[0] - start[0]
+    py = point[1] - start[1]
+    length_squared = dx * dx + dy * dy
+    if length_squared > 0:
+        t = (px * dx + py * dy) / length_squared
+        if t > 1:
+            px -= dx
+            py -= dy
+        elif t > 0:
+            px -= t * dx
+            py -= t * dy
+    return math.sqrt(px * px + py * py)
+
+
+def transform_points(points, transform):
+    """
+    Applies an affine transform to a list of points.
+
+    Args:
+        points (list): The (x, y) points to transform.
+        transform (tuple): The (a, b, c, d, e, f) transform, mapping (x, y) to (a x + b y + c, d x + e y + f).
+
+    Returns:
+        list: The transformed points.
+    """
+    a, b, c, d, e, f = transform
+    return [(a * x + b * y + c, d * x + e * y + f) for x, y in points]
+
+
+def transform_strokes(strokes, transform):
+    """
+    Applies an affine transform to every point of every stroke.
+
+    Args:
+        strokes (list): The strokes to transform, each a list of (x, y) points.
+        transform (tuple): The (a, b, c, d, e, f) transform, mapping (x, y) to (a x + b y + c, d x + e y + f).
+
+    Returns:
+        list: The transformed strokes.
+    """
+    if transform == IDENTITY_TRANSFORM:
+        return strokes
+    return [transform_points(stroke, transform) for stroke in strokes]
+
+
+def circle_segment_count(radius, tolerance=DEFAULT_CHORD_TOLERANCE):
+    """
+    Calculates how many segments a full circle needs so that no chord strays further than tolerance from the arc.
+    Counts are rounded up to a multiple of 4 so that arcs with similar radii share a unit circle table.
+
+    Args:
+        radius (float): The radius of the circle.
+        tolerance (float): The maximum distance between a chord and the arc, in drawing units.
+
+    Returns:
+        int: The number of segments per full circle.
+    """
+    if radius <= tolerance:
+        return MIN_CIRCLE_SEGMENTS
+    # The sagitta of a chord spanning an angle a is radius * (1 - cos(a / 2))
+    segment_angle = 2 * math.acos(1 - tolerance / radius)
+    segment_count = int(math.ceil(TAU / segment_angle))
+    segment_count = (segment_count + 3) // 4 * 4
+    return min(max(segment_count, MIN_CIRCLE_SEGMENTS), MAX_CIRCLE_SEGMENTS)
+
+
+def unit_circle_table(segment_count):
+    """
+    Returns the cosines and sines of the angles that split a circle into segment_count equal segments.
+    Tables are computed once per segment count and cached, so repeated arcs do not recompute any trigonometry.
+
+    Args:
+        segment_count (int): The number of segments per full circle.
+
+    Returns:
+        tuple: A (cosines, sines) pair of lists with segment_count + 1 entries each.
+    """
+    table = _unit_circle_tables.get(segment_count)
+    if table is None:
+        step = TAU / segment_count
+        table = ([math.cos(step * i) for i in range(segment_count + 1)],
+                 [math.sin(step * i) for i in range(segment_count + 1)])
+        _unit_circle_tables[segment_count] = table
+    return table
+
+
+def tessellate_elliptical_arc(center, major_axis, ratio, start_parameter, sweep, tolerance=DEFAULT_CHORD_TOLERANCE):
+    """
+    Approximates an elliptical arc with a polyline that deviates from the arc by at most tolerance.
+    Circular arcs are elliptical arcs with a ratio of 1.
+
+    Args:
+        center (tuple): The (x, y) center of the ellipse.
+        major_axis (tuple): The (x, y) vector from the center to the end of the major axis.
+        ratio (float): The ratio of the minor axis length to the major axis length.
+        start_parameter (float): The parametric angle the arc starts at, in radians.
+        sweep (float): The parametric angle the arc spans, in radians. Positive values run counterclockwise.
+        tolerance (float): The maximum distance between the polyline and the arc, in drawing units.
+
+    Returns:
+        list: The points of the polyline, including both ends of the arc.
+    """
+    major_x, major_y = major_axis
+    minor_x = -major_y * ratio
+    minor_y = major_x * ratio
+
+    segment_count = circle_segment_count(math.sqrt(major_x * major_x + major_y * major_y), tolerance)
+    cosines, sines = unit_circle_table(segment_count)
+    direction = 1 if sweep >= 0 else -1
+    # The last table step is replaced by the exact end point, so it is never duplicated
+    full_steps = min(int(abs(sweep) / (TAU / segment_count) - 1e-9), segment_count)
+
+    start_cos = math.cos(start_parameter)
+    start_sin = math.sin(start_parameter)
+    points = []
+    for i in range(full_steps + 1):
+        # Rotate the table angle by the start parameter using the angle addition identities
+        cos_t = start_cos * cosines[i] - start_sin * sines[i] * direction
+        sin_t = start_sin * cosines[i] + start_cos * sines[i] * direction
+        points.append((center[0] + major_x * cos_t + minor_x * sin_t,
+                       center[1] + major_y * cos_t + minor_y * sin_t))
+
+    end_cos = math.cos(start_parameter + sweep)
+    end_sin = math.sin(start_parameter + sweep)
+    points.append((center[0] + major_x * end_cos + minor_x * end_sin,
+                   center[1] + major_y * end_cos + minor_y * end_sin))
+    return points
+
+
+def tessellate_arc(center, radius, start_angle, sweep, tolerance=DEFAULT_CHORD_TOLERANCE):
+    """
+    Approximates a circular arc with a polyline that deviates from the arc by at most tolerance.
+
+    Args:
+        center (tuple): The (x, y) center of the arc.
+        radius (float): The radius of the arc.
+        start_angle (float): The angle the arc starts at, in radians.
+        sweep (float): The angle the arc spans, in radians. Positive values run counterclockwise.
+        tolerance (float): The maximum distance between the polyline and the arc, in drawing units.
+
+    Returns:
+        list: The points of the polyline, including both ends of the arc.
+    """
+    return tessellate_elliptical_arc(center, (radius, 0.0), 1.0, start_angle, sweep, tolerance)
+
+
+def tessellate_bulge(start, end, bulge, tolerance=DEFAULT_CHORD_TOLERANCE):
+    """
+    Approximates a bulged polyline segment with a polyline.
+    The bulge is the tangent of a quarter of the arc's included angle, positive values curve counterclockwise.
+
+    Args:
+        start (tuple): The (x, y) start point of the segment.
+        end (tuple): The (x, y) end point of the segment.
+        bulge (float): The bulge of the segment, 0 for a straight segment.
+        tolerance (float): The maximum distance between the polyline and the arc, in drawing units.
+
+    Returns:
+        list: The points of the polyline, including start and end.
+    """
+    dx = end[0] - start[0]
+    dy = end[1] - start[1]
+    chord_length = math.sqrt(dx * dx + dy * dy)
+    if bulge == 0 or chord_length == 0:
+        return [start, end]
+
+    included_angle = 4 * math.atan(bulge)
+    # The center lies on the chord's perpendicular bisector, to the left of the chord for counterclockwise arcs
+    center_offset = 1 / (2 * math.tan(included_angle / 2))
+    center = ((start[0] + end[0]) / 2 - dy * center_offset,
+              (start[1] + end[1]) / 2 + dx * center_offset)
+    radius = abs(chord_length / (2 * math.sin(included_angle / 2)))
+    start_angle = math.atan2(start[1] - center[1], start[0] - center[0])
+
+    points = tessellate_arc(center, radius, start_angle, included_angle, tolerance)
+    # Snap the ends back onto the original vertices so neighbouring segments still join exactly
+    points[0] = start
+    points[-1] = end
+    return points
+
+
+def find_knot_span(degree, knots, control_point_count, t):
+    """
+    Finds the index of the knot span containing the parameter t using a binary search.
+
+    Args:
+        degree (int): The degree of the spline.
+        knots (list): The knot vector of the spline.
+        control_point_count (int): The number of control points of the spline.
+        t (float): The parameter to find the span of.
+
+    Returns:
+        int: The index i such that knots[i] <= t < knots[i + 1].
+    """
+    last = control_point_count - 1
+    if t >= knots[last + 1]:
+        return last
+    if t <= knots[degree]:
+        return degree
+    low = degree
+    high = last + 1
+    while high - low > 1:
+        middle = (low + high) // 2
+        if t < knots[middle]:
+            high = middle
+        else:
+            low = middle
+    return low
+
+
+def evaluate_spline(degree, knots, control_points, weights, t):
+    """
+    Evaluates a rational B-spline (NURBS) at the parameter t using de Boor's algorithm.
+
+    Args:
+        degree (int): The degree of the spline.
+        knots (list): The knot vector of the spline, containing len(control_points) + degree + 1 values.
+        control_points (list): The (x, y) control points of the spline.
+        weights (list): The weight of each control point.
+        t (float): The parameter to evaluate the spline at.
+
+    Returns:
+        tuple: The (x, y) point on the spline.
+    """
+    span = find_knot_span(degree, knots, len(control_points), t)
+
+    # Work in homogeneous coordinates so the weights are interpolated along with the points
+    points = []
+    for j in range(degree + 1):
+        x, y = control_points[span - degree + j]
+        weight = weights[span - degree + j]
+        points.append([x * weight, y * weight, weight])
+
+    for r in range(1, degree + 1):
+        for j in range(degree, r - 1, -1):
+            knot_index = span - degree + j
+            denominator = knots[knot_index + degree - r + 1] - knots[knot_index]
+            alpha = (t - knots[knot_index]) / denominator if denominator else 0.0
+            previous = points[j - 1]
+            current = points[j]
+            current[0] = (1.0 - alpha) * previous[0] + alpha * current[0]
+            current[1] = (1.0 - alpha) * previous[1] + alpha * current[1]
+            current[2] = (1.0 - alpha) * previous[2] + alpha * current[2]
+
+    x, y, weight = points[degree]
+    return x / weight, y / weight
+
+
+def flatten_spline(degree, knots, control_points, weights=None, tolerance=DEFAULT_CHORD_TOLERANCE):
+    """
+    Approximates a rational B-spline (NURBS) with a polyline that deviates from the curve by at most tolerance.
+    Each knot span is subdivided adaptively, so gently curving spans produce few points and tight curves produce many.
+
+    Args:
+        degree (int): The degree of the spline.
+        knots (list): The knot vector of the spline, containing len(control_points) + degree + 1 values.
+        control_points (list): The (x, y) control points of the spline.
+        weights (list): The weight of each control point, or None if the spline is not rational.
+        tolerance (float): The maximum distance between the polyline and the curve, in drawing units.
+
+    Returns:
+        list: The points of the polyline.
+    """
+    if weights is None or len(weights) != len(control_points):
+        weights = [1.0] * len(control_points)
+
+    start_parameter = knots[degree]
+    end_parameter = knots[len(control_points)]
+
+    start_point = evaluate_spline(degree, knots, control_points, weights, start_parameter)
+    points = [start_point]
+
+    # Knots are where the curve is allowed to change shape abruptly, so every span is flattened separately
+    span_start = start_parameter
+    for knot in knots[degree + 1:len(control_points) + 1]:
+        if knot <= span_start:
+            continue
+        end_point = evaluate_spline(degree, knots, control_points, weights, knot)
+        _flatten_span(degree, knots, control_points, weights, span_start, start_point, knot, end_point,
+                      tolerance, points)
+        span_start = knot
+        start_point = end_point
+
+    return points
+
+
+def _flatten_span(degree, knots, control_points, weights, t0, p0, t1, p1, tolerance, points):
+    """
+    Appends the points approximating the curve between t0 (exclusive) and t1 (inclusive) to points.
+    The midpoint and both quarter points are checked against the chord so S-shaped sections are not mistaken for lines.
+    """
+    middle = (t0 + t1) / 2
+    middle_point = evaluate_spline(degree, knots, control_points, weights, middle)
+
+    # Intervals are stored as (t0, p0, t1, p1, midpoint parameter, midpoint, depth) and processed depth first
+    stack = [(t0, p0, t1, p1, middle, middle_point, 0)]
+    while stack:
+        t0, p0, t1, p1, middle, middle_point, depth = stack.pop()
+        first_quarter = (t0 + middle) / 2
+        third_quarter = (middle + t1) / 2
+        first_quarter_point = evaluate_spline(degree, knots, control_points, weights, first_quarter)
+        third_quarter_point = evaluate_spline(degree, knots, control_points, weights, third_quarter)
+
+        if depth >= MAX_SUBDIVISION_DEPTH or (
+                point_segment_distance(middle_point, p0, p1) <= tolerance and
+                point_segment_distance(first_quarter_point, p0, p1) <= tolerance and
+                point_segment_distance(third_quarter_point, p0, p1) <= tolerance):
+            points.append(p1)
+            continue
+
+        # Push the second half first so the first half is emitted first
+        stack.append((middle, middle_point, t1, p1, third_quarter, third_quarter_point, depth + 1))
+        stack.append((t0, p0, middle, middle_point, first_quarter, first_quarter_point, depth + 1))
@@ -0,0 +1,192 @@
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from dxf_parser import DXFParser, ENTITIES_SECTION, VISVALINGAM_WHYATT, iter_lines, read_group_codes, \
+    simplify_ramer_douglas_peucker, simplify_visvalingam_whyatt
+
+DEPLOY_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "deploy")
+
+TWO_LINE_DXF = "  0\nSECTION\n  2\nTABLES\n  0\nLAYER\n  2\nHIDDEN\n  0\nENDSEC\n" \
+               "  0\nSECTION\n  2\nENTITIES\n" \
+               "  0\nLWPOLYLINE\n  8\n0\n 90\n2\n 10\n0.0\n 20\n0.0\n 10\n1.0\n 20\n0.0\n" \
+               "  0\nLWPOLYLINE\n  8\n0\n 90\n2\n 10\n1.0\n 20\n0.0\n 10\n1.0\n 20\n1.0\n" \
+               "  0\nLWPOLYLINE\n  8\nHIDDEN\n 90\n2\n 10\n5.0\n 20\n5.0\n 10\n6.0\n 20\n6.0\n" \
+               "  0\nENDSEC\n  0\nEOF\n"
+
+MIRRORED_CURVES_DXF = "  0\nSECTION\n  2\nENTITIES\n" \
+                      "  0\nARC\n 10\n1.0\n 20\n0.0\n 40\n1.0\n 50\n0.0\n 51\n90.0\n230\n-1.0\n" \
+                      "  0\nELLIPSE\n 10\n0.0\n 20\n0.0\n 11\n2.0\n 21\n0.0\n 40\n0.5\n 41\n0.0\n 42\n1.57079633\n" \
+                      "230\n-1.0\n" \
+                      "  0\nENDSEC\n  0\nEOF\n"
+
+CURVES_DXF = "  0\nSECTION\n  2\nENTITIES\n" \
+             "  0\nLINE\n 10\n0.0\n 20\n0.0\n 11\n1.0\n 21\n1.0\n" \
+             "  0\nARC\n 10\n0.0\n 20\n0.0\n 40\n1.0\n 50\n0.0\n 51\n90.0\n" \
+             "  0\nCIRCLE\n 10\n0.0\n 20\n0.0\n 40\n1.0\n" \
+             "  0\nELLIPSE\n 10\n0.0\n 20\n0.0\n 11\n2.0\n 21\n0.0\n 40\n0.5\n 41\n0.0\n 42\n3.14159265\n" \
+             "  0\nLWPOLYLINE\n 90\n3\n 70\n1\n 10\n1.0\n 20\n0.0\n 10\n0.0\n 20\n0.0\n 42\n-1.0\n" \
+             " 10\n-1.0\n 20\n0.0\n" \
+             "  0\nENDSEC\n  0\nEOF\n"
+
+BLOCKS_DXF = "  0\nSECTION\n  2\nBLOCKS\n" \
+             "  0\nBLOCK\n  8\n0\n  2\nTICK\n 10\n1.0\n 20\n0.0\n" \
+             "  0\nLINE\n  8\n0\n 10\n1.0\n 20\n0.0\n 11\n2.0\n 21\n0.0\n" \
+             "  0\nLINE\n  8\nRED\n 10\n1.0\n 20\n1.0\n 11\n1.0\n 21\n2.0\n" \
+             "  0\nENDBLK\n  8\n0\n" \
+             "  0\nBLOCK\n  2\nNESTED\n 10\n0.0\n 20\n0.0\n" \
+             "  0\nINSERT\n  2\nTICK\n 10\n1.0\n 20\n0.0\n" \
+             "  0\nINSERT\n  2\nNESTED\n" \
+             "  0\nENDBLK\n" \
+             "  0\nENDSEC\n" \
+             "  0\nSECTION\n  2\nENTITIES\n" \
+             "  0\nINSERT\n  8\nBLUE\n  2\nTICK\n 10\n10.0\n 20\n10.0\n 41\n2.0\n 42\n2.0\n 50\n90.0\n" \
+             " 70\n2\n 44\n5.0\n" \
+             "  0\nINSERT\n  2\nNESTED\n 10\n0.0\n 20\n-5.0\n" \
+             "  0\nINSERT\n  2\nMISSING\n" \
+             "  0\nENDSEC\n  0\nEOF\n"
+
+ZIG_ZAG_LINE = [(x / 10, 0.001 * (-1) ** x) for x in range(11)] + [(1, 1)]
+
+
+class TestIterLines(unittest.TestCase):
+    def test_line_endings(self):
+        text = "a\r\nb\rc\nd"
+        for chunk_size in range(1, len(text) + 1):
+            self.assertEqual(list(iter_lines(text, chunk_size)), text.splitlines())
+
+    def test_crlf_split_across_chunks(self):
+        text = "code\r\nvalue\r\n"
+        self.assertEqual(list(iter_lines(io.StringIO(text), 5)), ["code", "value"])
+
+    def test_empty_lines(self):
+        text = "a\n\n\rb\r\r\n"
+        self.assertEqual(list(iter_lines(text, 2)), text.splitlines())
+
+    def test_read_group_codes(self):
+        pairs = list(read_group_codes("  0\r\nSECTION\r\n  2\r\nHEADER\r\n", 3))
+        self.assertEqual(pairs, [("0", "SECTION"), ("2", "HEADER")])
+
+
+class TestDXFParser(unittest.TestCase):
+    def test_stream_matches_string(self):
+        with open(os.path.join(DEPLOY_DIRECTORY, "evans_drawing.dxf"), "r") as dxf_file:
+            streamed_lines = DXFParser(dxf_file, 64).extract_lines()
+        with open(os.path.join(DEPLOY_DIRECTORY, "evans_drawing.dxf"), "r") as dxf_file:
+            dxf_parser = DXFParser(dxf_file.read())
+        dxf_parser.parse()
+        self.assertEqual(streamed_lines, dxf_parser.extract_lines())
+        self.assertEqual(len(streamed_lines), 31)
+
+        dxf_parser = DXFParser(BLOCKS_DXF)
+        dxf_parser.parse()
+        self.assertEqual(dxf_parser.extract_lines(), DXFParser(BLOCKS_DXF).extract_lines())
+
+    def test_section_filter(self):
+        entities = list(DXFParser(TWO_LINE_DXF).iter_entities(ENTITIES_SECTION))
+        self.assertEqual([entity["type"] for entity in entities], ["LWPOLYLINE"] * 3)
+
+    def test_layer_filter(self):
+        dxf_parser = DXFParser(TWO_LINE_DXF)
+        self.assertEqual(dxf_parser.extract_lines(layers=("HIDDEN",)), [[(5.0, 5.0), (6.0, 6.0)]])
+
+    def test_curves(self):
+        line, arc, circle, ellipse, polyline = DXFParser(CURVES_DXF).extract_lines(tolerance=0.01)
+        self.assertEqual(line, [(0.0, 0.0), (1.0, 1.0)])
+        self.assertAlmostEqual(arc[-1][0], 0)
+        self.assertAlmostEqual(arc[-1][1], 1)
+        self.assertAlmostEqual(circle[0][0], circle[-1][0])
+        self.assertAlmostEqual(circle[0][1], circle[-1][1])
+        self.assertAlmostEqual(max(x for x, y in ellipse), 2)
+        self.assertAlmostEqual(max(y for x, y in ellipse), 1, 2)
+
+        # The bulge belongs to the second vertex, so only the segment from (0, 0) to (-1, 0) is curved
+        self.assertEqual(polyline[:2], [(1.0, 0.0), (0.0, 0.0)])
+        self.assertLess(min(y for x, y in polyline), -0.49)
+        self.assertEqual(polyline[-1], (1.0, 0.0))
+
+    def test_mirrored_curves(self):
+        arc, ellipse = DXFParser(MIRRORED_CURVES_DXF).extract_lines(tolerance=0.01)
+        # The arc's center is in object coordinates, so the whole arc is mirrored across the Y axis
+        self.assertAlmostEqual(arc[0][0], -2)
+        self.assertAlmostEqual(arc[-1][0], -1)
+        self.assertAlmostEqual(arc[-1][1], 1)
+        # The ellipse's center and major axis are in world coordinates, and only its minor axis flips, below the X axis
+        self.assertAlmostEqual(ellipse[0][0], 2)
+        self.assertAlmostEqual(ellipse[0][1], 0)
+        self.assertAlmostEqual(ellipse[-1][0], 0)
+        self.assertAlmostEqual(ellipse[-1][1], -1)
+        self.assertTrue(all(x > -1e-6 and y < 1e-6 for x, y in ellipse))
+
+    def assertLinesAlmostEqual(self, lines, expected_lines):
+        self.assertEqual(len(lines), len(expected_lines))
+        for line, expected_line in zip(lines, expected_lines):
+            self.assertEqual(len(line), len(expected_line))
+            for point, expected_point in zip(line, expected_line):
+                self.assertAlmostEqual(point[0], expected_point[0])
+                self.assertAlmostEqual(point[1], expected_point[1])
+
+    def test_inserts(self):
+        dxf_parser = DXFParser(BLOCKS_DXF)
+        self.assertLinesAlmostEqual(dxf_parser.extract_lines(), [
+            # Two columns of TICK, rotated by 90 degrees, so the columns run up the Y axis
+            [(10.0, 10.0), (10.0, 12.0)], [(8.0, 10.0), (6.0, 10.0)],
+            [(10.0, 15.0), (10.0, 17.0)], [(8.0, 15.0), (6.0, 15.0)],
+            # NESTED inserts TICK once and itself, which expands to nothing
+            [(1.0, -5.0), (2.0, -5.0)], [(1.0, -4.0), (1.0, -3.0)],
+        ])
+        self.assertEqual(len(dxf_parser.block_geometry["TICK"]), 2)
+
+    def test_insert_layers(self):
+        # Block members on layer 0 take the layer of the insert, others keep their own
+        self.assertLinesAlmostEqual(DXFParser(BLOCKS_DXF).extract_lines(layers=("BLUE",)),
+                                    [[(10.0, 10.0), (10.0, 12.0)], [(10.0, 15.0), (10.0, 17.0)]])
+        self.assertEqual(len(DXFParser(BLOCKS_DXF).extract_lines(layers=("RED",))), 3)
+
+    def test_combine_lines(self):
+        dxf_parser = DXFParser(TWO_LINE_DXF)
+        combined_lines = dxf_parser.combine_lines(dxf_parser.extract_lines(layers=("0",)))
+        self.assertEqual(combined_lines, [[(0.0, 0.0), (1.0, 0.0), (1.0, 1.0)]])
+
+    def test_combine_lines_reverses(self):
+        lines = [[(1, 0), (2, 0)], [(3, 0), (2, 0)], [(1, 0), (0, 0)]]
+        self.assertEqual(DXFParser("").combine_lines(lines), [[(0, 0), (1, 0), (2, 0), (3, 0)]])
+
+    def test_combine_lines_tolerance(self):
+        lines = [[(0, 0), (3.182379, 1)], [(3.182382, 1.000002), (4, 4)]]
+        self.assertEqual(DXFParser("").combine_lines(lines), [[(0, 0), (3.182379, 1), (4, 4)]])
+        self.assertEqual(len(DXFParser("").combine_lines(lines, 0.000001)), 2)
+
+    def test_combine_lines_keeps_loops_closed(self):
+        square = [(0, 0), (1, 0), (1, 1), (0, 1), (0, 0)]
+        lines = [square, [(0, 0), (-1, -1)]]
+        combined_lines = DXFParser("").combine_lines(lines)
+        self.assertEqual(combined_lines[0], square)
+        self.assertEqual(len(combined_lines), 2)
+
+
+class TestSimplify(unittest.TestCase):
+    def test_ramer_douglas_peucker(self):
+        self.assertEqual(simplify_ramer_douglas_peucker(ZIG_ZAG_LINE, 0.01), [ZIG_ZAG_LINE[0], (1, 0.001), (1, 1)])
+        self.assertEqual(simplify_ramer_douglas_peucker(ZIG_ZAG_LINE, 0.0001), ZIG_ZAG_LINE)
+
+    def test_visvalingam_whyatt(self):
+        self.assertEqual(simplify_visvalingam_whyatt(ZIG_ZAG_LINE, 0.01), [ZIG_ZAG_LINE[0], (1, 0.001), (1, 1)])
+        self.assertEqual(simplify_visvalingam_whyatt(ZIG_ZAG_LINE, 0.0001), ZIG_ZAG_LINE)
+
+    def test_short_lines_are_unchanged(self):
+        self.assertEqual(simplify_ramer_douglas_peucker([(0, 0), (1, 1)]), [(0, 0), (1, 1)])
+        self.assertEqual(simplify_visvalingam_whyatt([(0, 0)]), [(0, 0)])
+
+    def test_simplify_lines(self):
+        dxf_parser = DXFParser("")
+        simplified_lines = dxf_parser.simplify_lines([ZIG_ZAG_LINE, [(0, 0), (1, 1)]], 0.01, VISVALINGAM_WHYATT)
+        self.assertEqual(simplified_lines, [[ZIG_ZAG_LINE[0], (1, 0.001), (1, 1)], [(0, 0), (1, 1)]])
+        self.assertRaises(ValueError, dxf_parser.simplify_lines, [ZIG_ZAG_LINE], 0.01, "unknown")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from feedforward_controller import FeedforwardController
+from motion_planner import limit_axis_speeds
+
+
+class TestFeedforwardController(unittest.TestCase):
+    def setUp(self):
+        self.time = 0.0
+
+    def clock(self):
+        return self.time
+
+    def test_feedforward_terms(self):
+        controller = FeedforwardController(kp=0.0, ks=0.1, kv=0.5, ka=0.2, clock=self.clock)
+        controller.set_target(1.0, 1.0, 0.5)
+        self.assertAlmostEqual(controller.update(0.0), 0.1 + 0.5 + 0.1)
+        controller.set_target(1.0, -1.0, 0.0)
+        self.assertAlmostEqual(controller.update(0.0), -0.6)
+        controller.set_target(1.0)
+        self.assertEqual(controller.update(0.0), 0.0)
+
+    def test_derivative_uses_measured_velocity(self):
+        controller = FeedforwardController(kp=0.0, kd=0.5, clock=self.clock)
+        controller.set_target(0.0, 1.0)
+        self.assertAlmostEqual(controller.update(0.0, 0.6), 0.2)
+        # Without a measured velocity, the change in position error is differentiated
+        self.assertEqual(controller.update(0.0), 0.0)
+        self.time += 0.1
+        self.assertAlmostEqual(controller.update(-0.1), 0.5)
+
+    def test_follows_a_ramp_without_lag(self):
+        # A velocity-controlled axis that moves at exactly the commanded velocity
+        position = 0.0
+        controller = FeedforwardController(kp=2.0, kv=1.0, clock=self.clock)
+        feedback_only = FeedforwardController(kp=2.0, clock=self.clock)
+        lagging_position = 0.0
+        for _ in range(50):
+            self.time += 0.02
+            controller.set_target(self.time * 0.5, 0.5)
+            feedback_only.set_target(self.time * 0.5, 0.5)
+            position += controller.update(position) * 0.02
+            lagging_position += feedback_only.update(lagging_position) * 0.02
+        self.assertLess(abs(self.time * 0.5 - position), 0.02)
+        self.assertGreater(self.time * 0.5 - lagging_position, 0.2)
+
+    def test_saturation_and_anti_windup(self):
+        controller = FeedforwardController(kp=1.0, ki=1.0, output_limit=0.5, clock=self.clock)
+        controller.set_target(10.0)
+        controller.update(0.0)
+        for _ in range(200):
+            self.time += 0.02
+            self.assertEqual(controller.update(0.0), 0.5)
+        # The integral only holds what the output can use, so it lets go as soon as the error is gone
+        self.assertLess(controller.integral, 0.0)
+        self.time += 0.02
+        self.assertLess(controller.update(10.0), 0.5)
+
+        controller.reset()
+        self.assertEqual(controller.integral, 0.0)
+
+    def test_anti_windup_follows_the_applied_output(self):
+        # The y axis is within the controllers' limit, but is slowed down with the x axis to keep them in proportion
+        integrals = []
+        for apply_output in (True, False):
+            x_controller = FeedforwardController(kp=1.0, ki=1.0, clock=self.clock)
+            y_controller = FeedforwardController(kp=1.0, ki=1.0, clock=self.clock)
+            x_controller.set_target(10.0)
+            y_controller.set_target(0.5)
+            for _ in range(200):
+                self.time += 0.02
+                x_speed, y_speed = limit_axis_speeds([x_controller.update(0.0), y_controller.update(0.0)], 0.6)
+                if apply_output:
+                    x_controller.apply_output(x_speed)
+                    y_controller.apply_output(y_speed)
+            integrals.append(y_controller.integral)
+        # Told what it actually got, the y controller stops building up its integral while it is held back
+        self.assertLess(integrals[0], 0.0)
+        self.assertGreater(integrals[1], 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
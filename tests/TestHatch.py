@@ -0,0 +1,92 @@
+import math
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from dxf_parser import DXFParser, ENTITIES_SECTION
+from hatch import hatch_loops, read_hatch_loops
+
+SQUARE = [(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)]
+
+HATCH_DXF = "  0\nSECTION\n  2\nENTITIES\n" \
+            "  0\nHATCH\n  8\n0\n 10\n0.0\n 20\n0.0\n 30\n0.0\n  2\nSOLID\n 70\n1\n 71\n0\n 91\n2\n" \
+            " 92\n7\n 72\n0\n 73\n1\n 93\n4\n 10\n0.0\n 20\n0.0\n 10\n2.0\n 20\n0.0\n 10\n2.0\n 20\n2.0\n" \
+            " 10\n0.0\n 20\n2.0\n 97\n0\n" \
+            " 92\n16\n 93\n4\n" \
+            " 72\n1\n 10\n0.5\n 20\n0.5\n 11\n1.5\n 21\n0.5\n" \
+            " 72\n1\n 10\n1.5\n 20\n0.5\n 11\n1.5\n 21\n1.2\n" \
+            " 72\n2\n 10\n1.0\n 20\n1.2\n 40\n0.5\n 50\n0.0\n 51\n180.0\n 73\n1\n" \
+            " 72\n1\n 10\n0.5\n 20\n1.2\n 11\n0.5\n 21\n0.5\n 97\n0\n" \
+            " 75\n0\n 76\n1\n 98\n0\n" \
+            "  0\nENDSEC\n  0\nEOF\n"
+
+
+def row_segments(strokes, y):
+    """
+    Returns the (min x, max x) ranges of every stroke segment that runs along the row at y.
+    """
+    segments = []
+    for stroke in strokes:
+        for start, end in zip(stroke, stroke[1:]):
+            if abs(start[1] - y) < 1e-9 and abs(end[1] - y) < 1e-9:
+                segments.append((min(start[0], end[0]), max(start[0], end[0])))
+    return sorted(segments)
+
+
+class TestHatchLoops(unittest.TestCase):
+    def test_square_is_one_zig_zag(self):
+        strokes = hatch_loops([SQUARE], 0.25, 0)
+        self.assertEqual(strokes, [[(0.0, 0.125), (1.0, 0.125), (1.0, 0.375), (0.0, 0.375),
+                                    (0.0, 0.625), (1.0, 0.625), (1.0, 0.875), (0.0, 0.875)]])
+
+    def test_angle(self):
+        strokes = hatch_loops([SQUARE], 0.1, 90)
+        for stroke in strokes:
+            for x, y in stroke:
+                self.assertTrue(-1e-9 <= x <= 1 + 1e-9 and -1e-9 <= y <= 1 + 1e-9)
+        # Vertical fill lines run the full height of the square
+        lengths = [abs(end[1] - start[1]) for stroke in strokes for start, end in zip(stroke, stroke[1:])]
+        self.assertAlmostEqual(max(lengths), 1)
+
+    def test_holes_are_left_empty(self):
+        outer = [(0.0, 0.0), (4.0, 0.0), (4.0, 4.0), (0.0, 4.0)]
+        hole = [(1.0, 1.0), (3.0, 1.0), (3.0, 3.0), (1.0, 3.0)]
+        strokes = hatch_loops([outer, hole], 1, 0)
+        self.assertEqual(row_segments(strokes, 0.5), [(0.0, 4.0)])
+        self.assertEqual(row_segments(strokes, 1.5), [(0.0, 1.0), (3.0, 4.0)])
+        # Both sides of the hole are filled in a zig-zag that follows its edges
+        self.assertEqual(len(strokes), 2)
+
+    def test_rejects_bad_spacing(self):
+        self.assertRaises(ValueError, hatch_loops, [SQUARE], 0)
+
+
+class TestReadHatchLoops(unittest.TestCase):
+    def test_clockwise_arc_edge(self):
+        groups = [("91", "1"), ("92", "1"), ("93", "3"),
+                  ("72", "1"), ("10", "0.0"), ("20", "0.0"), ("11", "0.0"), ("21", "1.0"),
+                  ("72", "2"), ("10", "0.0"), ("20", "0.0"), ("40", "1.0"), ("50", "270.0"), ("51", "360.0"),
+                  ("73", "0"),
+                  ("72", "1"), ("10", "1.0"), ("20", "0.0"), ("11", "0.0"), ("21", "0.0")]
+        loop, = read_hatch_loops(groups, 0.01)
+        self.assertEqual(loop[:2], [(0.0, 0.0), (0.0, 1.0)])
+        self.assertAlmostEqual(loop[-1][0], 1)
+        self.assertAlmostEqual(loop[-1][1], 0)
+        for x, y in loop[1:]:
+            self.assertAlmostEqual(math.hypot(x, y), 1, 2)
+
+    def test_dxf_hatch(self):
+        entity, = DXFParser(HATCH_DXF).iter_entities(ENTITIES_SECTION)
+        outer, hole = read_hatch_loops(entity["groups"], 0.01)
+        self.assertEqual(outer, [(0.0, 0.0), (2.0, 0.0), (2.0, 2.0), (0.0, 2.0)])
+        self.assertAlmostEqual(max(y for x, y in hole), 1.7, 3)
+
+        strokes = DXFParser(HATCH_DXF).extract_lines(tolerance=0.01, hatch_spacing=0.1, hatch_angle=0)
+        self.assertEqual(row_segments(strokes, 0.85), [(0.0, 0.5), (1.5, 2.0)])
+        self.assertEqual(DXFParser(HATCH_DXF).extract_lines(hatch_spacing=None), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
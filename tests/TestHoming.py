@@ -0,0 +1,116 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from homing import StallDetector, calibration_valid, home_axes, load_calibration, save_calibration
+
+
+class FakeAxis:
+    """
+    An axis that moves at a constant speed until it reaches its hard stop.
+    """
+
+    def __init__(self, distance, speed, clock, velocity=50.0):
+        self.distance = distance
+        self.speed = speed
+        self.velocity = velocity
+        self.clock = clock
+        self.start_time = None
+        self.finished = None
+
+    def start(self):
+        self.start_time = self.clock()
+
+    def read(self):
+        travelled = (self.clock() - self.start_time) * self.speed
+        velocity = 0.0 if travelled >= self.distance else self.velocity
+        return velocity, 2.0 if velocity == 0 else 0.5
+
+    def finish(self, homed):
+        self.finished = (homed, self.clock())
+
+
+class TestHoming(unittest.TestCase):
+    def setUp(self):
+        self.time = 0.0
+
+    def clock(self):
+        return self.time
+
+    def sleep(self, seconds):
+        self.time += seconds
+
+    def get_homing_axis(self, axis, **kwargs):
+        return axis.start, axis.read, axis.finish, StallDetector(clock=self.clock, **kwargs)
+
+    def test_stall_detector_debounces(self):
+        detector = StallDetector(debounce_time=0.1, spin_up_time=0.2, clock=self.clock)
+        detector.start()
+        # Standing still while spinning up is not a stall
+        self.assertFalse(detector.update(0.0))
+        self.time = 0.25
+        self.assertFalse(detector.update(0.0))
+        self.time = 0.3
+        self.assertFalse(detector.update(50.0))
+        self.time = 0.35
+        self.assertFalse(detector.update(0.0))
+        self.time = 0.45
+        self.assertTrue(detector.update(0.0))
+        self.assertTrue(detector.update(50.0))
+
+    def test_stall_detector_current_threshold(self):
+        detector = StallDetector(current_threshold=1.5, debounce_time=0.0, spin_up_time=0.0, clock=self.clock)
+        detector.start()
+        self.assertFalse(detector.update(0.0, 0.5))
+        self.assertTrue(detector.update(0.0, 2.0))
+
+    def test_homes_axes_at_the_same_time(self):
+        x_axis = FakeAxis(1.0, 1.0, self.clock)
+        y_axis = FakeAxis(2.0, 1.0, self.clock)
+        self.assertTrue(home_axes([self.get_homing_axis(x_axis), self.get_homing_axis(y_axis)], self.clock,
+                                  self.sleep))
+        # Each axis finishes as soon as it stalls, and the slowest one sets the total time
+        self.assertTrue(x_axis.finished[0])
+        self.assertAlmostEqual(x_axis.finished[1], 1.1, delta=0.05)
+        self.assertAlmostEqual(y_axis.finished[1], 2.1, delta=0.05)
+        self.assertAlmostEqual(self.time, 2.1, delta=0.05)
+
+    def test_slow_axis_needs_its_own_threshold(self):
+        # An axis homing slower than the default threshold looks stalled as soon as it has spun up
+        x_axis = FakeAxis(1.0, 1.0, self.clock, velocity=4.0)
+        self.assertTrue(home_axes([self.get_homing_axis(x_axis)], self.clock, self.sleep))
+        self.assertLess(x_axis.finished[1], 0.5)
+
+        self.time = 0.0
+        x_axis = FakeAxis(1.0, 1.0, self.clock, velocity=4.0)
+        self.assertTrue(home_axes([self.get_homing_axis(x_axis, velocity_threshold=2.0)], self.clock, self.sleep))
+        self.assertAlmostEqual(x_axis.finished[1], 1.1, delta=0.05)
+
+    def test_homing_times_out(self):
+        x_axis = FakeAxis(100.0, 1.0, self.clock)
+        self.assertFalse(home_axes([self.get_homing_axis(x_axis)], self.clock, self.sleep, timeout=1.0))
+        self.assertFalse(x_axis.finished[0])
+
+    def test_calibration_is_only_valid_while_the_encoders_match(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "calibration.json")
+        self.assertIsNone(load_calibration(path))
+        self.assertFalse(calibration_valid(None, {"x": 0.0}))
+
+        save_calibration({"x": 36000.0, "y": 36000.0}, {"x": 36500.0, "y": 36010.0}, path)
+        calibration = load_calibration(path)
+        self.assertEqual(calibration["offsets"]["x"], 36000.0)
+        self.assertTrue(calibration_valid(calibration, {"x": 36501.0, "y": 36010.0}))
+        # An axis moved by hand, or encoders reset by a power cycle
+        self.assertFalse(calibration_valid(calibration, {"x": 36600.0, "y": 36010.0}))
+        self.assertFalse(calibration_valid(calibration, {"x": 0.0, "y": 0.0}))
+        self.assertFalse(calibration_valid(calibration, {"x": 36500.0, "z": 36010.0}))
+
+
+if __name__ == "__main__":
+    unittest.main()
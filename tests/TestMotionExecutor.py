@@ -0,0 +1,192 @@
+import math
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from motion_executor import MotionExecutor
+
+
+class FakePlotter:
+    """
+    A plotter whose tool follows the setpoint it is driven to exactly.
+    """
+
+    def __init__(self):
+        self.position = (0.0, 0.0)
+        self.time = 0.0
+        self.pen_changes = []
+        self.stops = 0
+        self.drives = 0
+        self.speeds = []
+
+    def get_position(self):
+        return self.position
+
+    def drive(self, position, velocity, acceleration):
+        self.drives += 1
+        self.position = position
+        self.speeds.append(math.sqrt(velocity[0] ** 2 + velocity[1] ** 2))
+
+    def stop(self):
+        self.stops += 1
+
+    def set_pen(self, down):
+        self.pen_changes.append((down, self.position))
+
+    def clock(self):
+        return self.time
+
+
+class LaggingPlotter(FakePlotter):
+    """
+    A plotter whose tool only covers a fraction of the distance to its setpoint on every control step.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.drive_calls = []
+
+    def drive(self, position, velocity, acceleration):
+        self.drives += 1
+        self.drive_calls.append((self.position, position, velocity, acceleration))
+        self.position = (self.position[0] + (position[0] - self.position[0]) * 0.2,
+                         self.position[1] + (position[1] - self.position[1]) * 0.2)
+
+
+class TestMotionExecutor(unittest.TestCase):
+    def setUp(self):
+        self.plotter = FakePlotter()
+        self.motion = MotionExecutor(self.plotter.get_position, self.plotter.drive, self.plotter.stop,
+                                     self.plotter.set_pen, self.plotter.clock)
+
+    def run_until_idle(self, max_steps=1000):
+        for _ in range(max_steps):
+            if self.motion.is_idle():
+                return
+            self.motion.step()
+            self.plotter.time += 0.02
+        self.fail("Motion did not finish")
+
+    def test_one_control_step_per_call(self):
+        self.motion.enqueue_move((1.0, 0.0), 1.0)
+        self.motion.step()
+        self.plotter.time += 0.02
+        self.motion.step()
+        self.assertEqual(self.plotter.drives, 2)
+        self.assertGreater(self.plotter.position[0], 0)
+        self.assertLess(self.plotter.position[0], 0.01)
+        self.assertFalse(self.motion.is_idle())
+        self.assertEqual(self.motion.get_progress()[:2], (0, 1))
+
+        self.run_until_idle()
+        self.assertLess(abs(self.plotter.position[0] - 1), self.motion.tolerance)
+        self.assertEqual(self.motion.get_progress()[:2], (1, 1))
+        self.assertEqual(self.plotter.stops, 1)
+        # The setpoint never speeds up faster than the acceleration limit
+        for speed, next_speed in zip([0.0] + self.plotter.speeds, self.plotter.speeds):
+            self.assertLessEqual(next_speed - speed, self.motion.acceleration * 0.02 + 1e-9)
+
+    def test_flows_through_shallow_corners(self):
+        circle = [(1 + math.cos(angle * math.pi / 18), 1 + math.sin(angle * math.pi / 18)) for angle in range(37)]
+        self.plotter.position = circle[0]
+        for point in circle[1:]:
+            self.motion.enqueue_move(point, 1.0)
+        self.run_until_idle()
+        flowing_time = self.plotter.time
+        # The tool only slows down at the start and the end, not at the vertices in between
+        middle = self.plotter.speeds[len(self.plotter.speeds) // 4:3 * len(self.plotter.speeds) // 4]
+        self.assertGreater(min(middle), 0.5 * self.motion.max_speed)
+
+        plotter = FakePlotter()
+        plotter.position = circle[0]
+        motion = MotionExecutor(plotter.get_position, plotter.drive, plotter.stop, plotter.set_pen, plotter.clock,
+                                junction_deviation=None)
+        for point in circle[1:]:
+            motion.enqueue_move(point, 1.0)
+        while not motion.is_idle():
+            motion.step()
+            plotter.time += 0.02
+        self.assertLess(flowing_time, plotter.time / 2)
+
+    def test_setpoint_waits_for_a_lagging_tool(self):
+        plotter = LaggingPlotter()
+        motion = MotionExecutor(plotter.get_position, plotter.drive, plotter.stop, plotter.set_pen, plotter.clock,
+                                max_following_error=0.05)
+        motion.enqueue_move((2.0, 1.0), 1.0)
+        while not motion.is_idle():
+            motion.step()
+            plotter.time += 0.02
+            error = math.sqrt((motion.command_position[0] - plotter.position[0]) ** 2 +
+                              (motion.command_position[1] - plotter.position[1]) ** 2)
+            self.assertLess(error, 0.05 + motion.max_speed * 0.02)
+            # Both axes move together, so the tool stays on the line
+            self.assertAlmostEqual(plotter.position[0], 2 * plotter.position[1])
+        self.assertLess(abs(plotter.position[0] - 2), motion.tolerance)
+
+        # While the setpoint is held, the tool is driven to it without any feedforward
+        held_calls = []
+        for previous, call in zip(plotter.drive_calls, plotter.drive_calls[1:]):
+            tool, setpoint = call[0], previous[1]
+            if math.sqrt((setpoint[0] - tool[0]) ** 2 + (setpoint[1] - tool[1]) ** 2) > 0.05:
+                self.assertEqual(call[1], setpoint)
+                held_calls.append(call[2:])
+        self.assertTrue(held_calls)
+        for velocity, acceleration in held_calls:
+            self.assertEqual(velocity, (0.0, 0.0))
+            self.assertEqual(acceleration, (0.0, 0.0))
+
+    def test_stroke_waits_for_the_pen(self):
+        self.motion.enqueue_stroke([(1.0, 1.0), (2.0, 1.0)], dwell=0.1)
+        self.assertEqual(self.motion.queued_count(), 4)
+        self.run_until_idle()
+        self.assertEqual([down for down, _ in self.plotter.pen_changes], [True, False])
+        self.assertLess(abs(self.plotter.pen_changes[0][1][0] - 1), self.motion.tolerance)
+        self.assertLess(abs(self.plotter.pen_changes[1][1][0] - 2), self.motion.tolerance)
+
+        # Dwelling holds the tool still without moving on
+        self.motion.enqueue_pen(True, 0.1)
+        self.motion.enqueue_move((0.0, 0.0), 0.5)
+        self.motion.step()
+        drives = self.plotter.drives
+        self.motion.step()
+        self.assertEqual(self.plotter.drives, drives)
+        self.plotter.time += 0.1
+        self.motion.step()
+        self.assertEqual(self.plotter.drives, drives + 1)
+
+    def test_pen_callback_sets_the_dwell(self):
+        self.plotter.set_pen = lambda down: 0.3 if down else 0.04
+        motion = MotionExecutor(self.plotter.get_position, self.plotter.drive, self.plotter.stop,
+                                self.plotter.set_pen, self.plotter.clock)
+        motion.enqueue_pen(True)
+        motion.enqueue_pen(False)
+        motion.step()
+        self.plotter.time += 0.28
+        motion.step()
+        self.assertEqual(motion.queued_count(), 2)
+        self.plotter.time += 0.02
+        motion.step()
+        self.assertEqual(motion.queued_count(), 1)
+        self.plotter.time += 0.03
+        motion.step()
+        self.assertEqual(motion.queued_count(), 1)
+        self.plotter.time += 0.02
+        motion.step()
+        self.assertTrue(motion.is_idle())
+
+    def test_cancel(self):
+        self.motion.enqueue_move((1.0, 0.0), 0.1)
+        self.motion.enqueue_move((2.0, 0.0), 0.1)
+        self.motion.step()
+        self.motion.cancel()
+        self.assertTrue(self.motion.is_idle())
+        self.assertEqual(self.plotter.stops, 1)
+        self.plotter.time += 0.02
+        self.motion.step()
+        self.assertEqual(self.plotter.drives, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
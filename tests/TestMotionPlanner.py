@@ -0,0 +1,58 @@
+import math
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from motion_planner import junction_speed, limit_axis_speeds, next_speed, plan_speeds, plot_time
+
+
+class TestMotionPlanner(unittest.TestCase):
+    def test_junction_speed(self):
+        self.assertEqual(junction_speed((1.0, 0.0), (1.0, 0.0), 6.0, 0.01), float('inf'))
+        self.assertEqual(junction_speed((1.0, 0.0), (-1.0, 0.0), 6.0, 0.01), 0.0)
+        # A right angle: sin(45 degrees) / (1 - sin(45 degrees)) = 1 + sqrt(2)
+        self.assertAlmostEqual(junction_speed((1.0, 0.0), (0.0, 1.0), 6.0, 0.01), math.sqrt(0.06 * (1 + math.sqrt(2))))
+        # Shallower corners and larger deviations allow higher speeds
+        shallow = (math.cos(0.1), math.sin(0.1))
+        shallow_speed = junction_speed((1.0, 0.0), shallow, 6.0, 0.01)
+        self.assertGreater(shallow_speed, junction_speed((1.0, 0.0), (0.0, 1.0), 6.0, 0.01))
+        self.assertGreater(junction_speed((1.0, 0.0), shallow, 6.0, 0.02), shallow_speed)
+
+    def test_plan_speeds(self):
+        speeds = plan_speeds([1.0, 0.01, 1.0], [2.0, 2.0, 1.0], [float('inf'), 0.5], 4.0)
+        self.assertEqual(speeds[0], 0.0)
+        self.assertEqual(speeds[-1], 0.0)
+        # Every vertex respects its junction and cruise limits
+        self.assertLessEqual(speeds[2], 0.5)
+        self.assertLessEqual(speeds[3], 1.0)
+        # Neighbouring vertices never need more than the acceleration limit to get between them
+        lengths = [1.0, 0.01, 1.0]
+        for index, length in enumerate(lengths):
+            self.assertLessEqual(abs(speeds[index + 1] ** 2 - speeds[index] ** 2), 2 * 4.0 * length + 1e-9)
+        # The short middle move cannot get from the second vertex's speed to above the junction limit
+        self.assertAlmostEqual(speeds[1], math.sqrt(0.5 ** 2 + 2 * 4.0 * 0.01))
+
+    def test_next_speed_brakes_for_the_exit(self):
+        self.assertAlmostEqual(next_speed(0.0, 1.0, 0.0, 2.0, 4.0, 0.02), 0.08)
+        self.assertEqual(next_speed(1.9, 1.0, 0.0, 2.0, 4.0, 0.1), 2.0)
+        self.assertAlmostEqual(next_speed(2.0, 0.02, 0.0, 2.0, 4.0, 0.02), 0.4)
+
+    def test_limit_axis_speeds_keeps_direction(self):
+        self.assertEqual(limit_axis_speeds([0.2, -0.1], 0.5), [0.2, -0.1])
+        limited = limit_axis_speeds([0.8, -0.4, 0.2], 0.5)
+        self.assertAlmostEqual(limited[0], 0.5)
+        self.assertAlmostEqual(limited[1], -0.25)
+        self.assertAlmostEqual(limited[2], 0.125)
+
+    def test_lookahead_cuts_plot_time(self):
+        circle = [(math.cos(angle * math.pi / 36), math.sin(angle * math.pi / 36)) for angle in range(73)]
+        self.assertLess(plot_time(circle, 1.5), plot_time(circle, 1.5, deviation=None) / 2)
+        # A straight line split into pieces takes as long as the unsplit line
+        line = [(index * 0.1, 0.0) for index in range(11)]
+        self.assertAlmostEqual(plot_time(line, 1.5), plot_time([line[0], line[-1]], 1.5), delta=0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
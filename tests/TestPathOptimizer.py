@@ -0,0 +1,48 @@
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from path_optimizer import TravelOptimizer, travel_distance
+
+ROW_OF_STROKES = [[(x, 0), (x, 1)] for x in (4, 0, 3, 1, 2)]
+SQUARE = [(2, 2), (3, 2), (3, 3), (2, 3), (2, 2)]
+
+
+def stroke_key(stroke):
+    return tuple(sorted(stroke))
+
+
+class TestTravelOptimizer(unittest.TestCase):
+    def setUp(self):
+        self.optimizer = TravelOptimizer((0, 0), (0, 0), 1, time.perf_counter)
+
+    def test_travel_distance(self):
+        self.assertEqual(travel_distance([[(3, 4), (3, 0)]], (0, 0), (0, 0)), 8)
+        self.assertEqual(travel_distance([[(3, 4), (3, 0)]], (0, 0)), 5)
+
+    def test_reduces_travel(self):
+        ordered_strokes = self.optimizer.optimize(ROW_OF_STROKES)
+        self.assertLess(self.optimizer.travel_after, self.optimizer.travel_before)
+        self.assertAlmostEqual(self.optimizer.travel_after, travel_distance(ordered_strokes, (0, 0), (0, 0)))
+        self.assertEqual(sorted(map(stroke_key, ordered_strokes)), sorted(map(stroke_key, ROW_OF_STROKES)))
+        # Alternating directions leaves one unit between strokes, then the tool returns home from (4, 1)
+        self.assertAlmostEqual(self.optimizer.travel_after, 4 + 17 ** 0.5)
+
+    def test_chooses_loop_start(self):
+        ordered_strokes = self.optimizer.optimize([SQUARE])
+        self.assertEqual(ordered_strokes[0][0], (2, 2))
+        self.optimizer.start = self.optimizer.end = (4, 4)
+        ordered_strokes = self.optimizer.optimize([SQUARE])
+        self.assertEqual(ordered_strokes[0][0], (3, 3))
+        self.assertEqual(ordered_strokes[0][-1], (3, 3))
+        self.assertEqual(len(ordered_strokes[0]), len(SQUARE))
+
+    def test_empty(self):
+        self.assertEqual(self.optimizer.optimize([]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from path_queue import PATH_PEN_DOWN, PATH_PEN_UP, PathQueue, format_path, parse_path
+
+
+class TestPathQueue(unittest.TestCase):
+    def test_format_and_parse(self):
+        points = [(1.5, 2.0), (-0.25, 3.125)]
+        self.assertEqual(format_path(points), "PATH:1.5|2.0;-0.25|3.125")
+        self.assertEqual(parse_path(format_path(points)), points)
+        self.assertEqual(parse_path("PATH:"), [])
+        with self.assertRaises(ValueError):
+            parse_path("PATH:1.0|a")
+        with self.assertRaises(ValueError):
+            parse_path("PATH:1.0")
+
+    def test_credits_follow_the_points_taken(self):
+        queue = PathQueue(capacity=3)
+        self.assertEqual(queue.get_credit_limit(), 3)
+        self.assertEqual(queue.add_points([(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)]), 3)
+        # Pen changes stay in order with the points, without using up credits
+        queue.add_pen(True)
+        self.assertEqual(queue.take(), (0.0, 0.0))
+        self.assertEqual(queue.get_credit_limit(), 4)
+        self.assertEqual(queue.add_points([(2.0, 2.0)]), 1)
+        self.assertEqual([queue.take() for _ in range(4)], [(1.0, 0.0), (1.0, 1.0), PATH_PEN_DOWN, (2.0, 2.0)])
+        self.assertIsNone(queue.take())
+        self.assertEqual(queue.get_credit_limit(), 7)
+
+    def test_clear_and_reset(self):
+        queue = PathQueue(capacity=4)
+        queue.add_points([(0.0, 0.0), (1.0, 0.0)])
+        queue.add_pen(False)
+        # Dropped points count as taken, so the host's credits stay in step
+        queue.clear()
+        self.assertEqual(len(queue), 0)
+        self.assertEqual(queue.get_credit_limit(), 6)
+        queue.add_pen(False)
+        self.assertEqual(queue.take(), PATH_PEN_UP)
+        queue.reset()
+        self.assertEqual(queue.get_credit_limit(), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from pen import PEN_DOWN_POSITION, PEN_UP_POSITION, Pen
+
+
+class TestPen(unittest.TestCase):
+    def setUp(self):
+        self.time = 0.0
+        self.positions = []
+        self.pen = Pen(self.positions.append, down_time=0.4, up_time=0.2, clearance=0.25, clock=lambda: self.time)
+
+    def test_waits_only_as_long_as_the_servo_travels(self):
+        self.assertAlmostEqual(self.pen.set_down(True), 0.4)
+        self.assertEqual(self.positions, [PEN_DOWN_POSITION])
+        self.time = 1.0
+        self.assertEqual(self.pen.get_position(), 1.0)
+        # Raising only waits until the tip is off the paper
+        self.assertAlmostEqual(self.pen.set_down(False), 0.05)
+        self.assertEqual(self.positions[-1], PEN_UP_POSITION)
+        # Raising a pen that is already up does not wait at all
+        self.time = 2.0
+        self.assertEqual(self.pen.set_down(False), 0.0)
+
+    def test_reversing_part_way(self):
+        self.pen.set_down(True)
+        self.time = 0.2
+        self.assertAlmostEqual(self.pen.get_position(), 0.5)
+        # Halfway down, the tip has not reached the paper yet
+        self.assertEqual(self.pen.set_down(False), 0.0)
+        self.time = 0.25
+        self.assertAlmostEqual(self.pen.get_position(), 0.25)
+        self.assertAlmostEqual(self.pen.set_down(True), 0.3)
+
+    def test_stats(self):
+        self.pen.set_down(True)
+        self.time = 1.0
+        self.pen.set_down(False)
+        self.time = 2.0
+        self.pen.set_down(False)
+        transition_count, transition_time, wait_time = self.pen.get_stats()
+        self.assertEqual(transition_count, 2)
+        self.assertAlmostEqual(transition_time, 0.6)
+        self.assertAlmostEqual(wait_time, 0.45)
+        self.pen.reset_stats()
+        self.assertEqual(self.pen.get_stats(), (0, 0.0, 0.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
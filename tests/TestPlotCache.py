@@ -0,0 +1,85 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from plot_cache import INDEX_FILENAME, PlotCache, file_checksum
+from plot_job import PlotJob
+
+STROKES = [[(0.0, 0.0), (1.0, 1.0)], [(2.0, 2.0), (3.0, 1.0), (4.0, 4.0)]]
+
+
+class TestPlotCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp() + "/"
+        self.plot_job = PlotJob.from_strokes(STROKES)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_file(self, name, content):
+        path = self.directory + name
+        with open(path, "w") as file:
+            file.write(content)
+        return path
+
+    def test_key_changes_with_content_and_parameters(self):
+        path = self.write_file("drawing.dxf", "0\nEOF\n")
+        key = PlotCache.get_key(path, "a")
+        self.assertEqual(PlotCache.get_key(path, "a"), key)
+        self.assertNotEqual(PlotCache.get_key(path, "b"), key)
+        self.write_file("drawing.dxf", "0\nEOF\n\n")
+        self.assertNotEqual(PlotCache.get_key(path, "a"), key)
+
+    def test_file_checksum_is_independent_of_chunk_size(self):
+        path = self.write_file("drawing.dxf", "0\nSECTION\n" * 100)
+        self.assertEqual(file_checksum(path, 7), file_checksum(path, 4096))
+
+    def test_miss_then_hit(self):
+        cache = PlotCache(self.directory)
+        self.assertIsNone(cache.load("key"))
+        cache.store("key", self.plot_job)
+
+        # A new cache reads the entries back from the index
+        plot_job = PlotCache(self.directory).load("key")
+        self.assertEqual(list(plot_job.iter_strokes()), list(self.plot_job.iter_strokes()))
+
+    def test_evicts_least_recently_used_entry(self):
+        cache = PlotCache(self.directory, max_entries=2)
+        cache.store("first", self.plot_job)
+        cache.store("second", self.plot_job)
+        cache.load("first")
+        cache.store("third", self.plot_job)
+        self.assertEqual(sorted(cache.entries), ["first", "third"])
+        # The evicted slot is reused
+        self.assertEqual(sorted(entry["slot"] for entry in cache.entries.values()), [0, 1])
+
+    def test_evicts_to_stay_under_size_limit(self):
+        size = self.plot_job.file_size()
+        cache = PlotCache(self.directory, max_bytes=size * 2 + 1)
+        for key in ("first", "second", "third"):
+            cache.store(key, self.plot_job)
+        self.assertEqual(sorted(cache.entries), ["second", "third"])
+        self.assertLessEqual(cache.total_bytes(), cache.max_bytes)
+
+        cache.store("too big", PlotJob.from_strokes(STROKES * 3))
+        self.assertNotIn("too big", cache.entries)
+
+    def test_damaged_index_and_slot_are_ignored(self):
+        cache = PlotCache(self.directory)
+        cache.store("key", self.plot_job)
+        self.write_file("plot_cache_0.spj", "garbage")
+        self.assertIsNone(PlotCache(self.directory).load("key"))
+
+        self.write_file(INDEX_FILENAME, "{not json")
+        cache = PlotCache(self.directory)
+        self.assertEqual(cache.entries, {})
+        cache.store("key", self.plot_job)
+        self.assertIsNotNone(cache.load("key"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from plot_job import HEADER_SIZE, OP_DRAW, PlotJob, load_plot_job, write_plot_job
+
+STROKES = [[(0.5, 0.25), (1.0, 1.0), (2.0, 0.5)], [(3.0, 4.0), (4.5, 1.5)], [(2.0, 2.0)]]
+
+
+class TestPlotJob(unittest.TestCase):
+    def setUp(self):
+        self.plot_job = PlotJob.from_strokes(STROKES)
+
+    def test_from_strokes(self):
+        self.assertEqual(self.plot_job.stroke_count(), 3)
+        self.assertEqual(self.plot_job.point_count(), 6)
+        self.assertEqual(self.plot_job.bounds, (0.5, 0.25, 4.5, 4.0))
+        self.assertEqual(list(self.plot_job.iter_strokes()), [(OP_DRAW, stroke) for stroke in STROKES])
+
+    def test_round_trip(self):
+        file = io.BytesIO()
+        self.plot_job.write(file)
+        # Header, 3 opcodes padded to 4 bytes, 3 point counts and 6 points
+        self.assertEqual(len(file.getvalue()), HEADER_SIZE + 4 + 3 * 4 + 6 * 2 * 4)
+        self.assertEqual(len(file.getvalue()), self.plot_job.file_size())
+        file.seek(0)
+        plot_job = PlotJob.read(file)
+        self.assertEqual(plot_job.bounds, self.plot_job.bounds)
+        self.assertEqual(list(plot_job.iter_strokes()), list(self.plot_job.iter_strokes()))
+
+    def test_append(self):
+        plot_job = PlotJob.from_strokes([])
+        for stroke in STROKES:
+            plot_job.append(stroke)
+        self.assertEqual(plot_job.bounds, self.plot_job.bounds)
+        self.assertEqual(list(plot_job.iter_strokes()), list(self.plot_job.iter_strokes()))
+
+    def test_empty(self):
+        file = io.BytesIO()
+        PlotJob.from_strokes([]).write(file)
+        file.seek(0)
+        self.assertEqual(list(PlotJob.read(file).iter_strokes()), [])
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, PlotJob.read, io.BytesIO(b"not a plot job"))
+        file = io.BytesIO()
+        self.plot_job.write(file)
+        self.assertRaises(ValueError, PlotJob.read, io.BytesIO(file.getvalue()[:-1]))
+        self.assertRaises(ValueError, PlotJob.read, io.BytesIO(b"DXF!" + file.getvalue()[4:]))
+
+    def test_load_falls_back_on_missing_or_truncated_files(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "drawing.spj")
+        self.assertIsNone(load_plot_job(path))
+        write_plot_job(path, STROKES)
+        self.assertEqual(load_plot_job(path).stroke_count(), 3)
+        # A half-copied job is rejected instead of failing the plot
+        with open(path, 'rb') as file:
+            contents = file.read()
+        with open(path, 'wb') as file:
+            file.write(contents[:len(contents) // 2])
+        self.assertIsNone(load_plot_job(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
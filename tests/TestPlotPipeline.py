@@ -0,0 +1,107 @@
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from plot_pipeline import IDENTITY_TRANSFORM, SCALE_TO_FIT, PlotPipeline, clip_segment, clip_strokes, get_bounds, \
+    get_transform, transform_strokes
+
+DXF_CONTENT = """0
+SECTION
+2
+ENTITIES
+0
+LINE
+10
+-2.0
+20
+1.0
+11
+8.0
+21
+1.0
+0
+LINE
+10
+7.0
+20
+7.0
+11
+9.0
+21
+9.0
+0
+ENDSEC
+0
+EOF
+"""
+
+
+class TestPlotPipeline(unittest.TestCase):
+    def assertPointsAlmostEqual(self, points, expected_points):
+        self.assertEqual(len(points), len(expected_points))
+        for point, expected_point in zip(points, expected_points):
+            self.assertAlmostEqual(point[0], expected_point[0])
+            self.assertAlmostEqual(point[1], expected_point[1])
+
+    def test_explicit_transform(self):
+        transform = get_transform([], 2.0, 90.0, (1.0, 0.5))
+        self.assertPointsAlmostEqual(transform_strokes([[(1.0, 0.0), (0.0, 1.0)]], transform)[0],
+                                     [(1.0, 2.5), (-1.0, 0.5)])
+        self.assertEqual(get_transform([]), IDENTITY_TRANSFORM)
+
+    def test_scale_to_fit_keeps_aspect_ratio(self):
+        strokes = [[(10.0, 10.0), (30.0, 10.0), (30.0, 20.0)]]
+        transform = get_transform(strokes, SCALE_TO_FIT, bounds=(0.0, 0.0, 5.0, 5.0))
+        bounds = get_bounds(transform_strokes(strokes, transform))
+        self.assertPointsAlmostEqual([bounds[:2], bounds[2:]], [(0.0, 0.0), (5.0, 2.5)])
+
+        transform = get_transform(strokes, SCALE_TO_FIT, 90.0, (0.5, 0.0), bounds=(0.0, 0.0, 5.0, 5.0))
+        bounds = get_bounds(transform_strokes(strokes, transform))
+        self.assertPointsAlmostEqual([bounds[:2], bounds[2:]], [(0.5, 0.0), (3.0, 5.0)])
+
+    def test_clip_segment(self):
+        self.assertEqual(clip_segment((-1.0, 1.0), (3.0, 1.0), (0.0, 0.0, 2.0, 2.0)), (0.25, 0.75))
+        self.assertEqual(clip_segment((0.5, 0.5), (1.0, 1.0), (0.0, 0.0, 2.0, 2.0)), (0.0, 1.0))
+        self.assertIsNone(clip_segment((-1.0, 3.0), (3.0, 3.0), (0.0, 0.0, 2.0, 2.0)))
+        self.assertIsNone(clip_segment((-1.0, 1.0), (1.0, 3.5), (0.0, 0.0, 2.0, 2.0)))
+
+    def test_clip_strokes_splits_instead_of_clamping(self):
+        strokes = [[(0.5, 0.5), (0.5, 2.0), (0.8, 2.0), (0.8, 0.5), (0.9, 0.5)], [(0.2, 0.2)], [(3.0, 3.0)]]
+        clipped = clip_strokes(strokes, (0.0, 0.0, 1.0, 1.0))
+        self.assertEqual(len(clipped), 3)
+        self.assertPointsAlmostEqual(clipped[0], [(0.5, 0.5), (0.5, 1.0)])
+        self.assertPointsAlmostEqual(clipped[1], [(0.8, 1.0), (0.8, 0.5), (0.9, 0.5)])
+        self.assertEqual(clipped[2], [(0.2, 0.2)])
+
+    def test_process_clips_to_bed(self):
+        plot_pipeline = PlotPipeline(time_budget=0, clock=lambda: 0.0)
+        strokes = plot_pipeline.process(DXF_CONTENT)
+        self.assertEqual(len(strokes), 1)
+        self.assertPointsAlmostEqual(sorted(strokes[0]), [(0.0, 1.0), (5.0, 1.0)])
+
+    def test_batches_are_plotted_before_the_file_is_read(self):
+        lines = "".join("0\nLINE\n10\n" + str(index % 5) + "\n20\n" + str(index // 5 * 0.1) + "\n11\n" +
+                        str(index % 5 + 0.5) + "\n21\n" + str(index // 5 * 0.1) + "\n" for index in range(200))
+        dxf_file = io.StringIO("0\nSECTION\n2\nENTITIES\n" + lines + "0\nENDSEC\n0\nEOF\n")
+        plot_pipeline = PlotPipeline(time_budget=0, clock=lambda: 0.0, batch_size=10)
+        strokes = plot_pipeline.iter_strokes(dxf_file)
+        self.assertEqual(len(next(strokes)), 2)
+        self.assertLess(dxf_file.tell(), len(dxf_file.getvalue()))
+        self.assertEqual(len(list(strokes)), 199)
+        self.assertGreater(plot_pipeline.travel_before, 0)
+        self.assertLessEqual(plot_pipeline.travel_after, plot_pipeline.travel_before)
+
+    def test_batches_match_whole_drawing(self):
+        batched = PlotPipeline(time_budget=0, clock=lambda: 0.0, batch_size=1).process(DXF_CONTENT)
+        self.assertEqual(batched, PlotPipeline(time_budget=0, clock=lambda: 0.0).process(DXF_CONTENT))
+
+    def test_parameters_include_transform(self):
+        self.assertNotEqual(PlotPipeline(scale=2.0).get_parameters(), PlotPipeline().get_parameters())
+        self.assertNotEqual(PlotPipeline(batch_size=10).get_parameters(), PlotPipeline().get_parameters())
+
+
+if __name__ == "__main__":
+    unittest.main()
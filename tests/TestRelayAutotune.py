@@ -0,0 +1,81 @@
+import math
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from feedforward_controller import FeedforwardController
+from relay_autotune import RelayAutotune, gains_from_ultimate, load_gains, save_gains
+
+
+class DelayedAxis:
+    """
+    An axis whose velocity follows its output after a fixed delay, like a motor running its own velocity loop.
+    Its ultimate gain is pi / (2 * delay * speed) and its ultimate period is 4 * delay.
+    """
+
+    def __init__(self, speed, delay_steps, time_step):
+        self.speed = speed
+        self.time_step = time_step
+        self.outputs = [0.0] * delay_steps
+        self.position = 0.0
+        self.time = 0.0
+
+    def step(self, output):
+        self.outputs.append(output)
+        self.position += self.outputs.pop(0) * self.speed * self.time_step
+        self.time += self.time_step
+
+    def clock(self):
+        return self.time
+
+
+class TestRelayAutotune(unittest.TestCase):
+    def test_measures_the_ultimate_gain_and_period(self):
+        axis = DelayedAxis(5.0, 10, 0.005)
+        autotune = RelayAutotune(1.0, amplitude=0.2, hysteresis=0.001, clock=axis.clock)
+        while not autotune.is_done():
+            axis.step(autotune.update(axis.position))
+        ultimate_gain, ultimate_period = autotune.get_result()
+        self.assertAlmostEqual(ultimate_period, 4 * 0.05, delta=0.02)
+        # The axis oscillates in a triangle wave rather than a sine wave, so the describing function underestimates
+        # the ultimate gain, which errs on the stable side
+        true_ultimate_gain = math.pi / (2 * 0.05 * 5.0)
+        self.assertLess(ultimate_gain, true_ultimate_gain)
+        self.assertGreater(ultimate_gain, 0.7 * true_ultimate_gain)
+        self.assertEqual(autotune.update(axis.position), 0.0)
+
+        # The derived gains settle the axis on a new setpoint without oscillating
+        controller = FeedforwardController(clock=axis.clock, **gains_from_ultimate(ultimate_gain, ultimate_period))
+        controller.set_target(axis.position + 0.5)
+        for _ in range(200):
+            axis.step(controller.update(axis.position))
+            self.assertLess(axis.position, controller.setpoint + 0.02)
+        self.assertAlmostEqual(axis.position, controller.setpoint, delta=0.005)
+
+    def test_times_out_without_oscillation(self):
+        axis = DelayedAxis(0.0, 1, 0.02)
+        autotune = RelayAutotune(1.0, timeout=1.0, clock=axis.clock)
+        while not autotune.is_done():
+            axis.step(autotune.update(axis.position))
+        self.assertTrue(autotune.failed)
+        self.assertIsNone(autotune.get_result())
+
+    def test_saved_gains_are_loaded(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "axis_gains.json")
+        self.assertEqual(load_gains(path), {})
+        gains = {'x': {'kp': 1.0, 'ki': 0.5, 'kd': 0.01}}
+        save_gains(gains, path)
+        self.assertEqual(load_gains(path), gains)
+        with open(path, 'w') as file:
+            file.write("{")
+        self.assertEqual(load_gains(path), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
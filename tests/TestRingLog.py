@@ -0,0 +1,62 @@
+import io
+import os
+import struct
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from ring_log import DEBUG, ERROR, INFO, RingLog
+
+
+class TestRingLog(unittest.TestCase):
+    def setUp(self):
+        self.time = 0.0
+        self.log = RingLog(capacity=4, clock=lambda: self.time)
+        self.log.define_event(1, "MOVE", ("x", "y"))
+
+    def test_disabled_levels_are_not_recorded(self):
+        self.log.debug(1, 1.0, 2.0)
+        self.assertEqual(len(self.log), 0)
+        self.assertFalse(self.log.enabled(DEBUG))
+        self.log.level = DEBUG
+        self.log.debug(1, 1.0, 2.0)
+        self.assertEqual(len(self.log), 1)
+
+    def test_drain_text_formats_records(self):
+        self.time = 1.5
+        self.log.info(1, 1.0, 2.0)
+        self.log.error(7, 3.0)
+        lines = []
+        self.assertEqual(self.log.drain_text(lines.append, 1), 1)
+        self.assertEqual(lines, ["LOG:1.500|INFO|MOVE|x=1.0|y=2.0"])
+        self.log.drain_text(lines.append)
+        self.assertEqual(lines[1], "LOG:1.500|ERROR|EVENT_7|3.0")
+        self.assertEqual(len(self.log), 0)
+
+        # Timestamps keep millisecond resolution after hours of running
+        self.time = 10 * 3600 + 0.007
+        self.log.info(1)
+        self.log.drain_text(lines.append)
+        self.assertTrue(lines[2].startswith("LOG:36000.007|"))
+
+    def test_full_log_overwrites_the_oldest_records(self):
+        for index in range(6):
+            self.time = float(index)
+            self.log.record(INFO, 1, float(index))
+        self.assertEqual(len(self.log), 4)
+        self.assertEqual(self.log.dropped_count, 2)
+        lines = []
+        self.log.drain_text(lines.append)
+        self.assertEqual([line.split("|")[-2] for line in lines], ["x=2.0", "x=3.0", "x=4.0", "x=5.0"])
+
+    def test_drain_binary(self):
+        self.time = 2.0
+        self.log.warning(1, 0.5, -0.25, 4.0)
+        file = io.BytesIO()
+        self.log.drain_binary(file)
+        self.assertEqual(struct.unpack(self.log.record_format, file.getvalue()), (2000, 30, 1, 0.5, -0.25, 4.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
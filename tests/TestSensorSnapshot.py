@@ -0,0 +1,49 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from sensor_snapshot import SensorSnapshot
+
+
+class FakeMotor:
+    def __init__(self):
+        self.angle = 0.0
+        self.queries = 0
+
+    def position(self):
+        self.queries += 1
+        return self.angle
+
+
+class TestSensorSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.motor = FakeMotor()
+        self.sensors = SensorSnapshot()
+        self.sensors.register("position", self.motor.position)
+
+    def test_reads_each_device_once_per_tick(self):
+        self.sensors.update()
+        self.motor.angle = 90.0
+        for _ in range(5):
+            self.assertEqual(self.sensors.get("position"), 0.0)
+        self.assertEqual(self.motor.queries, 1)
+        self.assertEqual(self.sensors.get_stats(), (1, 5))
+
+        self.sensors.update()
+        self.assertEqual(self.sensors.get("position"), 90.0)
+        self.assertEqual(self.sensors.get_stats(), (2, 6))
+
+    def test_unsampled_readings_are_read_on_demand(self):
+        other_motor = FakeMotor()
+        other_motor.angle = 45.0
+        self.sensors.register("other_position", other_motor.position)
+        self.assertEqual(self.sensors.get("other_position"), 45.0)
+        self.assertEqual(self.sensors.get("other_position"), 45.0)
+        self.assertEqual(other_motor.queries, 1)
+        self.assertRaises(KeyError, self.sensors.get, "missing")
+
+
+if __name__ == "__main__":
+    unittest.main()
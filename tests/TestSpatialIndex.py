@@ -0,0 +1,74 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from spatial_index import BoxGrid, PointGrid
+
+
+def distance_squared(point, other_point):
+    return (point[0] - other_point[0]) ** 2 + (point[1] - other_point[1]) ** 2
+
+
+class TestPointGrid(unittest.TestCase):
+    def setUp(self):
+        generator = random.Random(4)
+        self.points = [(generator.uniform(0, 5), generator.uniform(0, 3)) for _ in range(300)]
+        self.queries = [(generator.uniform(-2, 7), generator.uniform(-2, 5)) for _ in range(50)]
+        self.grid = PointGrid(self.points)
+
+    def test_nearest_matches_brute_force(self):
+        for query in self.queries:
+            expected = min(range(len(self.points)), key=lambda index: distance_squared(query, self.points[index]))
+            self.assertEqual(self.grid.nearest(query), expected)
+
+    def test_nearest_with_max_distance(self):
+        self.assertIsNone(self.grid.nearest((100.0, 100.0), 1.0))
+        self.assertEqual(self.grid.nearest(self.points[7], 0.0), 7)
+        self.assertIsNone(PointGrid([]).nearest((0.0, 0.0)))
+
+    def test_within_radius_and_rect(self):
+        for query in self.queries:
+            expected = [index for index, point in enumerate(self.points) if distance_squared(query, point) <= 0.25]
+            self.assertEqual(sorted(self.grid.within_radius(query, 0.5)), expected)
+
+        rect = (1.0, 0.5, 2.5, 1.5)
+        expected = [index for index, (x, y) in enumerate(self.points) if 1.0 <= x <= 2.5 and 0.5 <= y <= 1.5]
+        self.assertEqual(sorted(self.grid.within_rect(rect)), expected)
+
+    def test_remove(self):
+        query = self.queries[0]
+        nearest = self.grid.nearest(query)
+        self.grid.remove(nearest)
+        self.grid.remove(nearest)
+        self.assertEqual(len(self.grid), len(self.points) - 1)
+        self.assertNotEqual(self.grid.nearest(query), nearest)
+        self.assertNotIn(nearest, self.grid.within_radius(query, 10.0))
+
+        for index in range(len(self.points)):
+            self.grid.remove(index)
+        self.assertIsNone(self.grid.nearest(query))
+
+    def test_tiny_cells_are_capped(self):
+        grid = PointGrid([(0.0, 0.0), (100.0, 100.0)], 0.0001)
+        self.assertLessEqual(grid.columns * grid.rows, 9)
+        self.assertEqual(grid.within_rect((99.0, 99.0, 101.0, 101.0)), [1])
+
+
+class TestBoxGrid(unittest.TestCase):
+    def test_intersecting(self):
+        strokes = [[(0.0, 0.0), (1.0, 1.0)], [(2.0, 2.0), (4.0, 2.5)], [(0.5, 3.0), (0.5, 4.0), (1.5, 4.0)]]
+        grid = BoxGrid.from_strokes(strokes)
+        self.assertEqual(grid.boxes[2], (0.5, 3.0, 1.5, 4.0))
+        self.assertEqual(grid.intersecting((0.8, 0.8, 2.5, 3.5)), [0, 1, 2])
+        self.assertEqual(grid.intersecting((0.8, 0.8, 2.5, 3.5), contained=True), [])
+        self.assertEqual(grid.intersecting((-1.0, -1.0, 2.0, 5.0), contained=True), [0, 2])
+        self.assertEqual(grid.containing((3.0, 2.2)), [1])
+        self.assertEqual(grid.containing((1.2, 1.2), 0.25), [0])
+        self.assertEqual(grid.containing((10.0, 10.0)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
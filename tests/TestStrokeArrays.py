@@ -0,0 +1,90 @@
+import math
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+if np is not None:
+    from stroke_arrays import StrokeArrays, affine_matrix
+
+STROKES = [[(0.0, 0.0), (3.0, 4.0), (3.0, 0.0)], [(5.0, 5.0)], [(-1.0, 2.0), (1.0, 2.0)]]
+
+DXF_CONTENT = """0
+SECTION
+2
+ENTITIES
+0
+LINE
+8
+0
+10
+0.0
+20
+0.0
+11
+2.0
+21
+0.0
+0
+ENDSEC
+0
+EOF
+"""
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestStrokeArrays(unittest.TestCase):
+    def setUp(self):
+        self.stroke_arrays = StrokeArrays.from_strokes(STROKES + [[]])
+
+    def test_round_trip(self):
+        self.assertEqual(len(self.stroke_arrays), 3)
+        self.assertEqual(self.stroke_arrays.offsets.tolist(), [0, 3, 4, 6])
+        self.assertEqual(self.stroke_arrays.to_strokes(), STROKES)
+        self.assertEqual(self.stroke_arrays.stroke(2).tolist(), [[-1.0, 2.0], [1.0, 2.0]])
+
+    def test_from_dxf(self):
+        self.assertEqual(StrokeArrays.from_dxf(DXF_CONTENT).to_strokes(), [[(0.0, 0.0), (2.0, 0.0)]])
+
+    def test_bounds_and_lengths(self):
+        self.assertEqual(self.stroke_arrays.bounds(), (-1.0, 0.0, 5.0, 5.0))
+        self.assertEqual(self.stroke_arrays.stroke_bounds().tolist(),
+                         [[0.0, 0.0, 3.0, 4.0], [5.0, 5.0, 5.0, 5.0], [-1.0, 2.0, 1.0, 2.0]])
+        self.assertEqual(self.stroke_arrays.lengths().tolist(), [9.0, 0.0, 2.0])
+        self.assertIsNone(StrokeArrays.from_strokes([]).bounds())
+
+    def test_transform(self):
+        transformed = self.stroke_arrays.transform(affine_matrix(2.0, math.pi / 2, (1.0, 0.0)))
+        np.testing.assert_allclose(transformed.stroke(0), [[1.0, 0.0], [-7.0, 6.0], [1.0, 6.0]], atol=1e-12)
+
+    def test_clip(self):
+        clipped = self.stroke_arrays.clip((0.0, 0.0, 2.0, 4.0)).to_strokes()
+        # The first stroke leaves the rectangle, the point is outside it and the last stroke is cut in half
+        self.assertEqual(len(clipped), 2)
+        np.testing.assert_allclose(clipped[0], [(0.0, 0.0), (2.0, 8 / 3)])
+        np.testing.assert_allclose(clipped[1], [(0.0, 2.0), (1.0, 2.0)])
+
+    def test_clip_splits_strokes_that_reenter(self):
+        stroke_arrays = StrokeArrays.from_strokes([[(0.5, 0.5), (0.5, 2.0), (0.8, 2.0), (0.8, 0.5), (0.9, 0.5)],
+                                                   [(0.2, 0.2)]])
+        clipped = stroke_arrays.clip((0.0, 0.0, 1.0, 1.0)).to_strokes()
+        np.testing.assert_allclose(clipped[0], [(0.5, 0.5), (0.5, 1.0)])
+        np.testing.assert_allclose(clipped[1], [(0.8, 1.0), (0.8, 0.5), (0.9, 0.5)])
+        self.assertEqual(clipped[2], [(0.2, 0.2)])
+        self.assertEqual(len(clipped), 3)
+
+    def test_to_plot_job(self):
+        plot_job = self.stroke_arrays.to_plot_job()
+        self.assertEqual(plot_job.stroke_count(), 3)
+        self.assertEqual(plot_job.bounds, (-1.0, 0.0, 5.0, 5.0))
+        self.assertEqual([points for opcode, points in plot_job.iter_strokes()], STROKES)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from stroke_queue import StrokeQueue
+
+
+class TestStrokeQueue(unittest.TestCase):
+    def test_producer_thread_is_bounded(self):
+        stroke_queue = StrokeQueue(2, time.sleep, 0.001)
+        strokes = [[(float(index), 0.0)] for index in range(20)]
+        sizes = []
+
+        def produce():
+            for stroke in strokes:
+                sizes.append(len(stroke_queue))
+                yield stroke
+
+        producer = threading.Thread(target=stroke_queue.fill, args=(produce(),))
+        producer.start()
+        received = []
+        for stroke in stroke_queue:
+            received.append(stroke)
+            time.sleep(0.001)
+        producer.join()
+        self.assertEqual(received, strokes)
+        self.assertLessEqual(max(sizes), 2)
+
+    def test_producer_errors_reach_the_consumer(self):
+        def produce():
+            yield [(0.0, 0.0)]
+            raise ValueError("Bad drawing")
+
+        stroke_queue = StrokeQueue(4, time.sleep)
+        self.assertFalse(stroke_queue.ready())
+        stroke_queue.fill(produce())
+        self.assertTrue(stroke_queue.ready())
+        self.assertEqual(stroke_queue.get(), [(0.0, 0.0)])
+        self.assertRaises(ValueError, stroke_queue.get)
+
+    def test_cancel_stops_the_producer(self):
+        closed = []
+
+        def produce():
+            try:
+                while True:
+                    yield [(0.0, 0.0)]
+            finally:
+                closed.append(True)
+
+        stroke_queue = StrokeQueue(1, time.sleep, 0.001)
+        producer = threading.Thread(target=stroke_queue.fill, args=(produce(),))
+        producer.start()
+        stroke_queue.get()
+        stroke_queue.cancel()
+        producer.join(1)
+        self.assertFalse(producer.is_alive())
+        self.assertEqual(closed, [True])
+
+    def test_rejects_bad_size(self):
+        self.assertRaises(ValueError, StrokeQueue, 0, time.sleep)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import math
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from tessellation import circle_segment_count, evaluate_spline, flatten_spline, point_segment_distance, \
+    tessellate_arc, tessellate_bulge, unit_circle_table
+
+QUARTER_CIRCLE_DEGREE = 2
+QUARTER_CIRCLE_KNOTS = [0, 0, 0, 1, 1, 1]
+QUARTER_CIRCLE_CONTROL_POINTS = [(1, 0), (1, 1), (0, 1)]
+QUARTER_CIRCLE_WEIGHTS = [1, math.sqrt(2) / 2, 1]
+
+
+def max_deviation_from_unit_circle(points):
+    deviation = 0
+    for start, end in zip(points, points[1:]):
+        # The furthest point of a chord from the arc is its midpoint
+        midpoint = ((start[0] + end[0]) / 2, (start[1] + end[1]) / 2)
+        deviation = max(deviation, 1 - math.sqrt(midpoint[0] ** 2 + midpoint[1] ** 2))
+    return deviation
+
+
+class TestSpline(unittest.TestCase):
+    def test_rational_spline_is_exact_circle(self):
+        for t in (0, 0.25, 0.5, 0.75, 1):
+            x, y = evaluate_spline(QUARTER_CIRCLE_DEGREE, QUARTER_CIRCLE_KNOTS, QUARTER_CIRCLE_CONTROL_POINTS,
+                                   QUARTER_CIRCLE_WEIGHTS, t)
+            self.assertAlmostEqual(math.sqrt(x * x + y * y), 1)
+
+    def test_flatten_within_tolerance(self):
+        for tolerance in (0.1, 0.01, 0.001):
+            points = flatten_spline(QUARTER_CIRCLE_DEGREE, QUARTER_CIRCLE_KNOTS, QUARTER_CIRCLE_CONTROL_POINTS,
+                                    QUARTER_CIRCLE_WEIGHTS, tolerance)
+            self.assertLessEqual(max_deviation_from_unit_circle(points), tolerance)
+            self.assertEqual(points[0], (1, 0))
+            self.assertEqual(points[-1], (0, 1))
+
+    def test_flatten_is_adaptive(self):
+        coarse = flatten_spline(QUARTER_CIRCLE_DEGREE, QUARTER_CIRCLE_KNOTS, QUARTER_CIRCLE_CONTROL_POINTS,
+                                QUARTER_CIRCLE_WEIGHTS, 0.1)
+        fine = flatten_spline(QUARTER_CIRCLE_DEGREE, QUARTER_CIRCLE_KNOTS, QUARTER_CIRCLE_CONTROL_POINTS,
+                              QUARTER_CIRCLE_WEIGHTS, 0.001)
+        self.assertLess(len(coarse), len(fine))
+
+    def test_straight_spline_is_one_segment(self):
+        points = flatten_spline(3, [0, 0, 0, 0, 1, 1, 1, 1], [(0, 0), (1, 1), (2, 2), (3, 3)])
+        self.assertEqual(len(points), 2)
+
+    def test_point_segment_distance(self):
+        self.assertAlmostEqual(point_segment_distance((0.5, 1), (0, 0), (1, 0)), 1)
+        self.assertAlmostEqual(point_segment_distance((2, 0), (0, 0), (1, 0)), 1)
+        self.assertAlmostEqual(point_segment_distance((-3, 4), (0, 0), (1, 0)), 5)
+
+
+class TestArc(unittest.TestCase):
+    def test_arc_within_tolerance(self):
+        for tolerance in (0.1, 0.01, 0.001):
+            points = tessellate_arc((0, 0), 1, 0, math.pi / 2, tolerance)
+            self.assertLessEqual(max_deviation_from_unit_circle(points), tolerance)
+            self.assertAlmostEqual(points[-1][0], 0)
+            self.assertAlmostEqual(points[-1][1], 1)
+
+    def test_full_circle_is_closed(self):
+        points = tessellate_arc((2, 3), 1, 0, 2 * math.pi, 0.01)
+        self.assertAlmostEqual(points[0][0], points[-1][0])
+        self.assertAlmostEqual(points[0][1], points[-1][1])
+        self.assertEqual(len(points), circle_segment_count(1, 0.01) + 1)
+
+    def test_clockwise_arc(self):
+        points = tessellate_arc((0, 0), 1, math.pi / 2, -math.pi / 2, 0.01)
+        self.assertTrue(all(x >= -1e-9 and y >= -1e-9 for x, y in points))
+
+    def test_segment_count_grows_with_radius(self):
+        self.assertLess(circle_segment_count(1, 0.01), circle_segment_count(10, 0.01))
+
+    def test_tables_are_cached(self):
+        self.assertIs(unit_circle_table(16), unit_circle_table(16))
+
+    def test_bulge_semicircle(self):
+        points = tessellate_bulge((1, 0), (-1, 0), 1, 0.001)
+        self.assertEqual(points[0], (1, 0))
+        self.assertEqual(points[-1], (-1, 0))
+        self.assertLessEqual(max_deviation_from_unit_circle(points), 0.001)
+        # A positive bulge curves counterclockwise, which takes this arc through the upper half plane
+        self.assertTrue(all(y >= -1e-9 for x, y in points))
+
+    def test_zero_bulge_is_straight(self):
+        self.assertEqual(tessellate_bulge((0, 0), (1, 1), 0), [(0, 0), (1, 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
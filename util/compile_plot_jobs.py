@@ -0,0 +1,51 @@
+"""
+Compiles every DXF drawing in the deploy directory into a binary plot job next to it.
+Plot jobs are chained, simplified, ordered and fitted to the plotter here on the host,
+so Robot.draw_dxf can load them straight from the SD card without parsing any text.
+"""
+import configparser
+import os
+import sys
+import time
+
+# Load constants from config
+config = configparser.ConfigParser()
+
+UTIL_DIR = os.path.dirname(os.path.abspath(__file__))
+
+os.chdir(os.path.join(UTIL_DIR, os.pardir))
+
+config.read("deploy_config.ini")
+
+SRC_DIRECTORY = os.path.abspath(config.get("Paths", "SRC_DIRECTORY"))
+DEPLOY_DIRECTORY = os.path.abspath(config.get("Paths", "DEPLOY_DIRECTORY"))
+
+sys.path.insert(0, SRC_DIRECTORY)
+
+from plot_job import PLOT_JOB_EXTENSION, write_plot_job
+from plot_pipeline import PlotPipeline
+
+
+def compile_plot_job(dxf_path, plot_pipeline):
+    plot_job_path = os.path.splitext(dxf_path)[0] + PLOT_JOB_EXTENSION
+    with open(dxf_path, "r") as dxf_file:
+        strokes = plot_pipeline.process(dxf_file)
+    plot_job = write_plot_job(plot_job_path, strokes)
+    print(f"{os.path.basename(dxf_path)} -> {os.path.basename(plot_job_path)}: "
+          f"{plot_job.stroke_count()} strokes, {plot_job.point_count()} points, "
+          f"{os.path.getsize(plot_job_path)} bytes, pen up travel "
+          f"{round(plot_pipeline.travel_before, 2)} -> "
+          f"{round(plot_pipeline.travel_after, 2)} in")
+
+
+def main():
+    # The host has time to spare, so give the stroke ordering a bigger budget than the brain gets
+    plot_pipeline = PlotPipeline(time_budget=10, clock=time.perf_counter)
+    for root, dirs, files in os.walk(DEPLOY_DIRECTORY):
+        for file in sorted(files):
+            if file.lower().endswith(".dxf"):
+                compile_plot_job(os.path.join(root, file), plot_pipeline)
+
+
+if __name__ == "__main__":
+    main()